@@ -0,0 +1,94 @@
+import calendar
+from collections import defaultdict
+from datetime import date as date_type
+import numpy as np
+from django.db import transaction
+from .models import ActivityHeatmap, DailyActivity
+
+# One row of daily submission counts and one of solve counts, as
+# little-endian uint16, indexed by day of the year
+HEATMAP_DTYPE = np.dtype('<u2')
+HEATMAP_ROWS = ('submissions', 'solved')
+HEATMAP_DAYS = 366
+MAX_DAILY_COUNT = np.iinfo(HEATMAP_DTYPE).max
+
+def empty_counts():
+    return np.zeros((len(HEATMAP_ROWS), HEATMAP_DAYS), dtype=HEATMAP_DTYPE)
+
+def pack_counts(counts):
+    return counts.tobytes()
+
+def unpack_counts(data):
+    return np.frombuffer(bytes(data), dtype=HEATMAP_DTYPE).reshape(len(HEATMAP_ROWS), HEATMAP_DAYS).copy()
+
+def _set_day(counts, date, submissions, solved):
+    day = date.timetuple().tm_yday - 1
+    counts[0, day] = max(0, min(submissions, MAX_DAILY_COUNT))
+    counts[1, day] = max(0, min(solved, MAX_DAILY_COUNT))
+
+def build_heatmap(user_id, year):
+    """
+    Rebuild one user's heatmap for a year from their DailyActivity rows
+    """
+    counts = empty_counts()
+    for date, submissions, solved in DailyActivity.objects.filter(user_id=user_id, date__year=year).values_list(
+        'date', 'total_submissions', 'problems_solved'
+    ):
+        _set_day(counts, date, submissions, solved)
+    heatmap, _ = ActivityHeatmap.objects.update_or_create(
+        user_id=user_id, year=year, defaults={"counts": pack_counts(counts)}
+    )
+    return heatmap
+
+def update_heatmap_day(user_id, date, submissions=0, solved=0):
+    """
+    Write one day's counts into the user's heatmap for that year. A heatmap
+    that doesn't exist yet is built from DailyActivity instead, so call this
+    after the day's DailyActivity row has been written.
+    """
+    with transaction.atomic():
+        heatmap = ActivityHeatmap.objects.select_for_update().filter(user_id=user_id, year=date.year).first()
+        if heatmap is None:
+            build_heatmap(user_id, date.year)
+            return
+        counts = unpack_counts(heatmap.counts)
+        _set_day(counts, date, submissions, solved)
+        heatmap.counts = pack_counts(counts)
+        heatmap.save(update_fields=['counts', 'updated_at'])
+
+def record_heatmap_activity(activity):
+    update_heatmap_day(activity.user_id, activity.date, activity.total_submissions, activity.problems_solved)
+
+def build_heatmaps(activities):
+    """
+    Build unsaved heatmaps for every (user, year) covered by an iterable of
+    DailyActivity objects
+    """
+    counts = defaultdict(empty_counts)
+    for activity in activities:
+        _set_day(counts[activity.user_id, activity.date.year], activity.date,
+                 activity.total_submissions, activity.problems_solved)
+    return [
+        ActivityHeatmap(user_id=user_id, year=year, counts=pack_counts(year_counts))
+        for (user_id, year), year_counts in counts.items()
+    ]
+
+def get_heatmap(user_id, year):
+    """
+    Return a user's daily counts for every day of a year, reading the packed
+    heatmap row and building it on first use
+    """
+    data = ActivityHeatmap.objects.filter(user_id=user_id, year=year).values_list('counts', flat=True).first()
+    counts = unpack_counts(data) if data is not None else unpack_counts(build_heatmap(user_id, year).counts)
+    
+    days = 366 if calendar.isleap(year) else 365
+    submissions, solved = counts[:, :days]
+    return {
+        "year": year,
+        "start": date_type(year, 1, 1),
+        "submissions": submissions.tolist(),
+        "solved": solved.tolist(),
+        "total_submissions": int(submissions.sum()),
+        "total_solved": int(solved.sum()),
+        "active_days": int(np.count_nonzero(solved)),
+    }
@@ -0,0 +1,101 @@
+import json
+import random
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from analytics.models import DailyActivity
+from analytics.scoring import recompute_user_stats
+from problems.models import Problem
+from submissions.models import Feedback, Submission
+
+class Command(BaseCommand):
+    help = 'Benchmark user stats scoring against synthetic users'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100000, help='Number of synthetic users')
+        parser.add_argument('--days', type=int, default=5, help='Activity days per user')
+        parser.add_argument('--submissions', type=int, default=5, help='Submissions per user')
+        parser.add_argument('--feedback-rate', type=float, default=0.2, help='Fraction of submissions with feedback')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', help='Append one JSON line of results to this file')
+        parser.add_argument('--keep', action='store_true', help='Keep the synthetic rows instead of rolling them back')
+    
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        
+        with transaction.atomic():
+            self.stdout.write(f"Creating {options['users']} synthetic users...")
+            self._populate(rng, options)
+            
+            timings = recompute_user_stats(batch_size=options['batch_size'])
+            if not options['keep']:
+                transaction.set_rollback(True)
+        
+        result = {
+            "timestamp": timezone.now().isoformat(),
+            "users": timings['users'],
+            "days": options['days'],
+            "submissions": options['submissions'],
+            **{key: round(timings[key], 3) for key in ('load', 'compute', 'write', 'elapsed')},
+        }
+        self.stdout.write(self.style.SUCCESS(
+            f"Scored {result['users']} users in {result['elapsed']:.2f}s "
+            f"(load {result['load']:.2f}s, compute {result['compute']:.3f}s, write {result['write']:.2f}s)"
+        ))
+        if options['output']:
+            with open(options['output'], 'a') as f:
+                f.write(json.dumps(result) + '\n')
+    
+    def _populate(self, rng, options):
+        User = get_user_model()
+        today = timezone.localdate()
+        token = rng.getrandbits(24)
+        prefix = f"bench-{token:06x}"
+        
+        problems = [
+            Problem(
+                leetcode_id=-(token * 100 + i + 1), title=f"Benchmark Problem {i}", slug=f"{prefix}-problem-{i}",
+                description='', difficulty=rng.choice(['easy', 'medium', 'hard']), category='Benchmark'
+            )
+            for i in range(100)
+        ]
+        Problem.objects.bulk_create(problems, batch_size=1000)
+        
+        users = User.objects.bulk_create([
+            User(username=f"{prefix}-{i}", email=f"{prefix}-{i}@example.com",
+                 current_streak=rng.randint(0, 40), last_active_date=today - timedelta(days=rng.randint(0, 3)))
+            for i in range(options['users'])
+        ], batch_size=1000)
+        
+        DailyActivity.objects.bulk_create([
+            DailyActivity(
+                user=user, date=today - timedelta(days=day),
+                problems_solved=rng.randint(0, 6), easy_solved=rng.randint(0, 3),
+                medium_solved=rng.randint(0, 2), hard_solved=rng.randint(0, 1),
+            )
+            for user in users
+            for day in rng.sample(range(120), options['days'])
+        ], batch_size=1000)
+        
+        submissions = Submission.objects.bulk_create([
+            Submission(
+                user=user, problem=rng.choice(problems), code='', language='python3',
+                status=rng.choice(['accepted', 'accepted', 'wrong_answer', 'time_limit_exceeded']),
+            )
+            for user in users
+            for _ in range(options['submissions'])
+        ], batch_size=1000)
+        
+        mentor = users[0]
+        Feedback.objects.bulk_create([
+            Feedback(
+                submission=submission, mentor=mentor, comment='',
+                time_complexity_rating=rng.randint(1, 5), space_complexity_rating=rng.randint(1, 5),
+                code_quality_rating=rng.randint(1, 5),
+            )
+            for submission in submissions
+            if rng.random() < options['feedback_rate']
+        ], batch_size=1000)
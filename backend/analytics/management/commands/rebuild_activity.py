@@ -0,0 +1,24 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from analytics.rollup import rebuild_user_activity
+
+class Command(BaseCommand):
+    help = 'Recompute DailyActivity rows and streaks from submissions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Users rebuilt per batch')
+        parser.add_argument('--user', type=int, action='append', help='Only rebuild this user id (repeatable)')
+
+    def handle(self, *args, **options):
+        user_ids = options['user'] or list(
+            get_user_model().objects.order_by('id').values_list('id', flat=True)
+        )
+        batch_size = options['batch_size']
+        
+        rows = 0
+        for i in range(0, len(user_ids), batch_size):
+            batch = user_ids[i:i + batch_size]
+            rows += rebuild_user_activity(batch)
+            self.stdout.write(f"Rebuilt {min(i + batch_size, len(user_ids))}/{len(user_ids)} users")
+        
+        self.stdout.write(self.style.SUCCESS(f"Wrote {rows} daily activity rows for {len(user_ids)} users"))
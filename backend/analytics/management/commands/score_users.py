@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from analytics.scoring import recompute_user_stats
+
+class Command(BaseCommand):
+    help = "Recompute every user's stats scores and ranking percentile"
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows written per bulk update')
+        parser.add_argument(
+            '--background',
+            action='store_true',
+            help='Queue the job as a Celery task instead of running it here',
+        )
+    
+    def handle(self, *args, **options):
+        if options['background']:
+            from analytics import tasks
+            result = tasks.recompute_user_stats.delay()
+            self.stdout.write(self.style.SUCCESS(f"Queued user stats recompute ({result.id})"))
+            return
+        
+        timings = recompute_user_stats(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Scored {timings['users']} users in {timings['elapsed']:.2f}s "
+            f"(load {timings['load']:.2f}s, compute {timings['compute']:.3f}s, write {timings['write']:.2f}s)"
+        ))
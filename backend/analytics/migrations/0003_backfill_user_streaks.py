@@ -0,0 +1,52 @@
+from datetime import timedelta
+
+from django.db import migrations
+
+
+def compute_streaks(dates):
+    # Frozen copy of analytics.streaks.compute_streaks as of this migration
+    latest = None
+    longest = 0
+    run = 0
+    previous = None
+    for date in dates:
+        if previous is not None and previous - date == timedelta(days=1):
+            run += 1
+        else:
+            if previous is not None and latest is None:
+                latest = run
+            run = 1
+        longest = max(longest, run)
+        previous = date
+    return (run if latest is None else latest), longest
+
+
+def backfill_streaks(apps, schema_editor):
+    User = apps.get_model('users', 'User')
+    DailyActivity = apps.get_model('analytics', 'DailyActivity')
+    
+    dates = {}
+    for user_id, date in (
+        DailyActivity.objects.filter(problems_solved__gt=0)
+        .order_by('user_id', '-date')
+        .values_list('user_id', 'date')
+    ):
+        dates.setdefault(user_id, []).append(date)
+    
+    users = list(User.objects.filter(id__in=dates))
+    for user in users:
+        user.current_streak, user.longest_streak = compute_streaks(dates[user.id])
+        user.last_active_date = dates[user.id][0]
+    User.objects.bulk_update(users, ['current_streak', 'longest_streak', 'last_active_date'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0002_notification_indexes'),
+        ('users', '0002_user_leetcode_username'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_streaks, migrations.RunPython.noop),
+    ]
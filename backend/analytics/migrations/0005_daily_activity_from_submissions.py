@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-18 02:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0004_activity_heatmap'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dailyactivity',
+            name='from_submissions',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -13,6 +13,8 @@ class DailyActivity(models.Model):
     hard_solved = models.IntegerField(default=0)
     total_submissions = models.IntegerField(default=0)
     streak_maintained = models.BooleanField(default=False)
+    # Kept by the submission rollup, rather than recorded by a client
+    from_submissions = models.BooleanField(default=False)
     
     class Meta:
         unique_together = ('user', 'date')
@@ -20,6 +22,22 @@ class DailyActivity(models.Model):
     def __str__(self):
         return f"{self.user.username} - {self.date} - {self.problems_solved} problems"
 
+class ActivityHeatmap(models.Model):
+    """
+    A user's daily submission and solve counts for one calendar year,
+    packed into a single binary column
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='heatmaps')
+    year = models.PositiveSmallIntegerField()
+    counts = models.BinaryField()
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        unique_together = ('user', 'year')
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.year} heatmap"
+
 class UserStats(models.Model):
     """
     Model for storing aggregated user statistics
@@ -57,6 +75,11 @@ class Notification(models.Model):
     related_group = models.ForeignKey('groups.Group', null=True, blank=True, on_delete=models.SET_NULL)
     related_submission = models.ForeignKey('submissions.Submission', null=True, blank=True, on_delete=models.SET_NULL)
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'created_at']),
+        ]
+    
     def __str__(self):
         return f"{self.notification_type} - {self.user.username} - {self.title}"
 
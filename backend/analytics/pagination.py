@@ -0,0 +1,7 @@
+from rest_framework.pagination import CursorPagination
+
+class NotificationCursorPagination(CursorPagination):
+    """
+    Cursor pagination over notifications, newest first
+    """
+    ordering = ('-created_at', '-id')
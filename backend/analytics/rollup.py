@@ -0,0 +1,170 @@
+from collections import defaultdict
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, F, Min
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from submissions.models import Submission
+from .heatmap import build_heatmaps, update_heatmap_day
+from .models import ActivityHeatmap, DailyActivity
+from .streaks import STREAK_FIELDS, compute_streaks, record_activity, refresh_user_streak
+from .summary import invalidate_activity_summary
+
+DIFFICULTY_FIELDS = {'easy': 'easy_solved', 'medium': 'medium_solved', 'hard': 'hard_solved'}
+ROLLUP_FIELDS = [
+    'problems_solved', *DIFFICULTY_FIELDS.values(), 'total_submissions', 'streak_maintained', 'from_submissions'
+]
+
+def _solve(difficulty, count=1):
+    return {'problems_solved': count, DIFFICULTY_FIELDS[difficulty]: count}
+
+def _count_day(user_id, date, **deltas):
+    """
+    Add to one day's DailyActivity counters and copy the day into the
+    heatmap. Counters are changed in the database, so concurrent
+    submissions don't lose updates.
+    """
+    with transaction.atomic():
+        DailyActivity.objects.get_or_create(user_id=user_id, date=date)
+        day = DailyActivity.objects.filter(user_id=user_id, date=date)
+        counters = {field: F(field) + delta for field, delta in deltas.items()}
+        if deltas.get('problems_solved', 0) > 0:
+            counters['streak_maintained'] = True
+        day.update(from_submissions=True, **counters)
+        if deltas.get('problems_solved', 0) < 0:
+            day.filter(problems_solved__lte=0).update(streak_maintained=False)
+        update_heatmap_day(user_id, date, *day.values_list('total_submissions', 'problems_solved').get())
+
+def _accepted(submission):
+    return Submission.objects.filter(
+        user_id=submission.user_id, problem_id=submission.problem_id, status='accepted'
+    )
+
+def record_submission(submission, new=True):
+    """
+    Fold a submission into its day's DailyActivity counters.
+    
+    New submissions count towards total_submissions. The first accepted
+    submission of a problem, by id, also counts as a problem solved, so of
+    two accepts racing each other only the older one takes the solve.
+    """
+    accepted = _accepted(submission)
+    solved = submission.status == 'accepted' and not accepted.filter(id__lt=submission.id).exists()
+    if not new and not solved:
+        return
+    
+    date = timezone.localdate(submission.submission_time)
+    deltas = {'total_submissions': 1} if new else {}
+    if solved:
+        deltas.update(_solve(submission.problem.difficulty))
+    # An older submission accepted after the fact takes the solve from the
+    # later one that held it
+    successor = accepted.filter(id__gt=submission.id).order_by('id').first() if solved and not new else None
+    
+    with transaction.atomic():
+        _count_day(submission.user_id, date, **deltas)
+        if successor:
+            _count_day(
+                submission.user_id, timezone.localdate(successor.submission_time),
+                **_solve(submission.problem.difficulty, -1)
+            )
+    
+    if successor:
+        refresh_user_streak(submission.user)
+    elif solved:
+        record_activity(submission.user, date)
+    invalidate_activity_summary(submission.user_id)
+
+def retract_submission(submission, was_accepted, deleted=False):
+    """
+    Take a submission that is about to be deleted, or is no longer
+    accepted, back out of its day's counters. If it held the solve of its
+    problem, the solve passes to the next accepted submission, if any.
+    """
+    accepted = _accepted(submission)
+    held_solve = was_accepted and not accepted.filter(id__lt=submission.id).exists()
+    if not deleted and not held_solve:
+        return
+    
+    date = timezone.localdate(submission.submission_time)
+    deltas = {'total_submissions': -1} if deleted else {}
+    if held_solve:
+        deltas.update(_solve(submission.problem.difficulty, -1))
+        successor = accepted.filter(id__gt=submission.id).order_by('id').first()
+    
+    with transaction.atomic():
+        _count_day(submission.user_id, date, **deltas)
+        if held_solve and successor:
+            _count_day(
+                submission.user_id, timezone.localdate(successor.submission_time),
+                **_solve(submission.problem.difficulty)
+            )
+    
+    if held_solve:
+        refresh_user_streak(submission.user)
+    invalidate_activity_summary(submission.user_id)
+
+def rebuild_user_activity(user_ids):
+    """
+    Recompute the DailyActivity rows, heatmaps and streaks of a batch of
+    users from their submissions with two grouped queries. Rows clients
+    recorded on days without submissions are kept. Returns the number of
+    rows written.
+    """
+    activity = {}
+    
+    def day(user_id, date):
+        if (user_id, date) not in activity:
+            activity[user_id, date] = DailyActivity(user_id=user_id, date=date, from_submissions=True)
+        return activity[user_id, date]
+    
+    submissions = Submission.objects.filter(user_id__in=user_ids)
+    for user_id, date, total in (
+        submissions.annotate(day=TruncDate('submission_time'))
+        .values_list('user_id', 'day')
+        .annotate(total=Count('id'))
+        .order_by()
+    ):
+        day(user_id, date).total_submissions = total
+    
+    # A problem counts as solved on the day it was first accepted
+    for user_id, _, difficulty, first_accepted in (
+        submissions.filter(status='accepted')
+        .values_list('user_id', 'problem_id', 'problem__difficulty')
+        .annotate(first_accepted=Min('submission_time'))
+        .order_by()
+    ):
+        row = day(user_id, timezone.localdate(first_accepted))
+        row.problems_solved += 1
+        setattr(row, DIFFICULTY_FIELDS[difficulty], getattr(row, DIFFICULTY_FIELDS[difficulty]) + 1)
+        row.streak_maintained = True
+    
+    with transaction.atomic():
+        # Rows clients recorded themselves stay, unless submissions now cover that day
+        DailyActivity.objects.filter(user_id__in=user_ids, from_submissions=True).delete()
+        DailyActivity.objects.bulk_create(
+            activity.values(), update_conflicts=True, unique_fields=['user', 'date'], update_fields=ROLLUP_FIELDS
+        )
+        days = list(
+            DailyActivity.objects.filter(user_id__in=user_ids)
+            .only('user_id', 'date', 'total_submissions', 'problems_solved')
+        )
+        
+        active_dates = defaultdict(list)
+        for row in days:
+            if row.problems_solved:
+                active_dates[row.user_id].append(row.date)
+        
+        users = list(get_user_model().objects.filter(id__in=user_ids).only('id', *STREAK_FIELDS))
+        for user in users:
+            dates = sorted(active_dates[user.id], reverse=True)
+            user.current_streak, user.longest_streak = compute_streaks(dates)
+            user.last_active_date = dates[0] if dates else None
+        
+        ActivityHeatmap.objects.filter(user_id__in=user_ids).delete()
+        ActivityHeatmap.objects.bulk_create(build_heatmaps(days))
+        get_user_model().objects.bulk_update(users, STREAK_FIELDS)
+    
+    for user_id in user_ids:
+        invalidate_activity_summary(user_id)
+    return len(activity)
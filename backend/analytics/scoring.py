@@ -0,0 +1,174 @@
+import time
+from datetime import timedelta
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Avg, Count, Q, Sum
+from django.utils import timezone
+from submissions.models import Feedback, Submission
+from .models import DailyActivity, UserStats
+
+SCORE_FIELDS = ['ranking_percentile', 'consistency_score', 'problem_solving_score', 'code_quality_score']
+
+# Days of activity the consistency score looks back over
+CONSISTENCY_WINDOW = 90
+# Streak length that earns the full streak part of the consistency score
+STREAK_TARGET = 30
+# Weight of a solved problem by difficulty
+DIFFICULTY_WEIGHTS = {'easy': 1.0, 'medium': 2.0, 'hard': 4.0}
+# Weight of each score in the overall score users are ranked by
+OVERALL_WEIGHTS = {'problem_solving': 0.4, 'consistency': 0.3, 'code_quality': 0.3}
+
+def _column(user_ids, rows, fields):
+    """
+    Scatter grouped (user_id, *values) rows into float arrays aligned with
+    the sorted user_ids array. Users without a row get NaN.
+    """
+    columns = {field: np.full(len(user_ids), np.nan) for field in fields}
+    if not rows:
+        return columns
+    data = np.array(rows, dtype=float)
+    positions = np.searchsorted(user_ids, data[:, 0].astype(np.int64))
+    for i, field in enumerate(fields, start=1):
+        columns[field][positions] = data[:, i]
+    return columns
+
+def load_scoring_inputs(today=None):
+    """
+    Pull everything scoring needs for all users with four grouped queries,
+    as NumPy arrays aligned with a sorted array of user ids
+    """
+    today = today or timezone.localdate()
+    window_start = today - timedelta(days=CONSISTENCY_WINDOW - 1)
+    
+    users = list(
+        get_user_model().objects.order_by('id').values_list('id', 'current_streak', 'last_active_date')
+    )
+    user_ids = np.array([user[0] for user in users], dtype=np.int64)
+    inputs = {"user_ids": user_ids}
+    
+    # Streaks are only alive if the user was active today or yesterday
+    inputs["current_streak"] = np.array([
+        streak if last_active and last_active >= today - timedelta(days=1) else 0
+        for _, streak, last_active in users
+    ], dtype=float)
+    
+    inputs.update(_column(user_ids, list(
+        DailyActivity.objects.values('user_id').annotate(
+            active_days=Count('id', filter=Q(date__gte=window_start, problems_solved__gt=0)),
+            easy=Sum('easy_solved'),
+            medium=Sum('medium_solved'),
+            hard=Sum('hard_solved'),
+        ).order_by().values_list('user_id', 'active_days', 'easy', 'medium', 'hard')
+    ), ['active_days', 'easy', 'medium', 'hard']))
+    
+    inputs.update(_column(user_ids, list(
+        Submission.objects.values('user_id').annotate(
+            submissions=Count('id'),
+            accepted=Count('id', filter=Q(status='accepted')),
+        ).order_by().values_list('user_id', 'submissions', 'accepted')
+    ), ['submissions', 'accepted']))
+    
+    inputs.update(_column(user_ids, list(
+        Feedback.objects.values('submission__user_id').annotate(
+            time_rating=Avg('time_complexity_rating'),
+            space_rating=Avg('space_complexity_rating'),
+            quality_rating=Avg('code_quality_rating'),
+        ).order_by().values_list('submission__user_id', 'time_rating', 'space_rating', 'quality_rating')
+    ), ['time_rating', 'space_rating', 'quality_rating']))
+    
+    return inputs
+
+def percentile_ranks(values):
+    """
+    Percentage of values below each value, counting ties as half below
+    """
+    if len(values) == 0:
+        return values
+    ordered = np.sort(values)
+    below = np.searchsorted(ordered, values, side='left')
+    at_or_below = np.searchsorted(ordered, values, side='right')
+    return (below + at_or_below) / 2 / len(values) * 100
+
+def compute_scores(inputs):
+    """
+    Compute all four scores, each 0-100, for every user at once
+    """
+    def zero(name):
+        return np.nan_to_num(inputs[name])
+    
+    # Share of recent days with a solve, topped up by the current streak
+    consistency = (
+        70 * zero('active_days') / CONSISTENCY_WINDOW
+        + 30 * np.minimum(inputs["current_streak"], STREAK_TARGET) / STREAK_TARGET
+    )
+    
+    # Difficulty-weighted solves on a log scale relative to the top user
+    weighted = sum(weight * zero(level) for level, weight in DIFFICULTY_WEIGHTS.items())
+    top = np.log1p(weighted.max()) if len(weighted) else 0
+    problem_solving = 100 * np.log1p(weighted) / top if top else np.zeros_like(weighted)
+    
+    # Acceptance rate, blended with mentor ratings (1-5) for users who have any
+    submissions = zero('submissions')
+    acceptance = np.divide(
+        100 * zero('accepted'), submissions, out=np.zeros_like(submissions), where=submissions > 0
+    )
+    ratings = np.stack([inputs['time_rating'], inputs['space_rating'], inputs['quality_rating']])
+    rated = ~np.isnan(ratings).all(axis=0)
+    mean_rating = np.nanmean(np.where(rated, ratings, 0), axis=0)
+    code_quality = np.where(rated, 0.6 * (mean_rating - 1) / 4 * 100 + 0.4 * acceptance, acceptance)
+    
+    overall = (
+        OVERALL_WEIGHTS['problem_solving'] * problem_solving
+        + OVERALL_WEIGHTS['consistency'] * consistency
+        + OVERALL_WEIGHTS['code_quality'] * code_quality
+    )
+    return {
+        "ranking_percentile": percentile_ranks(overall),
+        "consistency_score": consistency,
+        "problem_solving_score": problem_solving,
+        "code_quality_score": code_quality,
+    }
+
+def write_scores(user_ids, scores, batch_size=1000):
+    """
+    Upsert scores into UserStats in chunked transactions, one INSERT ... ON
+    CONFLICT per chunk. Returns the number of rows written.
+    """
+    now = timezone.now()
+    rounded = {field: np.round(scores[field], 2).tolist() for field in SCORE_FIELDS}
+    rows = [
+        UserStats(user_id=user_id, updated_at=now, **{field: rounded[field][i] for field in SCORE_FIELDS})
+        for i, user_id in enumerate(user_ids.tolist())
+    ]
+    
+    for start in range(0, len(rows), batch_size):
+        with transaction.atomic():
+            UserStats.objects.bulk_create(
+                rows[start:start + batch_size],
+                update_conflicts=True,
+                unique_fields=['user'],
+                update_fields=SCORE_FIELDS + ['updated_at'],
+            )
+    return len(rows)
+
+def recompute_user_stats(batch_size=1000, today=None):
+    """
+    Recompute every user's UserStats scores. Returns the user count and the
+    time spent loading, computing and writing.
+    """
+    started = time.monotonic()
+    inputs = load_scoring_inputs(today)
+    loaded = time.monotonic()
+    scores = compute_scores(inputs)
+    computed = time.monotonic()
+    written = write_scores(inputs["user_ids"], scores, batch_size)
+    finished = time.monotonic()
+    
+    return {
+        "users": written,
+        "load": loaded - started,
+        "compute": computed - loaded,
+        "write": finished - computed,
+        "elapsed": finished - started,
+    }
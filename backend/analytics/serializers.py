@@ -8,6 +8,10 @@ class DailyActivitySerializer(serializers.ModelSerializer):
                   'medium_solved', 'hard_solved', 'total_submissions', 
                   'streak_maintained')
         read_only_fields = ('id',)
+        extra_kwargs = {
+            field: {'min_value': 0}
+            for field in ('problems_solved', 'easy_solved', 'medium_solved', 'hard_solved', 'total_submissions')
+        }
 
 class UserStatsSerializer(serializers.ModelSerializer):
     class Meta:
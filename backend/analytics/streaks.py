@@ -0,0 +1,81 @@
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from .models import DailyActivity
+
+STREAK_FIELDS = ['current_streak', 'longest_streak', 'last_active_date']
+
+def compute_streaks(dates):
+    """
+    Return (streak ending at the latest date, longest streak) for a list of
+    distinct active dates sorted newest first
+    """
+    latest = None
+    longest = 0
+    run = 0
+    previous = None
+    for date in dates:
+        if previous is not None and previous - date == timedelta(days=1):
+            run += 1
+        else:
+            # The first run is the one ending at the latest date
+            if previous is not None and latest is None:
+                latest = run
+            run = 1
+        longest = max(longest, run)
+        previous = date
+    return (run if latest is None else latest), longest
+
+def refresh_user_streak(user):
+    """
+    Recompute a user's streak fields from their activity in one query
+    """
+    dates = list(
+        DailyActivity.objects.filter(user=user, problems_solved__gt=0)
+        .order_by('-date')
+        .values_list('date', flat=True)
+    )
+    user.current_streak, user.longest_streak = compute_streaks(dates)
+    user.last_active_date = dates[0] if dates else None
+    user.save(update_fields=STREAK_FIELDS)
+
+def record_activity(user, date):
+    """
+    Update a user's streak fields for a day they solved problems on.
+    
+    New days are applied incrementally; a day older than the latest active
+    day can join or split runs, so that falls back to a recompute.
+    """
+    last = user.last_active_date
+    if date == last:
+        return
+    extends = last == date - timedelta(days=1)
+    # An older day, or one extending a streak already zeroed as lapsed
+    if last is not None and date < last or extends and user.current_streak == 0:
+        refresh_user_streak(user)
+        return
+    
+    user.current_streak = user.current_streak + 1 if extends else 1
+    user.longest_streak = max(user.longest_streak, user.current_streak)
+    user.last_active_date = date
+    user.save(update_fields=STREAK_FIELDS)
+
+def reset_lapsed_streaks(today=None):
+    """
+    Zero the stored current streak of users who missed yesterday, returning
+    the number of users reset
+    """
+    today = today or timezone.localdate()
+    return get_user_model().objects.filter(
+        current_streak__gt=0, last_active_date__lt=today - timedelta(days=1)
+    ).update(current_streak=0)
+
+def current_streak(user, today=None):
+    """
+    Return the user's current streak from the stored fields. A streak stays
+    alive until the end of the day after the last active day.
+    """
+    today = today or timezone.localdate()
+    if user.last_active_date is None or user.last_active_date < today - timedelta(days=1):
+        return 0
+    return user.current_streak
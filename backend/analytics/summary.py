@@ -0,0 +1,72 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+from .models import DailyActivity
+
+SUMMARY_CACHE_KEY = 'analytics:summary:{user_id}'
+SUMMARY_TIMEOUT = 24 * 60 * 60
+
+# Rolling windows, in days, that can be requested on top of week/month/all-time
+SUMMARY_WINDOWS = (7, 30, 90, 365)
+
+def _window_aggregates(name, condition):
+    return {
+        f"{name}__problems": Sum('problems_solved', filter=condition, default=0),
+        f"{name}__easy": Sum('easy_solved', filter=condition, default=0),
+        f"{name}__medium": Sum('medium_solved', filter=condition, default=0),
+        f"{name}__hard": Sum('hard_solved', filter=condition, default=0),
+        f"{name}__days": Count('id', filter=condition),
+    }
+
+def build_activity_summary(user, windows=(), today=None):
+    """
+    Aggregate a user's activity for this week, this month, all time and the
+    given rolling windows in a single query
+    """
+    today = today or timezone.localdate()
+    conditions = {
+        "weekly": Q(date__gte=today - timedelta(days=today.weekday())),
+        "monthly": Q(date__gte=today.replace(day=1)),
+        "all_time": None,
+    }
+    for days in windows:
+        conditions[f"last_{days}_days"] = Q(date__gt=today - timedelta(days=days))
+    
+    aggregates = {}
+    for name, condition in conditions.items():
+        aggregates.update(_window_aggregates(name, condition))
+    row = DailyActivity.objects.filter(user=user).aggregate(**aggregates)
+    
+    summary = {name: {} for name in conditions}
+    for key, value in row.items():
+        name, field = key.split('__')
+        summary[name][field] = value
+    return summary
+
+def get_activity_summary(user, windows=()):
+    """
+    Return the activity summary from the per-user cache, building it on a
+    miss. The cache is dropped whenever the user's activity changes, and
+    kept no longer than DERIVED_CACHE_TIMEOUT for processes that didn't
+    see the change.
+    """
+    today = timezone.localdate()
+    windows = tuple(sorted(set(windows)))
+    key = SUMMARY_CACHE_KEY.format(user_id=user.id)
+    
+    entries = cache.get(key) or {}
+    entry = entries.get(windows)
+    if entry is None or entry["date"] != today:
+        entry = {"date": today, "summary": build_activity_summary(user, windows, today)}
+        entries = {
+            cached_windows: cached for cached_windows, cached in entries.items()
+            if cached["date"] == today
+        }
+        entries[windows] = entry
+        cache.set(key, entries, min(SUMMARY_TIMEOUT, settings.DERIVED_CACHE_TIMEOUT))
+    return entry["summary"]
+
+def invalidate_activity_summary(user_id):
+    cache.delete(SUMMARY_CACHE_KEY.format(user_id=user_id))
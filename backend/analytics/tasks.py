@@ -0,0 +1,17 @@
+from celery import shared_task
+from . import scoring
+from .streaks import reset_lapsed_streaks
+
+@shared_task
+def reset_streaks():
+    """
+    Zero the current streak of users whose streak lapsed at midnight
+    """
+    return reset_lapsed_streaks()
+
+@shared_task
+def recompute_user_stats():
+    """
+    Recompute every user's scores and ranking percentile
+    """
+    return scoring.recompute_user_stats()
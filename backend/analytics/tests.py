@@ -1,3 +1,418 @@
-from django.test import TestCase
+import math
+import time
+from datetime import date, timedelta
+import numpy as np
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from problems.models import Problem
+from submissions.models import Feedback, Submission
+from users.models import User
+from .heatmap import (
+    HEATMAP_DAYS, build_heatmap, empty_counts, get_heatmap, pack_counts, unpack_counts, update_heatmap_day,
+)
+from .models import ActivityHeatmap, DailyActivity, UserStats
+from .rollup import rebuild_user_activity, record_submission
+from .scoring import load_scoring_inputs, percentile_ranks, recompute_user_stats
+from .summary import build_activity_summary, get_activity_summary
+from .streaks import compute_streaks, current_streak, record_activity, refresh_user_streak, reset_lapsed_streaks
 
-# Create your tests here.
+class StreakTests(TestCase):
+    """
+    Streaks are kept on the user as activity comes in and agree with a
+    recompute from DailyActivity
+    """
+    
+    today = date(2026, 3, 10)
+    
+    def setUp(self):
+        self.user = User.objects.create_user(username='student', email='student@example.com', password='x')
+    
+    def days_ago(self, *offsets):
+        return [self.today - timedelta(days=offset) for offset in offsets]
+    
+    def solve_on(self, day):
+        DailyActivity.objects.create(user=self.user, date=day, problems_solved=1)
+        record_activity(self.user, day)
+    
+    def test_compute_streaks(self):
+        self.assertEqual(compute_streaks([]), (0, 0))
+        self.assertEqual(compute_streaks(self.days_ago(0)), (1, 1))
+        self.assertEqual(compute_streaks(self.days_ago(0, 1, 2, 5, 6)), (3, 3))
+        self.assertEqual(compute_streaks(self.days_ago(0, 3, 4, 5, 6)), (1, 4))
+        self.assertEqual(compute_streaks(self.days_ago(2, 3, 9)), (2, 2))
+    
+    def test_incremental_days_match_a_recompute(self):
+        for offset in (9, 8, 7, 5, 4, 3, 2, 1, 0):
+            self.solve_on(self.today - timedelta(days=offset))
+        self.assertEqual((self.user.current_streak, self.user.longest_streak), (6, 6))
+        self.assertEqual(self.user.last_active_date, self.today)
+        
+        refresh_user_streak(self.user)
+        self.user.refresh_from_db()
+        self.assertEqual((self.user.current_streak, self.user.longest_streak), (6, 6))
+    
+    def test_backfilled_day_joins_runs(self):
+        for day in self.days_ago(4, 3, 1, 0):
+            self.solve_on(day)
+        self.assertEqual((self.user.current_streak, self.user.longest_streak), (2, 2))
+        
+        self.solve_on(self.today - timedelta(days=2))
+        self.user.refresh_from_db()
+        self.assertEqual((self.user.current_streak, self.user.longest_streak), (5, 5))
+    
+    def test_lapsed_streaks_are_reset(self):
+        for day in self.days_ago(4, 3, 2):
+            self.solve_on(day)
+        self.assertEqual(current_streak(self.user, today=self.today - timedelta(days=1)), 3)
+        self.assertEqual(current_streak(self.user, today=self.today), 0)
+        
+        self.assertEqual(reset_lapsed_streaks(today=self.today), 1)
+        self.user.refresh_from_db()
+        self.assertEqual((self.user.current_streak, self.user.longest_streak), (0, 3))
+        
+        self.solve_on(self.today)
+        self.assertEqual((self.user.current_streak, self.user.longest_streak), (1, 3))
+
+class ActivitySummaryTests(TestCase):
+    """
+    The activity summary is one query, cached per user until their
+    activity changes
+    """
+    
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='student', email='student@example.com', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        today = timezone.localdate()
+        for offset, solved in ((0, 2), (1, 1), (40, 3)):
+            DailyActivity.objects.create(
+                user=self.user, date=today - timedelta(days=offset), problems_solved=solved, easy_solved=solved
+            )
+    
+    def test_windows_are_aggregated_in_one_query(self):
+        summary = build_activity_summary(self.user, windows=(7, 90))
+        with self.assertNumQueries(1):
+            build_activity_summary(self.user, windows=(7, 90))
+        self.assertEqual(summary["last_7_days"]["problems"], 3)
+        self.assertEqual(summary["last_90_days"]["problems"], 6)
+        self.assertEqual(summary["all_time"], {"problems": 6, "easy": 6, "medium": 0, "hard": 0, "days": 3})
+    
+    def test_summary_is_cached_until_activity_changes(self):
+        url = '/api/user-stats/summary/?windows=7'
+        self.assertEqual(self.client.get(url).data['last_7_days']['problems'], 3)
+        # Only the ranking lookup; the summary comes from the cache
+        with self.assertNumQueries(1):
+            self.client.get(url)
+        
+        self.client.post('/api/daily-activity/', {
+            'user': self.user.id, 'date': timezone.localdate() - timedelta(days=3), 'problems_solved': 4, 'easy_solved': 4,
+        })
+        self.assertEqual(self.client.get(url).data['last_7_days']['problems'], 7)
+    
+    @override_settings(DERIVED_CACHE_TIMEOUT=1)
+    def test_summary_expires_for_other_processes(self):
+        get_activity_summary(self.user)
+        # A write another process made, without invalidating this cache
+        DailyActivity.objects.filter(user=self.user).delete()
+        self.assertEqual(get_activity_summary(self.user)["all_time"]["problems"], 6)
+        time.sleep(1.1)
+        self.assertEqual(get_activity_summary(self.user)["all_time"]["problems"], 0)
+
+class ActivityRollupTests(TestCase):
+    """
+    Submissions kept in DailyActivity as they are created, accepted,
+    un-accepted and deleted agree with a rebuild from scratch
+    """
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.easy = Problem.objects.create(
+            leetcode_id=1, title='Two Sum', slug='two-sum', description='<p>Easy</p>', difficulty='easy', category='Algorithms'
+        )
+        cls.hard = Problem.objects.create(
+            leetcode_id=4, title='Median of Two Sorted Arrays', slug='median-of-two-sorted-arrays',
+            description='<p>Hard</p>', difficulty='hard', category='Algorithms'
+        )
+    
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='student', email='student@example.com', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.today = timezone.localdate()
+    
+    def submit(self, problem, status):
+        response = self.client.post('/api/submissions/', {
+            'problem': problem.id, 'code': 'pass', 'language': 'python', 'status': status,
+        })
+        self.assertEqual(response.status_code, 201)
+        return response.data['id']
+    
+    def create_on(self, problem, status, day):
+        submission = Submission.objects.create(user=self.user, problem=problem, code='pass', language='python', status=status)
+        Submission.objects.filter(id=submission.id).update(submission_time=timezone.now() - timedelta(days=day))
+        submission.refresh_from_db()
+        return submission
+    
+    def day(self, date=None):
+        return DailyActivity.objects.values(
+            'problems_solved', 'easy_solved', 'hard_solved', 'total_submissions', 'streak_maintained'
+        ).get(user=self.user, date=date or self.today)
+    
+    def snapshot(self):
+        self.user.refresh_from_db()
+        return (
+            list(DailyActivity.objects.filter(user=self.user).order_by('date').values(
+                'date', 'problems_solved', 'easy_solved', 'medium_solved', 'hard_solved',
+                'total_submissions', 'streak_maintained', 'from_submissions'
+            )),
+            (self.user.current_streak, self.user.longest_streak, self.user.last_active_date),
+            get_heatmap(self.user.id, self.today.year),
+        )
+    
+    def assert_matches_rebuild(self):
+        incremental = self.snapshot()
+        rebuild_user_activity([self.user.id])
+        self.assertEqual(incremental, self.snapshot())
+    
+    def test_api_writes_match_a_rebuild(self):
+        self.submit(self.easy, 'wrong_answer')
+        first = self.submit(self.easy, 'accepted')
+        second = self.submit(self.easy, 'accepted')
+        hard = self.submit(self.hard, 'accepted')
+        self.assertEqual(self.day(), {
+            'problems_solved': 2, 'easy_solved': 1, 'hard_solved': 1, 'total_submissions': 4, 'streak_maintained': True,
+        })
+        
+        # The next accepted submission takes over the solve
+        self.client.patch(f'/api/submissions/{first}/', {'status': 'wrong_answer'})
+        self.assertEqual(self.day()['easy_solved'], 1)
+        
+        self.assertEqual(self.client.delete(f'/api/submissions/{hard}/').status_code, 204)
+        self.client.delete(f'/api/submissions/{second}/')
+        self.assertEqual(self.day(), {
+            'problems_solved': 0, 'easy_solved': 0, 'hard_solved': 0, 'total_submissions': 2, 'streak_maintained': False,
+        })
+        self.assertEqual(User.objects.get(id=self.user.id).current_streak, 0)
+        self.assert_matches_rebuild()
+    
+    def test_moving_an_accepted_submission_moves_its_solve(self):
+        first = self.submit(self.easy, 'accepted')
+        self.submit(self.hard, 'accepted')
+        second = self.submit(self.easy, 'accepted')
+        
+        # The second easy accept takes over the solve the first one leaves
+        self.client.patch(f'/api/submissions/{first}/', {'problem': self.hard.id})
+        self.assertEqual(self.day(), {
+            'problems_solved': 2, 'easy_solved': 1, 'hard_solved': 1, 'total_submissions': 3, 'streak_maintained': True,
+        })
+        self.assert_matches_rebuild()
+        
+        self.client.patch(f'/api/submissions/{second}/', {'problem': self.hard.id})
+        self.assertEqual(self.day(), {
+            'problems_solved': 1, 'easy_solved': 0, 'hard_solved': 1, 'total_submissions': 3, 'streak_maintained': True,
+        })
+        self.assert_matches_rebuild()
+    
+    def test_older_submission_accepted_later_takes_the_solve(self):
+        older = self.create_on(self.easy, 'wrong_answer', 2)
+        newer = self.create_on(self.easy, 'accepted', 0)
+        record_submission(older)
+        record_submission(newer)
+        self.assertEqual(self.day()['problems_solved'], 1)
+        
+        older.status = 'accepted'
+        older.save()
+        record_submission(older, new=False)
+        self.assertEqual(self.day()['problems_solved'], 0)
+        self.assertEqual(self.day(self.today - timedelta(days=2))['problems_solved'], 1)
+        self.assert_matches_rebuild()
+    
+    def test_rebuild_keeps_rows_clients_recorded(self):
+        client_day = self.today - timedelta(days=5)
+        DailyActivity.objects.create(user=self.user, date=client_day, problems_solved=3, easy_solved=3)
+        # Left behind by submissions that no longer exist
+        DailyActivity.objects.create(
+            user=self.user, date=self.today - timedelta(days=8), total_submissions=1, from_submissions=True
+        )
+        self.submit(self.easy, 'accepted')
+        
+        rebuild_user_activity([self.user.id])
+        self.assertEqual(
+            list(DailyActivity.objects.filter(user=self.user).order_by('date').values_list('date', 'from_submissions')),
+            [(client_day, False), (self.today, True)],
+        )
+        heatmap = get_heatmap(self.user.id, client_day.year)
+        self.assertEqual(heatmap['solved'][client_day.timetuple().tm_yday - 1], 3)
+
+class ScoringTests(TestCase):
+    """
+    The vectorized scores match the formulas worked by hand, and come from
+    a fixed number of queries
+    """
+    
+    today = date(2026, 3, 10)
+    
+    @classmethod
+    def setUpTestData(cls):
+        problem = Problem.objects.create(
+            leetcode_id=1, title='Two Sum', slug='two-sum', description='<p>Easy</p>', difficulty='easy', category='Algorithms'
+        )
+        # Active on half of the window and on a full streak, with mentor feedback
+        cls.alice = User.objects.create_user(
+            username='alice', email='alice@example.com', password='x', current_streak=30, last_active_date=cls.today
+        )
+        DailyActivity.objects.bulk_create(
+            DailyActivity(user=cls.alice, date=cls.today - timedelta(days=2 * i), problems_solved=1, easy_solved=1)
+            for i in range(45)
+        )
+        submissions = [
+            Submission.objects.create(user=cls.alice, problem=problem, code='pass', language='python', status=status)
+            for status in ('accepted', 'accepted', 'accepted', 'wrong_answer')
+        ]
+        # Hard solves from before the window and a streak that has lapsed
+        cls.bob = User.objects.create_user(
+            username='bob', email='bob@example.com', password='x',
+            current_streak=10, last_active_date=cls.today - timedelta(days=5)
+        )
+        DailyActivity.objects.create(
+            user=cls.bob, date=cls.today - timedelta(days=100), problems_solved=2, hard_solved=2
+        )
+        # No activity at all
+        cls.carol = User.objects.create_user(username='carol', email='carol@example.com', password='x', role='mentor')
+        Feedback.objects.create(
+            submission=submissions[0], mentor=cls.carol, comment='Good', time_complexity_rating=5,
+            space_complexity_rating=5, code_quality_rating=5
+        )
+    
+    def scores(self, user):
+        return UserStats.objects.values(
+            'ranking_percentile', 'consistency_score', 'problem_solving_score', 'code_quality_score'
+        ).get(user=user)
+    
+    def assert_scores(self, user, **expected):
+        for field, value in self.scores(user).items():
+            self.assertAlmostEqual(value, expected[field], places=2, msg=f"{user.username} {field}")
+    
+    def test_percentile_ranks_split_ties(self):
+        self.assertEqual(percentile_ranks(np.array([10, 20, 20, 30])).tolist(), [12.5, 50.0, 50.0, 87.5])
+        self.assertEqual(len(percentile_ranks(np.array([]))), 0)
+    
+    def test_inputs_are_loaded_in_four_queries(self):
+        with self.assertNumQueries(4):
+            inputs = load_scoring_inputs(self.today)
+        self.assertEqual(inputs["user_ids"].tolist(), [self.alice.id, self.bob.id, self.carol.id])
+        self.assertEqual(inputs["current_streak"].tolist(), [30, 0, 0])
+        self.assertEqual(inputs["active_days"][:2].tolist(), [45, 0])
+        self.assertTrue(np.isnan(inputs["quality_rating"][1:]).all())
+    
+    def test_scores_match_hand_computed_values(self):
+        self.assertEqual(recompute_user_stats(today=self.today)["users"], 3)
+        
+        # 70 * 45/90 + 30 * 30/30; 0.6 * 100 for 5/5 ratings + 0.4 * 75% accepted
+        self.assert_scores(
+            self.alice, consistency_score=65, problem_solving_score=100, code_quality_score=90,
+            ranking_percentile=100 * 2.5 / 3,
+        )
+        # Two hard solves weigh 8 against alice's 45 easy ones, on a log scale
+        self.assert_scores(
+            self.bob, consistency_score=0, problem_solving_score=100 * math.log(9) / math.log(46),
+            code_quality_score=0, ranking_percentile=50,
+        )
+        self.assert_scores(
+            self.carol, consistency_score=0, problem_solving_score=0, code_quality_score=0,
+            ranking_percentile=100 * 0.5 / 3,
+        )
+    
+    def test_recompute_upserts_existing_stats(self):
+        recompute_user_stats(today=self.today)
+        # Once alice's streak has lapsed
+        recompute_user_stats(today=self.today + timedelta(days=2))
+        self.assertEqual(UserStats.objects.count(), 3)
+        self.assertAlmostEqual(self.scores(self.alice)['consistency_score'], 70 * 44 / 90, places=2)
+
+class HeatmapTests(TestCase):
+    """
+    Heatmaps pack a year of daily counts into one binary column that stays
+    in step with DailyActivity
+    """
+    
+    def setUp(self):
+        self.user = User.objects.create_user(username='student', email='student@example.com', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.year = timezone.localdate().year
+    
+    def stored_counts(self, year=None):
+        return unpack_counts(ActivityHeatmap.objects.get(user=self.user, year=year or self.year).counts)
+    
+    def test_counts_pack_as_little_endian_uint16(self):
+        counts = empty_counts()
+        counts[0, 0] = 1
+        counts[1, HEATMAP_DAYS - 1] = 0x0102
+        data = pack_counts(counts)
+        self.assertEqual(len(data), 2 * HEATMAP_DAYS * 2)
+        self.assertEqual(data[:2], b'\x01\x00')
+        self.assertEqual(data[-2:], b'\x02\x01')
+        self.assertTrue((unpack_counts(data) == counts).all())
+    
+    def test_days_are_indexed_by_day_of_year_and_clamped(self):
+        DailyActivity.objects.create(user=self.user, date=date(2024, 12, 31), total_submissions=70000, problems_solved=3)
+        DailyActivity.objects.create(user=self.user, date=date(2024, 1, 1), total_submissions=2)
+        build_heatmap(self.user.id, 2024)
+        
+        counts = self.stored_counts(2024)
+        self.assertEqual(counts[:, 365].tolist(), [65535, 3])
+        self.assertEqual(counts[:, 0].tolist(), [2, 0])
+        self.assertEqual(len(get_heatmap(self.user.id, 2024)['submissions']), 366)
+        self.assertEqual(len(get_heatmap(self.user.id, 2023)['submissions']), 365)
+    
+    def test_negative_counts_pack_as_zero(self):
+        # Rows written before counts were validated, or a rollup that went below zero
+        DailyActivity.objects.create(user=self.user, date=date(2024, 6, 1), total_submissions=-1, problems_solved=-3)
+        self.assertEqual(get_heatmap(self.user.id, 2024)['total_submissions'], 0)
+        update_heatmap_day(self.user.id, date(2024, 6, 2), submissions=-2, solved=70000)
+        self.assertEqual(self.stored_counts(2024)[:, 153].tolist(), [0, 65535])
+    
+    def test_negative_counts_are_rejected(self):
+        response = self.client.post('/api/daily-activity/', {
+            'user': self.user.id, 'date': timezone.localdate(), 'problems_solved': -1,
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('problems_solved', response.data)
+        self.assertFalse(DailyActivity.objects.exists())
+    
+    def test_heatmap_is_built_once_then_read_in_one_query(self):
+        DailyActivity.objects.create(user=self.user, date=date(2025, 3, 1), total_submissions=4, problems_solved=2)
+        heatmap = get_heatmap(self.user.id, 2025)
+        self.assertEqual((heatmap['total_submissions'], heatmap['total_solved'], heatmap['active_days']), (4, 2, 1))
+        self.assertEqual(heatmap['solved'][59], 2)
+        
+        with self.assertNumQueries(1):
+            self.assertEqual(get_heatmap(self.user.id, 2025), heatmap)
+    
+    def test_activity_writes_keep_the_heatmap_in_step(self):
+        today = timezone.localdate()
+        self.client.get('/api/daily-activity/heatmap/')
+        response = self.client.post('/api/daily-activity/', {
+            'user': self.user.id, 'date': today, 'problems_solved': 2, 'total_submissions': 5,
+        })
+        self.client.patch(f"/api/daily-activity/{response.data['id']}/", {'problems_solved': 3})
+        other_day = date(self.year, 1, 2 if today == date(self.year, 1, 1) else 1)
+        moved = self.client.post('/api/daily-activity/', {
+            'user': self.user.id, 'date': other_day, 'problems_solved': 1, 'total_submissions': 1,
+        })
+        self.client.delete(f"/api/daily-activity/{moved.data['id']}/")
+        
+        incremental = self.stored_counts()
+        build_heatmap(self.user.id, self.year)
+        self.assertTrue((incremental == self.stored_counts()).all())
+        self.assertEqual(incremental[:, today.timetuple().tm_yday - 1].tolist(), [5, 3])
+    
+    def test_year_must_be_in_range(self):
+        self.assertEqual(self.client.get('/api/daily-activity/heatmap/?year=1999').status_code, 400)
+        self.assertEqual(self.client.get(f'/api/daily-activity/heatmap/?year={self.year + 1}').status_code, 400)
+        self.assertEqual(self.client.get('/api/daily-activity/heatmap/?year=abc').status_code, 400)
@@ -1,12 +1,16 @@
+import random
 from django.shortcuts import render
 
 from rest_framework import viewsets, permissions, filters, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.utils import timezone
-from django.db.models import Count, Sum, Avg
-from datetime import timedelta
+from django.core.cache import cache
+from .heatmap import get_heatmap, record_heatmap_activity, update_heatmap_day
 from .models import DailyActivity, UserStats, Notification, DailyMotivation
+from .pagination import NotificationCursorPagination
+from .summary import SUMMARY_WINDOWS, get_activity_summary, invalidate_activity_summary
+from .streaks import current_streak, record_activity, refresh_user_streak
 from .serializers import (
     DailyActivitySerializer, UserStatsSerializer, 
     NotificationSerializer, DailyMotivationSerializer
@@ -23,7 +27,26 @@ class DailyActivityViewSet(viewsets.ModelViewSet):
         return DailyActivity.objects.filter(user=self.request.user)
     
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        activity = serializer.save(user=self.request.user)
+        if activity.problems_solved > 0:
+            record_activity(self.request.user, activity.date)
+        record_heatmap_activity(activity)
+        invalidate_activity_summary(self.request.user.id)
+    
+    def perform_update(self, serializer):
+        previous_date = serializer.instance.date
+        activity = serializer.save()
+        if activity.date != previous_date:
+            update_heatmap_day(activity.user_id, previous_date)
+        record_heatmap_activity(activity)
+        refresh_user_streak(self.request.user)
+        invalidate_activity_summary(self.request.user.id)
+    
+    def perform_destroy(self, instance):
+        instance.delete()
+        update_heatmap_day(instance.user_id, instance.date)
+        refresh_user_streak(self.request.user)
+        invalidate_activity_summary(self.request.user.id)
     
     @action(detail=False)
     def today(self, request):
@@ -46,36 +69,28 @@ class DailyActivityViewSet(viewsets.ModelViewSet):
     
     @action(detail=False)
     def streak(self, request):
-        # Get user's current streak
+        # Streaks are maintained on the user as activity is recorded
         user = request.user
-        today = timezone.localdate()
-        yesterday = today - timedelta(days=1)
-        
-        # Check if user has activity for today
-        today_activity = DailyActivity.objects.filter(
-            user=user, 
-            date=today,
-            problems_solved__gt=0
-        ).exists()
-        
-        # Get the latest streak of consecutive days
-        streak = 0
-        check_date = yesterday
-        
-        # Count backwards from yesterday until we find a day with no activity
-        while DailyActivity.objects.filter(
-            user=user, 
-            date=check_date,
-            problems_solved__gt=0
-        ).exists():
-            streak += 1
-            check_date = check_date - timedelta(days=1)
-        
-        # If user has activity today, add today to the streak
-        if today_activity:
-            streak += 1
-        
-        return Response({"streak": streak, "has_activity_today": today_activity})
+        return Response({
+            "streak": current_streak(user),
+            "longest_streak": user.longest_streak,
+            "has_activity_today": user.last_active_date == timezone.localdate(),
+        })
+    
+    @action(detail=False)
+    def heatmap(self, request):
+        """
+        Daily submission and solve counts for every day of ?year=, defaulting
+        to the current year
+        """
+        this_year = timezone.localdate().year
+        try:
+            year = int(request.query_params.get('year', this_year))
+        except ValueError:
+            year = None
+        if year is None or not 2000 <= year <= this_year:
+            return Response({"detail": f"year must be between 2000 and {this_year}."}, status=400)
+        return Response(get_heatmap(request.user.id, year))
 
 class UserStatsViewSet(viewsets.ReadOnlyModelViewSet):
     """
@@ -89,40 +104,21 @@ class UserStatsViewSet(viewsets.ReadOnlyModelViewSet):
     
     @action(detail=False)
     def summary(self, request):
+        """
+        Activity totals for this week, this month and all time. Rolling
+        windows can be added with ?windows=7,30,90,365.
+        """
         user = request.user
-        today = timezone.localdate()
-        start_of_week = today - timedelta(days=today.weekday())
-        start_of_month = today.replace(day=1)
-        
-        # Get daily activities
-        day_stats = DailyActivity.objects.filter(user=user)
-        
-        # Weekly stats
-        week_stats = day_stats.filter(date__gte=start_of_week).aggregate(
-            problems=Sum('problems_solved', default=0),
-            easy=Sum('easy_solved', default=0),
-            medium=Sum('medium_solved', default=0),
-            hard=Sum('hard_solved', default=0),
-            days=Count('id')
-        )
-        
-        # Monthly stats
-        month_stats = day_stats.filter(date__gte=start_of_month).aggregate(
-            problems=Sum('problems_solved', default=0),
-            easy=Sum('easy_solved', default=0),
-            medium=Sum('medium_solved', default=0),
-            hard=Sum('hard_solved', default=0),
-            days=Count('id')
-        )
+        windows = request.query_params.get('windows', '')
+        try:
+            windows = {int(days) for days in windows.split(',') if days.strip()}
+        except ValueError:
+            windows = {0}
+        if not windows <= set(SUMMARY_WINDOWS):
+            allowed = ', '.join(str(days) for days in SUMMARY_WINDOWS)
+            return Response({"detail": f"windows must be chosen from {allowed}."}, status=400)
         
-        # All-time stats
-        all_time_stats = day_stats.aggregate(
-            problems=Sum('problems_solved', default=0),
-            easy=Sum('easy_solved', default=0),
-            medium=Sum('medium_solved', default=0),
-            hard=Sum('hard_solved', default=0),
-            days=Count('id')
-        )
+        summary = get_activity_summary(user, windows)
         
         # Get user ranking data from UserStats
         try:
@@ -141,12 +137,7 @@ class UserStatsViewSet(viewsets.ReadOnlyModelViewSet):
                 "code_quality_score": 0
             }
         
-        return Response({
-            "weekly": week_stats,
-            "monthly": month_stats,
-            "all_time": all_time_stats,
-            "ranking": ranking_data
-        })
+        return Response({**summary, "ranking": ranking_data})
 
 class NotificationViewSet(viewsets.ModelViewSet):
     """
@@ -154,9 +145,10 @@ class NotificationViewSet(viewsets.ModelViewSet):
     """
     serializer_class = NotificationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = NotificationCursorPagination
     
     def get_queryset(self):
-        return Notification.objects.filter(user=self.request.user).order_by('-created_at')
+        return Notification.objects.filter(user=self.request.user).order_by('-created_at', '-id')
     
     @action(detail=False, methods=['post'])
     def mark_all_read(self, request):
@@ -170,6 +162,9 @@ class NotificationViewSet(viewsets.ModelViewSet):
         notification.save()
         return Response({"detail": "Notification marked as read."})
 
+MOTIVATION_IDS_CACHE_KEY = 'analytics:motivation-ids'
+MOTIVATION_IDS_TIMEOUT = 60 * 60
+
 class DailyMotivationViewSet(viewsets.ReadOnlyModelViewSet):
     """
     API endpoint for daily motivation quotes
@@ -187,7 +182,14 @@ class DailyMotivationViewSet(viewsets.ReadOnlyModelViewSet):
             return Response(serializer.data)
         except DailyMotivation.DoesNotExist:
             # Get a random quote if there's no specific one for today
-            random_quote = DailyMotivation.objects.order_by('?').first()
+            quote_ids = cache.get_or_set(
+                MOTIVATION_IDS_CACHE_KEY,
+                lambda: list(DailyMotivation.objects.values_list('id', flat=True)),
+                MOTIVATION_IDS_TIMEOUT
+            )
+            random_quote = None
+            if quote_ids:
+                random_quote = DailyMotivation.objects.filter(id=random.choice(quote_ids)).first()
             if random_quote:
                 serializer = self.get_serializer(random_quote)
                 return Response(serializer.data)
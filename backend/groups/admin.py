@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Group, GroupMembership, GroupInvitation, GroupChallenge
+from .models import Group, GroupMembership, GroupInvitation, GroupChallenge, LeaderboardEntry
 
 class GroupMembershipInline(admin.TabularInline):
     model = GroupMembership
@@ -24,3 +24,9 @@ class GroupChallengeAdmin(admin.ModelAdmin):
     list_filter = ('start_date', 'end_date')
     search_fields = ('title', 'description', 'group__name')
     filter_horizontal = ('problems',)
+
+@admin.register(LeaderboardEntry)
+class LeaderboardEntryAdmin(admin.ModelAdmin):
+    list_display = ('user', 'group', 'challenge', 'points', 'last_solved_at')
+    search_fields = ('user__username', 'group__name', 'challenge__title')
+    raw_id_fields = ('user', 'group', 'challenge')
@@ -0,0 +1,264 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Min, Q, Value
+from django.db.models.functions import Greatest
+from submissions.models import Submission
+from .models import Group, GroupChallenge, GroupMembership, LeaderboardEntry
+
+DIFFICULTY_POINTS = {'easy': 1, 'medium': 2, 'hard': 4}
+SOLVED_FIELDS = {'easy': 'easy_solved', 'medium': 'medium_solved', 'hard': 'hard_solved'}
+
+# Most points first; on a tie, whoever got there first
+RANK_ORDER = ('-points', 'last_solved_at', 'user_id')
+
+DEFAULT_LEADERBOARD_SIZE = 10
+MAX_LEADERBOARD_SIZE = 100
+
+REDIS_KEY = 'leaderboard:{board}'
+# Sorted set scores are points shifted past the solve timestamp, so ties
+# go to the earlier solver
+REDIS_TIME_SPAN = 10 ** 10
+
+_redis = None
+
+def get_redis():
+    """
+    Return the Redis client leaderboards are mirrored to, or None when
+    LEADERBOARD_REDIS_URL isn't set
+    """
+    global _redis
+    if _redis is None and settings.LEADERBOARD_REDIS_URL:
+        import redis
+        _redis = redis.Redis.from_url(settings.LEADERBOARD_REDIS_URL)
+    return _redis
+
+def _board(group_id, challenge_id=None):
+    return LeaderboardEntry.objects.filter(group_id=group_id, challenge_id=challenge_id)
+
+def _redis_key(group_id, challenge_id=None):
+    board = f'challenge:{challenge_id}' if challenge_id else f'group:{group_id}'
+    return REDIS_KEY.format(board=board)
+
+def _redis_score(points, last_solved_at):
+    solved = int(last_solved_at.timestamp()) if last_solved_at else 0
+    return points * REDIS_TIME_SPAN + (REDIS_TIME_SPAN - 1 - solved)
+
+def _publish(group_id, challenge_id, entries, replace=False):
+    """
+    Mirror (user_id, points, last_solved_at) rows into the board's sorted
+    set once the transaction commits
+    """
+    client = get_redis()
+    if client is None:
+        return
+    key = _redis_key(group_id, challenge_id)
+    mapping = {user_id: _redis_score(points, solved) for user_id, points, solved in entries}
+    
+    def write():
+        pipeline = client.pipeline()
+        if replace:
+            pipeline.delete(key)
+        if mapping:
+            pipeline.zadd(key, mapping)
+        pipeline.execute()
+    transaction.on_commit(write)
+
+def _unpublish(group_id, challenge_id, user_ids):
+    client = get_redis()
+    if client is not None and user_ids:
+        key = _redis_key(group_id, challenge_id)
+        transaction.on_commit(lambda: client.zrem(key, *user_ids))
+
+def _add_solve(group_id, challenge_id, user_id, difficulty, solved_at):
+    with transaction.atomic():
+        LeaderboardEntry.objects.get_or_create(
+            group_id=group_id, challenge_id=challenge_id, user_id=user_id,
+            defaults={"last_solved_at": solved_at}
+        )
+        entry = _board(group_id, challenge_id).filter(user_id=user_id)
+        entry.update(**{
+            "points": F('points') + DIFFICULTY_POINTS[difficulty],
+            SOLVED_FIELDS[difficulty]: F(SOLVED_FIELDS[difficulty]) + 1,
+            "last_solved_at": Greatest('last_solved_at', Value(solved_at)),
+        })
+        _publish(group_id, challenge_id, entry.values_list('user_id', 'points', 'last_solved_at'))
+
+def record_leaderboard_solve(submission):
+    """
+    Credit an accepted submission to the leaderboards of the user's groups.
+    
+    The first accepted submission of a problem, by id, counts on every group
+    board; on a challenge board, the first accepted one inside the challenge
+    window. A submission accepted after a later one that already holds the
+    solve moves it, which rebuilds the user's entries instead.
+    """
+    if submission.status != 'accepted':
+        return
+    solved_at = submission.submission_time
+    difficulty = submission.problem.difficulty
+    accepted = Submission.objects.filter(
+        user_id=submission.user_id, problem_id=submission.problem_id, status='accepted'
+    )
+    if accepted.filter(id__gt=submission.id).exists():
+        rebuild_user_leaderboards(submission.user_id)
+        return
+    earlier = accepted.filter(id__lt=submission.id)
+    first_solve = not earlier.exists()
+    
+    group_ids = list(GroupMembership.objects.filter(user_id=submission.user_id).values_list('group_id', flat=True))
+    if not group_ids:
+        return
+    if first_solve:
+        for group_id in group_ids:
+            _add_solve(group_id, None, submission.user_id, difficulty, solved_at)
+    
+    challenges = GroupChallenge.objects.filter(
+        group_id__in=group_ids, problems=submission.problem_id,
+        start_date__lte=solved_at, end_date__gte=solved_at
+    ).values_list('id', 'group_id', 'start_date', 'end_date')
+    for challenge_id, group_id, start, end in challenges:
+        if first_solve or not earlier.filter(submission_time__range=(start, end)).exists():
+            _add_solve(group_id, challenge_id, submission.user_id, difficulty, solved_at)
+
+def _build_entries(group_id, challenge, user_ids):
+    """
+    Compute board rows from accepted submissions with one grouped query
+    """
+    submissions = Submission.objects.filter(status='accepted', user_id__in=user_ids)
+    if challenge is not None:
+        submissions = submissions.filter(
+            problem__in=challenge.problems.values('id'),
+            submission_time__range=(challenge.start_date, challenge.end_date)
+        )
+    
+    entries = {}
+    for user_id, difficulty, first_solved in (
+        submissions.values_list('user_id', 'problem_id', 'problem__difficulty')
+        .annotate(first_solved=Min('submission_time'))
+        .order_by()
+        .values_list('user_id', 'problem__difficulty', 'first_solved')
+    ):
+        entry = entries.get(user_id)
+        if entry is None:
+            entry = entries[user_id] = LeaderboardEntry(
+                group_id=group_id, challenge=challenge, user_id=user_id, last_solved_at=first_solved
+            )
+        entry.points += DIFFICULTY_POINTS[difficulty]
+        setattr(entry, SOLVED_FIELDS[difficulty], getattr(entry, SOLVED_FIELDS[difficulty]) + 1)
+        entry.last_solved_at = max(entry.last_solved_at, first_solved)
+    return list(entries.values())
+
+def rebuild_board(group_id, challenge=None, user_ids=None):
+    """
+    Recompute a group or challenge board from submissions, for every
+    member or just the given users. Returns the number of entries written.
+    """
+    full = user_ids is None
+    if full:
+        user_ids = list(GroupMembership.objects.filter(group_id=group_id).values_list('user_id', flat=True))
+    challenge_id = challenge.id if challenge is not None else None
+    entries = _build_entries(group_id, challenge, user_ids)
+    
+    with transaction.atomic():
+        # A challenge moved to another group leaves rows under the old one
+        stale = LeaderboardEntry.objects.filter(challenge=challenge) if challenge else _board(group_id)
+        if not full:
+            stale = stale.filter(user_id__in=user_ids)
+            _unpublish(group_id, challenge_id, list(user_ids))
+        stale.delete()
+        LeaderboardEntry.objects.bulk_create(entries)
+        _publish(group_id, challenge_id, [(e.user_id, e.points, e.last_solved_at) for e in entries], replace=full)
+    return len(entries)
+
+def rebuild_group_leaderboards(group, user_ids=None):
+    """
+    Rebuild a group's board and the boards of all its challenges
+    """
+    written = rebuild_board(group.id, user_ids=user_ids)
+    for challenge in GroupChallenge.objects.filter(group=group):
+        written += rebuild_board(group.id, challenge, user_ids)
+    return written
+
+def rebuild_user_leaderboards(user_id):
+    """
+    Recompute one user's entries on the boards of all their groups, for
+    when a solve is taken back or moves to another submission
+    """
+    written = 0
+    for group in Group.objects.filter(members=user_id):
+        written += rebuild_group_leaderboards(group, [user_id])
+    return written
+
+def remove_member_leaderboards(group_id, user_id):
+    """
+    Drop a departing member from the group's boards
+    """
+    with transaction.atomic():
+        boards = list(
+            LeaderboardEntry.objects.filter(group_id=group_id, user_id=user_id).values_list('challenge_id', flat=True)
+        )
+        LeaderboardEntry.objects.filter(group_id=group_id, user_id=user_id).delete()
+        for challenge_id in boards:
+            _unpublish(group_id, challenge_id, [user_id])
+
+def drop_board(group_id, challenge_id=None):
+    """
+    Forget the Redis mirror of a deleted board
+    """
+    client = get_redis()
+    if client is not None:
+        key = _redis_key(group_id, challenge_id)
+        transaction.on_commit(lambda: client.delete(key))
+
+def _warm_redis(client, group_id, challenge_id):
+    key = _redis_key(group_id, challenge_id)
+    if not client.exists(key):
+        entries = list(_board(group_id, challenge_id).values_list('user_id', 'points', 'last_solved_at'))
+        if entries:
+            client.zadd(key, {user_id: _redis_score(points, solved) for user_id, points, solved in entries})
+    return key
+
+def top_entries(group_id, challenge_id=None, limit=DEFAULT_LEADERBOARD_SIZE):
+    """
+    Return the top entries of a board in rank order, each with its rank set
+    """
+    client = get_redis()
+    if client is None:
+        entries = list(_board(group_id, challenge_id).select_related('user').order_by(*RANK_ORDER)[:limit])
+    else:
+        key = _warm_redis(client, group_id, challenge_id)
+        user_ids = [int(user_id) for user_id in client.zrevrange(key, 0, limit - 1)]
+        by_user = {
+            entry.user_id: entry
+            for entry in _board(group_id, challenge_id).filter(user_id__in=user_ids).select_related('user')
+        }
+        entries = [by_user[user_id] for user_id in user_ids if user_id in by_user]
+    
+    for rank, entry in enumerate(entries, start=1):
+        entry.rank = rank
+    return entries
+
+def user_entry(group_id, user_id, challenge_id=None):
+    """
+    Return a user's entry on a board with its rank set, or None if they
+    haven't scored on it
+    """
+    entry = _board(group_id, challenge_id).select_related('user').filter(user_id=user_id).first()
+    if entry is None:
+        return None
+    
+    client = get_redis()
+    if client is not None:
+        key = _warm_redis(client, group_id, challenge_id)
+        rank = client.zrevrank(key, user_id)
+        if rank is not None:
+            entry.rank = rank + 1
+            return entry
+    
+    # Count the entries ranked above, which the rank index answers directly
+    entry.rank = _board(group_id, challenge_id).filter(
+        Q(points__gt=entry.points)
+        | Q(points=entry.points, last_solved_at__lt=entry.last_solved_at)
+        | Q(points=entry.points, last_solved_at=entry.last_solved_at, user_id__lt=entry.user_id)
+    ).count() + 1
+    return entry
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from groups.leaderboard import rebuild_group_leaderboards
+from groups.models import Group
+
+class Command(BaseCommand):
+    help = 'Recompute group and challenge leaderboards from submissions'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--group', type=int, action='append', help='Only rebuild this group id (repeatable)')
+    
+    def handle(self, *args, **options):
+        groups = Group.objects.order_by('id')
+        if options['group']:
+            groups = groups.filter(id__in=options['group'])
+        
+        entries = 0
+        for group in groups:
+            entries += rebuild_group_leaderboards(group)
+            self.stdout.write(f"Rebuilt leaderboards for {group.name}")
+        
+        self.stdout.write(self.style.SUCCESS(f"Wrote {entries} leaderboard entries"))
@@ -0,0 +1,24 @@
+from .models import GroupMembership
+
+def get_group_roles(request):
+    """
+    Return the requesting user's {group_id: role} map.
+    
+    It is loaded once per request and kept on the request only, so joins,
+    leaves and role changes take effect on the next request in every
+    process.
+    """
+    roles = getattr(request, '_group_roles', None)
+    if roles is not None:
+        return roles
+    
+    user = request.user
+    if not user.is_authenticated:
+        roles = {}
+    else:
+        roles = dict(GroupMembership.objects.filter(user=user).values_list('group_id', 'role'))
+    request._group_roles = roles
+    return roles
+
+def get_group_role(request, group_id):
+    return get_group_roles(request).get(group_id)
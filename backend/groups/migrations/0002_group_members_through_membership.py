@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.db import migrations, models
+
+
+def copy_members(apps, schema_editor):
+    Group = apps.get_model('groups', 'Group')
+    GroupMembership = apps.get_model('groups', 'GroupMembership')
+
+    existing = set(GroupMembership.objects.values_list('group_id', 'user_id'))
+    GroupMembership.objects.bulk_create([
+        GroupMembership(group_id=group_id, user_id=user_id, role='member')
+        for group_id, user_id in Group.members.through.objects.values_list('group_id', 'user_id')
+        if (group_id, user_id) not in existing
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('groups', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # Members were written to GroupMembership but read through a
+        # separate auto-created table; fold them together
+        migrations.RunPython(copy_members, migrations.RunPython.noop),
+        migrations.RemoveField(model_name='group', name='members'),
+        migrations.AddField(
+            model_name='group',
+            name='members',
+            field=models.ManyToManyField(
+                related_name='leetcode_groups', through='groups.GroupMembership', to=settings.AUTH_USER_MODEL
+            ),
+        ),
+    ]
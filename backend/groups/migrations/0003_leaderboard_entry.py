@@ -0,0 +1,34 @@
+# Generated by Django 5.1.6 on 2026-10-18 01:52
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('groups', '0002_group_members_through_membership'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('easy_solved', models.IntegerField(default=0)),
+                ('medium_solved', models.IntegerField(default=0)),
+                ('hard_solved', models.IntegerField(default=0)),
+                ('points', models.IntegerField(default=0)),
+                ('last_solved_at', models.DateTimeField(blank=True, null=True)),
+                ('challenge', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to='groups.groupchallenge')),
+                ('group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to='groups.group')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['group', 'challenge', '-points', 'last_solved_at'], name='leaderboard_rank_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('challenge__isnull', True)), fields=('group', 'user'), name='unique_group_leaderboard_entry'), models.UniqueConstraint(fields=('challenge', 'user'), name='unique_challenge_leaderboard_entry')],
+            },
+        ),
+    ]
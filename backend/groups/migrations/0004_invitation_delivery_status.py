@@ -0,0 +1,35 @@
+# Generated by Django 5.1.6 on 2026-10-18 02:00
+
+from django.db import migrations, models
+
+
+def mark_existing_sent(apps, schema_editor):
+    # Invitations created before this were emailed during the request
+    GroupInvitation = apps.get_model('groups', 'GroupInvitation')
+    GroupInvitation.objects.update(delivery_status='sent')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('groups', '0003_leaderboard_entry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='groupinvitation',
+            name='delivered_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='groupinvitation',
+            name='delivery_attempts',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='groupinvitation',
+            name='delivery_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('sent', 'Sent'), ('failed', 'Failed')], default='pending', max_length=10),
+        ),
+        migrations.RunPython(mark_existing_sent, migrations.RunPython.noop),
+    ]
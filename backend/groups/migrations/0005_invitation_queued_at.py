@@ -0,0 +1,19 @@
+# Generated by Django 5.1.6 on 2026-10-18 02:42
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('groups', '0004_invitation_delivery_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='groupinvitation',
+            name='queued_at',
+            field=models.DateTimeField(blank=True, default=django.utils.timezone.now, null=True),
+        ),
+    ]
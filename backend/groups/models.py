@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from django.conf import settings
 import uuid
 
@@ -16,6 +17,7 @@ class Group(models.Model):
     )
     members = models.ManyToManyField(
         settings.AUTH_USER_MODEL,
+        through='GroupMembership',
         related_name='leetcode_groups'
     )
     invite_code = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
@@ -45,6 +47,7 @@ class GroupMembership(models.Model):
     def __str__(self):
         return f"{self.user.username} - {self.group.name} - {self.role}"
 
+
 class GroupInvitation(models.Model):
     """
     Model for storing group invitations
@@ -60,6 +63,17 @@ class GroupInvitation(models.Model):
     accepted = models.BooleanField(default=False)
     token = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
     
+    DELIVERY_STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    )
+    delivery_status = models.CharField(max_length=10, choices=DELIVERY_STATUS_CHOICES, default='pending')
+    delivery_attempts = models.IntegerField(default=0)
+    delivered_at = models.DateTimeField(null=True, blank=True)
+    # When the invitation was last queued for sending; None if queueing failed
+    queued_at = models.DateTimeField(null=True, blank=True, default=timezone.now)
+    
     def __str__(self):
         return f"Invitation to {self.group.name} for {self.email}"
 
@@ -78,3 +92,40 @@ class GroupChallenge(models.Model):
     
     def __str__(self):
         return f"{self.title} - {self.group.name}"
+
+class LeaderboardEntry(models.Model):
+    """
+    Model for storing a member's standing on a group leaderboard, or on a
+    challenge leaderboard when challenge is set
+    """
+    group = models.ForeignKey(Group, on_delete=models.CASCADE, related_name='leaderboard_entries')
+    challenge = models.ForeignKey(
+        GroupChallenge,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='leaderboard_entries'
+    )
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='leaderboard_entries')
+    easy_solved = models.IntegerField(default=0)
+    medium_solved = models.IntegerField(default=0)
+    hard_solved = models.IntegerField(default=0)
+    points = models.IntegerField(default=0)
+    last_solved_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['group', 'user'],
+                condition=models.Q(challenge__isnull=True),
+                name='unique_group_leaderboard_entry'
+            ),
+            models.UniqueConstraint(fields=['challenge', 'user'], name='unique_challenge_leaderboard_entry'),
+        ]
+        indexes = [
+            models.Index(fields=['group', 'challenge', '-points', 'last_solved_at'], name='leaderboard_rank_idx'),
+        ]
+    
+    def __str__(self):
+        board = self.challenge.title if self.challenge_id else self.group.name
+        return f"{self.user.username} - {board} - {self.points} points"
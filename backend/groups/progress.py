@@ -0,0 +1,119 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Min, Q
+from submissions.models import Submission
+from .models import GroupChallenge, GroupMembership
+
+PROGRESS_CACHE_KEY = 'groups:challenge_progress:{challenge_id}'
+PROGRESS_TIMEOUT = 60 * 60
+
+# Cell values of the status matrix
+NOT_ATTEMPTED, ATTEMPTED, SOLVED = 0, 1, 2
+PROGRESS_STATUSES = ('not_attempted', 'attempted', 'solved')
+
+def build_challenge_progress(challenge):
+    """
+    Build the members x problems progress matrix of a challenge: problems
+    and members, then one grouped query over their submissions in the
+    challenge window.
+    
+    Rows are members and columns are problems, each in the order of the
+    member and problem lists.
+    """
+    problems = list(
+        challenge.problems.order_by('leetcode_id').values_list('id', 'leetcode_id', 'title', 'slug', 'difficulty')
+    )
+    members = list(
+        GroupMembership.objects.filter(group_id=challenge.group_id)
+        .order_by('user__username')
+        .values_list('user_id', 'user__username')
+    )
+    column = {problem[0]: i for i, problem in enumerate(problems)}
+    row = {member[0]: i for i, member in enumerate(members)}
+    
+    status = [[NOT_ATTEMPTED] * len(problems) for _ in members]
+    attempts = [[0] * len(problems) for _ in members]
+    first_accepted = [[None] * len(problems) for _ in members]
+    
+    for user_id, problem_id, count, accepted_at in (
+        Submission.objects.filter(
+            user_id__in=GroupMembership.objects.filter(group_id=challenge.group_id).values('user_id'),
+            problem__in=challenge.problems.values('id'),
+            submission_time__range=(challenge.start_date, challenge.end_date),
+        )
+        .values('user_id', 'problem_id')
+        .annotate(
+            attempts=Count('id'),
+            first_accepted=Min('submission_time', filter=Q(status='accepted')),
+        )
+        .order_by()
+        .values_list('user_id', 'problem_id', 'attempts', 'first_accepted')
+    ):
+        # Members who joined after the lists were read have no row
+        if user_id not in row:
+            continue
+        i, j = row[user_id], column[problem_id]
+        status[i][j] = SOLVED if accepted_at else ATTEMPTED
+        attempts[i][j] = count
+        first_accepted[i][j] = accepted_at
+    
+    return {
+        "challenge": challenge.id,
+        "start_date": challenge.start_date,
+        "end_date": challenge.end_date,
+        "statuses": PROGRESS_STATUSES,
+        "members": {
+            "id": [member[0] for member in members],
+            "username": [member[1] for member in members],
+            "solved": [cells.count(SOLVED) for cells in status],
+        },
+        "problems": {
+            "id": [problem[0] for problem in problems],
+            "leetcode_id": [problem[1] for problem in problems],
+            "title": [problem[2] for problem in problems],
+            "slug": [problem[3] for problem in problems],
+            "difficulty": [problem[4] for problem in problems],
+            "solved": [sum(cells[j] == SOLVED for cells in status) for j in range(len(problems))],
+        },
+        "status": status,
+        "attempts": attempts,
+        "first_accepted": first_accepted,
+    }
+
+def get_challenge_progress(challenge):
+    """
+    Return the progress matrix from the cache, building it on a miss. The
+    cache is dropped when submissions, members or the challenge change, and
+    kept no longer than DERIVED_CACHE_TIMEOUT for processes that didn't see
+    the change.
+    """
+    key = PROGRESS_CACHE_KEY.format(challenge_id=challenge.id)
+    progress = cache.get(key)
+    if progress is None:
+        progress = build_challenge_progress(challenge)
+        cache.set(key, progress, min(PROGRESS_TIMEOUT, settings.DERIVED_CACHE_TIMEOUT))
+    return progress
+
+def invalidate_challenge_progress(challenge_ids):
+    cache.delete_many([PROGRESS_CACHE_KEY.format(challenge_id=challenge_id) for challenge_id in challenge_ids])
+
+def invalidate_group_progress(group_id):
+    """
+    Drop the progress of every challenge in a group, for membership changes
+    """
+    invalidate_challenge_progress(GroupChallenge.objects.filter(group_id=group_id).values_list('id', flat=True))
+
+def invalidate_submission_progress(submission):
+    """
+    Drop the progress of the challenges a submission counts towards: those
+    of the user's groups that include the problem and were running at the
+    time
+    """
+    invalidate_challenge_progress(
+        GroupChallenge.objects.filter(
+            group__in=GroupMembership.objects.filter(user_id=submission.user_id).values('group_id'),
+            problems=submission.problem_id,
+            start_date__lte=submission.submission_time,
+            end_date__gte=submission.submission_time,
+        ).values_list('id', flat=True)
+    )
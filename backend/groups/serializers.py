@@ -1,6 +1,8 @@
+from django.conf import settings
 from rest_framework import serializers
-from .models import Group, GroupMembership, GroupInvitation, GroupChallenge
-from users.serializers import UserSerializer
+from .leaderboard import rebuild_board
+from .models import Group, GroupMembership, GroupInvitation, GroupChallenge, LeaderboardEntry
+from users.serializers import UserSerializer, UserSummarySerializer
 
 class GroupMembershipSerializer(serializers.ModelSerializer):
     user_details = UserSerializer(source='user', read_only=True)
@@ -22,6 +24,9 @@ class GroupSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'created_at', 'invite_code')
     
     def get_member_count(self, obj):
+        # Group querysets annotate the count; a bare instance costs a query
+        if hasattr(obj, 'member_count'):
+            return obj.member_count
         return obj.members.count()
     
     def create(self, validated_data):
@@ -35,24 +40,50 @@ class GroupSerializer(serializers.ModelSerializer):
             group=group,
             role='admin'
         )
+        rebuild_board(group.id, user_ids=[group.created_by_id])
         
         return group
 
+class GroupSummarySerializer(serializers.ModelSerializer):
+    """
+    Minimal group representation for embedding in other resources
+    """
+    class Meta:
+        model = Group
+        fields = ('id', 'name', 'description', 'is_private')
+
 class GroupInvitationSerializer(serializers.ModelSerializer):
     invited_by_details = UserSerializer(source='invited_by', read_only=True)
-    group_details = GroupSerializer(source='group', read_only=True)
+    group_details = GroupSummarySerializer(source='group', read_only=True)
     
     class Meta:
         model = GroupInvitation
         fields = ('id', 'group', 'group_details', 'email', 'invited_by', 
-                  'invited_by_details', 'created_at', 'accepted', 'token')
-        read_only_fields = ('id', 'created_at', 'token')
+                  'invited_by_details', 'created_at', 'accepted', 'token',
+                  'delivery_status', 'delivered_at')
+        read_only_fields = ('id', 'created_at', 'token', 'delivery_status', 'delivered_at')
+    
+    def validate_email(self, email):
+        return email.lower()
     
     def create(self, validated_data):
         # Set the invited_by field to the current user
         validated_data['invited_by'] = self.context['request'].user
         return super().create(validated_data)
 
+class GroupInvitationBulkSerializer(serializers.Serializer):
+    """
+    Input for inviting a list of emails to a group in one request
+    """
+    group = serializers.PrimaryKeyRelatedField(queryset=Group.objects.all())
+    emails = serializers.ListField(
+        child=serializers.EmailField(), allow_empty=False, max_length=settings.MAX_BULK_INVITATIONS
+    )
+    
+    def validate_emails(self, emails):
+        # Drop repeats, ignoring case
+        return list(dict.fromkeys(email.lower() for email in emails))
+
 class GroupChallengeSerializer(serializers.ModelSerializer):
     created_by_details = UserSerializer(source='created_by', read_only=True)
     
@@ -66,4 +97,13 @@ class GroupChallengeSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         # Set the created_by field to the current user
         validated_data['created_by'] = self.context['request'].user
-        return super().create(validated_data)
\ No newline at end of file
+        return super().create(validated_data)
+
+class LeaderboardEntrySerializer(serializers.ModelSerializer):
+    rank = serializers.IntegerField(read_only=True)
+    user_details = UserSummarySerializer(source='user', read_only=True)
+    
+    class Meta:
+        model = LeaderboardEntry
+        fields = ('rank', 'user', 'user_details', 'points', 'easy_solved', 
+                  'medium_solved', 'hard_solved', 'last_solved_at')
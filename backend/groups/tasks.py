@@ -0,0 +1,107 @@
+import logging
+from celery import shared_task
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import GroupInvitation
+
+logger = logging.getLogger(__name__)
+
+INVITATION_BODY = '''
+Hello,
+
+You have been invited by {inviter} to join the "{group}" group on LeetCode Tracker.
+
+To accept this invitation, please click on the following link: {invite_url}
+
+If you don't have an account, you'll be able to register.
+
+Best regards,
+LeetCode Tracker Team
+'''
+
+def invitation_message(invitation, connection=None):
+    group_name = invitation.group.name
+    return EmailMessage(
+        subject=f'Invitation to join the "{group_name}" group on LeetCode Tracker',
+        body=INVITATION_BODY.format(
+            inviter=invitation.invited_by.username,
+            group=group_name,
+            invite_url=f"{settings.FRONTEND_URL}/groups/join/{invitation.token}",
+        ),
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[invitation.email],
+        connection=connection,
+    )
+
+def queue_invitation_emails(invitation_ids):
+    """
+    Send invitation emails from Celery, in batches, once the invitations
+    are committed
+    """
+    batch_size = settings.INVITATION_EMAIL_BATCH_SIZE
+    batches = [invitation_ids[i:i + batch_size] for i in range(0, len(invitation_ids), batch_size)]
+    for batch in batches:
+        transaction.on_commit(lambda batch=batch: _queue_batch(batch))
+
+def _queue_batch(invitation_ids):
+    try:
+        send_invitation_emails.delay(invitation_ids)
+    except Exception:
+        # The invitations are already committed, so don't fail the request;
+        # leave them pending with no queue time, free to resend straight away
+        logger.exception("Failed to queue %d invitation emails", len(invitation_ids))
+        GroupInvitation.objects.filter(id__in=invitation_ids, delivery_status='pending').update(queued_at=None)
+
+@shared_task(bind=True, max_retries=settings.INVITATION_EMAIL_MAX_RETRIES)
+def send_invitation_emails(self, invitation_ids):
+    """
+    Send a batch of invitation emails over one SMTP connection.
+    
+    Messages that fail are retried with exponential backoff; once retries
+    run out they are marked failed. Returns the number sent.
+    """
+    invitations = list(
+        GroupInvitation.objects.filter(id__in=invitation_ids, delivery_status='pending')
+        .select_related('group', 'invited_by')
+    )
+    if not invitations:
+        return 0
+    
+    sent = []
+    failed = []
+    connection = get_connection()
+    try:
+        connection.open()
+        for invitation in invitations:
+            try:
+                invitation_message(invitation, connection).send()
+                sent.append(invitation.id)
+            except Exception:
+                logger.exception("Failed to send invitation %s", invitation.id)
+                failed.append(invitation.id)
+    except Exception:
+        # Couldn't reach the mail server at all
+        logger.exception("Failed to open a mail connection for %d invitations", len(invitations))
+        failed = [invitation.id for invitation in invitations if invitation.id not in sent]
+    finally:
+        connection.close()
+    
+    GroupInvitation.objects.filter(id__in=sent).update(
+        delivery_status='sent', delivery_attempts=F('delivery_attempts') + 1, delivered_at=timezone.now()
+    )
+    GroupInvitation.objects.filter(id__in=failed).update(delivery_attempts=F('delivery_attempts') + 1)
+    
+    if failed:
+        if self.request.retries >= self.max_retries:
+            GroupInvitation.objects.filter(id__in=failed).update(delivery_status='failed')
+        else:
+            countdown = min(
+                settings.INVITATION_EMAIL_BACKOFF_BASE * 2 ** self.request.retries,
+                settings.INVITATION_EMAIL_BACKOFF_MAX,
+            )
+            GroupInvitation.objects.filter(id__in=failed).update(queued_at=timezone.now())
+            raise self.retry(args=[failed], countdown=countdown)
+    return len(sent)
@@ -1,3 +1,403 @@
-from django.test import TestCase
+import time
+from datetime import timedelta
+from unittest import mock
+from celery.exceptions import Retry
+from django.core import mail
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from problems.models import Problem
+from submissions.models import Submission
+from users.models import User
+from .leaderboard import rebuild_group_leaderboards, record_leaderboard_solve
+from .models import Group, GroupMembership, GroupInvitation, GroupChallenge, LeaderboardEntry
+from .tasks import send_invitation_emails
+from .progress import ATTEMPTED, NOT_ATTEMPTED, SOLVED, build_challenge_progress, get_challenge_progress
 
-# Create your tests here.
+class GroupQueryCountTests(TestCase):
+    """
+    Group, invitation and challenge listings should cost a fixed number of
+    queries however many groups they hold
+    """
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='owner', email='owner@example.com', password='x')
+        cls.problem = Problem.objects.create(
+            leetcode_id=1, title='Two Sum', slug='two-sum',
+            description='<p>Description</p>', difficulty='easy', category='Algorithms'
+        )
+    
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.groups = 0
+        cache.clear()
+    
+    def create_groups(self, count, members=3):
+        for _ in range(count):
+            self.groups += 1
+            creator = User.objects.create_user(
+                username=f'creator{self.groups}', email=f'creator{self.groups}@example.com', password='x'
+            )
+            group = Group.objects.create(name=f'Group {self.groups}', created_by=creator)
+            GroupMembership.objects.create(user=creator, group=group, role='admin')
+            GroupMembership.objects.create(user=self.user, group=group)
+            for i in range(members - 2):
+                member = User.objects.create_user(
+                    username=f'member{self.groups}-{i}', email=f'member{self.groups}-{i}@example.com', password='x'
+                )
+                GroupMembership.objects.create(user=member, group=group)
+            GroupInvitation.objects.create(group=group, email=f'guest{self.groups}@example.com', invited_by=self.user)
+            challenge = GroupChallenge.objects.create(
+                group=group, title=f'Challenge {self.groups}', description='Solve it',
+                start_date=timezone.now(), end_date=timezone.now() + timedelta(days=7), created_by=creator
+            )
+            challenge.problems.add(self.problem)
+    
+    def assert_constant_queries(self, url, queries):
+        for count in (1, 5):
+            self.create_groups(count)
+            with self.assertNumQueries(queries):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+        return response
+    
+    def results(self, response):
+        return response.data['results'] if isinstance(response.data, dict) else response.data
+    
+    def test_group_list_query_budget(self):
+        # Memberships, the page count and the page itself
+        response = self.assert_constant_queries('/api/groups/', 3)
+        groups = self.results(response)
+        self.assertEqual(len(groups), 6)
+        self.assertTrue(all(group['member_count'] == 3 for group in groups))
+    
+    def test_my_groups_query_budget(self):
+        response = self.assert_constant_queries('/api/groups/my_groups/', 2)
+        self.assertEqual(len(response.data), 6)
+        self.assertEqual(response.data[0]['created_by_details']['username'], 'creator6')
+    
+    def test_invitation_list_query_budget(self):
+        response = self.assert_constant_queries('/api/invitations/', 2)
+        invitation = self.results(response)[0]
+        self.assertEqual(set(invitation['group_details']), {'id', 'name', 'description', 'is_private'})
+    
+    def test_challenge_list_query_budget(self):
+        # Memberships, the page count, the page and the prefetched problems
+        response = self.assert_constant_queries('/api/challenges/', 4)
+        self.assertEqual(self.results(response)[0]['problems'], [self.problem.id])
+    
+    def test_member_count_is_not_narrowed_by_membership_filter(self):
+        self.create_groups(1, members=10)
+        response = self.client.get('/api/groups/my_groups/')
+        self.assertEqual(response.data[0]['member_count'], 10)
+    
+    def test_membership_checks_share_one_lookup(self):
+        self.create_groups(1)
+        group = Group.objects.get()
+        # The memberships, shared by the queryset and the permission check, the group and its members
+        with self.assertNumQueries(3):
+            response = self.client.get(f'/api/groups/{group.id}/members/')
+        self.assertEqual(len(response.data), 3)
+    
+    def test_removed_members_lose_access_immediately(self):
+        self.create_groups(1)
+        group = Group.objects.get()
+        self.assertEqual(self.client.get(f'/api/groups/{group.id}/members/').status_code, 200)
+        
+        # Removed the way a bulk delete or another process would, without the model hooks
+        GroupMembership.objects.filter(group=group, user=self.user).delete()
+        self.assertEqual(self.client.get(f'/api/groups/{group.id}/members/').status_code, 404)
+        self.assertEqual(self.client.get('/api/groups/my_groups/').data, [])
+    
+    def test_membership_follows_joins(self):
+        self.create_groups(1)
+        self.client.get('/api/groups/my_groups/')
+        group = Group.objects.create(name='Open group', created_by=self.user, is_private=False)
+        response = self.client.post(f'/api/groups/{group.id}/join/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(self.client.get('/api/groups/my_groups/').data), 2)
+        self.assertEqual(self.client.post(f'/api/groups/{group.id}/join/').status_code, 400)
+
+class LeaderboardConsistencyTests(TestCase):
+    """
+    Boards kept up to date as submissions are created, accepted,
+    un-accepted and deleted match a rebuild from scratch
+    """
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.problems = [
+            Problem.objects.create(
+                leetcode_id=i, title=f'Problem {i}', slug=f'problem-{i}',
+                description='<p>Description</p>', difficulty=difficulty, category='Algorithms'
+            )
+            for i, difficulty in enumerate(('easy', 'medium', 'hard'), start=1)
+        ]
+        cls.user = User.objects.create_user(username='student', email='student@example.com', password='x')
+        cls.group = Group.objects.create(name='Study group', created_by=cls.user)
+        GroupMembership.objects.create(user=cls.user, group=cls.group)
+        cls.challenge = GroupChallenge.objects.create(
+            group=cls.group, title='Week one', description='Solve them',
+            start_date=timezone.now() - timedelta(days=1), end_date=timezone.now() + timedelta(days=7),
+            created_by=cls.user
+        )
+        cls.challenge.problems.add(*cls.problems[1:])
+    
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+    
+    def submit(self, problem, status):
+        response = self.client.post('/api/submissions/', {
+            'problem': problem.id, 'code': 'pass', 'language': 'python', 'status': status,
+        })
+        self.assertEqual(response.status_code, 201)
+        return response.data['id']
+    
+    def boards(self):
+        return list(
+            LeaderboardEntry.objects.order_by('challenge_id', 'user_id').values_list(
+                'challenge_id', 'user_id', 'points', 'easy_solved', 'medium_solved', 'hard_solved', 'last_solved_at'
+            )
+        )
+    
+    def assert_matches_rebuild(self):
+        incremental = self.boards()
+        rebuild_group_leaderboards(self.group)
+        self.assertEqual(incremental, self.boards())
+        return incremental
+    
+    def points(self, challenge=None):
+        return LeaderboardEntry.objects.get(user=self.user, challenge=challenge).points
+    
+    def test_incremental_boards_match_a_rebuild(self):
+        easy, medium, hard = self.problems
+        self.submit(easy, 'wrong_answer')
+        first_easy = self.submit(easy, 'accepted')
+        self.submit(easy, 'accepted')
+        pending_medium = self.submit(medium, 'wrong_answer')
+        self.submit(medium, 'accepted')
+        hard_solve = self.submit(hard, 'accepted')
+        self.assertEqual((self.points(), self.points(self.challenge)), (1 + 2 + 4, 2 + 4))
+        self.assert_matches_rebuild()
+        
+        # The older medium submission takes over the solve
+        self.client.patch(f'/api/submissions/{pending_medium}/', {'status': 'accepted'})
+        self.assert_matches_rebuild()
+        
+        # The second easy solve keeps the problem on the board
+        self.client.patch(f'/api/submissions/{first_easy}/', {'status': 'wrong_answer'})
+        self.assertEqual(self.points(), 7)
+        
+        self.client.delete(f'/api/submissions/{hard_solve}/')
+        self.assertEqual((self.points(), self.points(self.challenge)), (1 + 2, 2))
+        self.assert_matches_rebuild()
+    
+    def test_racing_first_accepts_count_once(self):
+        # Both accepts were written before either was credited
+        older, newer = [
+            Submission.objects.create(user=self.user, problem=self.problems[2], code='pass', language='python', status='accepted')
+            for _ in range(2)
+        ]
+        record_leaderboard_solve(newer)
+        record_leaderboard_solve(older)
+        self.assertEqual((self.points(), self.points(self.challenge)), (4, 4))
+        self.assert_matches_rebuild()
+
+class ChallengeProgressTests(TestCase):
+    """
+    The challenge progress matrix is built in a fixed number of queries and
+    cached until submissions change it
+    """
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.problems = [
+            Problem.objects.create(
+                leetcode_id=i, title=f'Problem {i}', slug=f'problem-{i}',
+                description='<p>Description</p>', difficulty='easy', category='Algorithms'
+            )
+            for i in range(1, 4)
+        ]
+        cls.admin = User.objects.create_user(username='admin', email='admin@example.com', password='x')
+        cls.member = User.objects.create_user(username='member', email='member@example.com', password='x')
+        cls.group = Group.objects.create(name='Study group', created_by=cls.admin)
+        GroupMembership.objects.create(user=cls.admin, group=cls.group, role='admin')
+        GroupMembership.objects.create(user=cls.member, group=cls.group)
+        cls.challenge = GroupChallenge.objects.create(
+            group=cls.group, title='Week one', description='Solve them',
+            start_date=timezone.now() - timedelta(days=1), end_date=timezone.now() + timedelta(days=7),
+            created_by=cls.admin
+        )
+        cls.challenge.problems.add(*cls.problems)
+    
+    def setUp(self):
+        cache.clear()
+        self.admin_client = APIClient()
+        self.admin_client.force_authenticate(self.admin)
+        self.member_client = APIClient()
+        self.member_client.force_authenticate(self.member)
+        self.url = f'/api/challenges/{self.challenge.id}/progress/'
+    
+    def submit(self, problem, status):
+        self.member_client.post('/api/submissions/', {
+            'problem': problem.id, 'code': 'pass', 'language': 'python', 'status': status,
+        })
+    
+    def test_matrix_is_built_in_three_queries(self):
+        self.submit(self.problems[0], 'wrong_answer')
+        self.submit(self.problems[0], 'accepted')
+        self.submit(self.problems[1], 'wrong_answer')
+        # Problems, members, then one grouped query over their submissions
+        with self.assertNumQueries(3):
+            progress = build_challenge_progress(self.challenge)
+        
+        self.assertEqual(progress['members']['username'], ['admin', 'member'])
+        self.assertEqual(progress['status'], [[NOT_ATTEMPTED] * 3, [SOLVED, ATTEMPTED, NOT_ATTEMPTED]])
+        self.assertEqual(progress['attempts'][1], [2, 1, 0])
+        self.assertEqual(progress['problems']['solved'], [1, 0, 0])
+    
+    def test_new_submissions_invalidate_the_cached_matrix(self):
+        self.assertEqual(self.admin_client.get(self.url).data['members']['solved'], [0, 0])
+        with self.assertNumQueries(0):
+            get_challenge_progress(self.challenge)
+        
+        self.submit(self.problems[2], 'accepted')
+        self.assertEqual(self.admin_client.get(self.url).data['members']['solved'], [0, 1])
+    
+    @override_settings(DERIVED_CACHE_TIMEOUT=1)
+    def test_matrix_expires_for_other_processes(self):
+        get_challenge_progress(self.challenge)
+        # A submission another process wrote, without invalidating this cache
+        Submission.objects.create(user=self.member, problem=self.problems[0], code='pass', language='python', status='accepted')
+        self.assertEqual(get_challenge_progress(self.challenge)['members']['solved'], [0, 0])
+        time.sleep(1.1)
+        self.assertEqual(get_challenge_progress(self.challenge)['members']['solved'], [0, 1])
+
+@override_settings(
+    EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend', INVITATION_EMAIL_BATCH_SIZE=2,
+)
+class InvitationDeliveryTests(TestCase):
+    """
+    Invitations are sent from Celery in batches, retried when sending fails,
+    and matched on email case-insensitively
+    """
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='owner', email='owner@example.com', password='x')
+        cls.group = Group.objects.create(name='Study group', created_by=cls.user)
+        GroupMembership.objects.create(user=cls.user, group=cls.group, role='admin')
+    
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        delay = mock.patch.object(send_invitation_emails, 'delay')
+        self.delay = delay.start()
+        self.addCleanup(delay.stop)
+    
+    def invite(self, data):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                '/api/invitations/', {'group': self.group.id, 'invited_by': self.user.id, **data}, format='json'
+            )
+        self.assertEqual(response.status_code, 201)
+        return response.data
+    
+    def queued_batches(self):
+        return [call.args[0] for call in self.delay.call_args_list]
+    
+    def failing_for(self, *emails):
+        """
+        Patch message sending to fail for the given addresses
+        """
+        send = mail.EmailMessage.send
+        
+        def send_or_fail(message, *args, **kwargs):
+            if set(message.to) & set(emails):
+                raise OSError("Connection reset")
+            return send(message, *args, **kwargs)
+        return mock.patch.object(mail.EmailMessage, 'send', autospec=True, side_effect=send_or_fail)
+    
+    def statuses(self):
+        return dict(GroupInvitation.objects.values_list('email', 'delivery_status'))
+    
+    def test_bulk_invitations_are_sent_in_batches(self):
+        emails = [f'guest{i}@example.com' for i in range(5)]
+        data = self.invite({'emails': emails})
+        ids = [invitation['id'] for invitation in data['invitations']]
+        self.assertEqual(self.queued_batches(), [ids[:2], ids[2:4], ids[4:]])
+        
+        self.assertEqual(sum(send_invitation_emails(batch) for batch in self.queued_batches()), 5)
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), emails)
+        self.assertEqual(set(self.statuses().values()), {'sent'})
+        # Sent invitations aren't sent again
+        self.assertEqual(send_invitation_emails(ids[:2]), 0)
+    
+    def test_failed_messages_are_retried_then_marked_failed(self):
+        ids = [invitation['id'] for invitation in self.invite({'emails': ['ok@example.com', 'bad@example.com']})['invitations']]
+        with self.failing_for('bad@example.com'), self.assertLogs('groups.tasks', 'ERROR'):
+            with self.assertRaises(Retry):
+                send_invitation_emails(ids)
+            self.assertEqual(self.statuses(), {'ok@example.com': 'sent', 'bad@example.com': 'pending'})
+            
+            # Run eagerly, every retry runs straight away until they run out
+            send_invitation_emails.apply(args=[[ids[1]]])
+        
+        bad = GroupInvitation.objects.get(email='bad@example.com')
+        self.assertEqual(bad.delivery_status, 'failed')
+        self.assertEqual(bad.delivery_attempts, 2 + send_invitation_emails.max_retries)
+        self.assertEqual(len(mail.outbox), 1)
+    
+    def test_transient_failures_are_sent_on_retry(self):
+        ids = [self.invite({'email': 'flaky@example.com'})['id']]
+        with self.failing_for('flaky@example.com'), self.assertLogs('groups.tasks', 'ERROR'):
+            with self.assertRaises(Retry):
+                send_invitation_emails(ids)
+        self.assertEqual(send_invitation_emails.apply(args=[ids], retries=1).get(), 1)
+        self.assertEqual(GroupInvitation.objects.get().delivery_attempts, 2)
+    
+    def test_emails_are_matched_case_insensitively(self):
+        self.assertEqual(self.invite({'email': 'Guest@Example.com'})['email'], 'guest@example.com')
+        # Left over from before emails were lowercased
+        GroupInvitation.objects.filter(email='guest@example.com').update(email='Guest@Example.com')
+        
+        data = self.invite({'emails': ['GUEST@example.com', 'Other@example.com']})
+        self.assertEqual(data['skipped'], ['guest@example.com'])
+        self.assertEqual([invitation['email'] for invitation in data['invitations']], ['other@example.com'])
+    
+    def test_resend_waits_for_pending_delivery(self):
+        invitation = self.invite({'email': 'guest@example.com'})
+        url = f"/api/invitations/{invitation['id']}/resend/"
+        self.assertEqual(self.client.post(url).status_code, 400)
+        
+        send_invitation_emails([invitation['id']])
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url)
+        self.assertEqual(response.data['delivery_status'], 'pending')
+        self.assertEqual(self.queued_batches(), [[invitation['id']]] * 2)
+    
+    def test_stale_pending_invitations_can_be_resent(self):
+        invitation = self.invite({'email': 'guest@example.com'})
+        url = f"/api/invitations/{invitation['id']}/resend/"
+        # The worker that had it never reported back
+        GroupInvitation.objects.update(queued_at=timezone.now() - timedelta(hours=3))
+        with override_settings(INVITATION_EMAIL_STALE_AFTER=2 * 60 * 60):
+            self.assertEqual(self.client.post(url).status_code, 200)
+            self.assertEqual(self.client.post(url).status_code, 400)
+    
+    def test_invitations_survive_the_broker_being_down(self):
+        self.delay.side_effect = OSError("Connection refused")
+        with self.assertLogs('groups.tasks', 'ERROR'):
+            invitation = self.invite({'email': 'guest@example.com'})
+        self.assertIsNone(GroupInvitation.objects.get().queued_at)
+        
+        # Nothing is in flight, so it can be resent at once
+        self.delay.side_effect = None
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(f"/api/invitations/{invitation['id']}/resend/")
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNotNone(GroupInvitation.objects.get().queued_at)
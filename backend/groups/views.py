@@ -1,53 +1,88 @@
 from django.shortcuts import render
 from rest_framework import viewsets, permissions, filters, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied
 from rest_framework.response import Response
-from django.shortcuts import get_object_or_404
-from django.core.mail import send_mail
+from datetime import timedelta
 from django.conf import settings
+from django.shortcuts import get_object_or_404
+from django.contrib.auth import get_user_model
+from django.db.models import Count, Q
+from django.db.models.functions import Lower
+from django.utils import timezone
+from submissions.models import Submission
+from users.serializers import UserSerializer
+from .leaderboard import (
+    DEFAULT_LEADERBOARD_SIZE, MAX_LEADERBOARD_SIZE, drop_board, rebuild_board,
+    rebuild_group_leaderboards, remove_member_leaderboards, top_entries, user_entry
+)
+from .membership import get_group_role, get_group_roles
+from .tasks import queue_invitation_emails
+from .progress import get_challenge_progress, invalidate_challenge_progress, invalidate_group_progress
 from .models import Group, GroupMembership, GroupInvitation, GroupChallenge
 from .serializers import (
     GroupSerializer, GroupMembershipSerializer, 
-    GroupInvitationSerializer, GroupChallengeSerializer
+    GroupInvitationSerializer, GroupInvitationBulkSerializer, GroupChallengeSerializer,
+    LeaderboardEntrySerializer
 )
 
+def group_id_of(obj):
+    """
+    The id of the group a permission check is about, or None
+    """
+    if isinstance(obj, Group):
+        return obj.id
+    # For other models that have a group attribute
+    return getattr(obj, 'group_id', None)
+
 class IsGroupAdmin(permissions.BasePermission):
     """
     Custom permission to only allow group admins to perform actions
     """
     def has_object_permission(self, request, view, obj):
-        # Check if the user is an admin for this group
-        if isinstance(obj, Group):
-            return GroupMembership.objects.filter(
-                user=request.user, group=obj, role='admin'
-            ).exists()
-        
-        # For other models that have a group attribute
-        if hasattr(obj, 'group'):
-            return GroupMembership.objects.filter(
-                user=request.user, group=obj.group, role='admin'
-            ).exists()
-        
-        return False
+        return get_group_role(request, group_id_of(obj)) == 'admin'
 
 class IsGroupMember(permissions.BasePermission):
     """
     Custom permission to only allow group members to perform actions
     """
     def has_object_permission(self, request, view, obj):
-        # Check if the user is a member of this group
-        if isinstance(obj, Group):
-            return GroupMembership.objects.filter(
-                user=request.user, group=obj
-            ).exists()
-        
-        # For other models that have a group attribute
-        if hasattr(obj, 'group'):
-            return GroupMembership.objects.filter(
-                user=request.user, group=obj.group
-            ).exists()
-        
-        return False
+        return get_group_role(request, group_id_of(obj)) is not None
+
+def with_member_count(groups):
+    """
+    Join groups to their creator and count their members in the same query
+    """
+    return groups.select_related('created_by').annotate(member_count=Count('members', distinct=True))
+
+def member_joined(group, user_id):
+    """
+    Bring a group's leaderboards and challenge progress up to date after a
+    member joins
+    """
+    rebuild_group_leaderboards(group, [user_id])
+    invalidate_group_progress(group.id)
+
+def member_left(group, user_id):
+    remove_member_leaderboards(group.id, user_id)
+    invalidate_group_progress(group.id)
+
+def leaderboard_response(request, group_id, challenge_id=None):
+    """
+    The top ?limit= entries of a board plus the requesting user's own entry
+    """
+    try:
+        limit = int(request.query_params.get('limit', DEFAULT_LEADERBOARD_SIZE))
+    except ValueError:
+        limit = DEFAULT_LEADERBOARD_SIZE
+    limit = min(max(limit, 1), MAX_LEADERBOARD_SIZE)
+    
+    entries = top_entries(group_id, challenge_id, limit)
+    me = user_entry(group_id, request.user.id, challenge_id)
+    return Response({
+        "results": LeaderboardEntrySerializer(entries, many=True).data,
+        "me": LeaderboardEntrySerializer(me).data if me else None,
+    })
 
 class GroupViewSet(viewsets.ModelViewSet):
     """
@@ -60,8 +95,12 @@ class GroupViewSet(viewsets.ModelViewSet):
     ordering_fields = ['name', 'created_at']
     
     def get_queryset(self):
-        user = self.request.user
-        return Group.objects.filter(members=user)
+        # Filter by id so the member count join isn't narrowed to this user
+        visible = Q(id__in=list(get_group_roles(self.request)))
+        # Public groups can be joined by id; private ones need the invite code
+        if self.action == 'join':
+            visible |= Q(is_private=False)
+        return with_member_count(Group.objects.filter(visible)).order_by('-created_at', '-id')
     
     def get_permissions(self):
         """
@@ -73,7 +112,7 @@ class GroupViewSet(viewsets.ModelViewSet):
     
     @action(detail=False)
     def my_groups(self, request):
-        groups = Group.objects.filter(members=request.user)
+        groups = self.get_queryset()
         serializer = self.get_serializer(groups, many=True)
         return Response(serializer.data)
     
@@ -83,15 +122,16 @@ class GroupViewSet(viewsets.ModelViewSet):
         user = request.user
         
         # Check if the user is already a member
-        if GroupMembership.objects.filter(user=user, group=group).exists():
+        if get_group_role(request, group.id) is not None:
             return Response({"detail": "You are already a member of this group."}, status=400)
         
         # Check if the group has reached max members
-        if group.members.count() >= group.max_members:
+        if group.member_count >= group.max_members:
             return Response({"detail": "This group has reached its maximum capacity."}, status=400)
         
         # Add user as a member
         GroupMembership.objects.create(user=user, group=group, role='member')
+        member_joined(group, user.id)
         
         return Response({"detail": "You have successfully joined the group."})
     
@@ -103,16 +143,17 @@ class GroupViewSet(viewsets.ModelViewSet):
         if not user_id:
             return Response({"detail": "User ID is required."}, status=400)
         
-        # Don't allow removing the last admin
-        admin_count = GroupMembership.objects.filter(group=group, role='admin').count()
-        is_admin = GroupMembership.objects.filter(group=group, user_id=user_id, role='admin').exists()
+        membership = get_object_or_404(GroupMembership, group=group, user_id=user_id)
         
-        if admin_count <= 1 and is_admin:
+        # Don't allow removing the last admin
+        if membership.role == 'admin' and not GroupMembership.objects.filter(
+            group=group, role='admin'
+        ).exclude(id=membership.id).exists():
             return Response({"detail": "Cannot remove the last admin of the group."}, status=400)
         
         # Remove the membership
-        membership = get_object_or_404(GroupMembership, group=group, user_id=user_id)
         membership.delete()
+        member_left(group, membership.user_id)
         
         return Response({"detail": "Member removed successfully."})
     
@@ -131,7 +172,7 @@ class GroupViewSet(viewsets.ModelViewSet):
         user = request.user
         
         # Check if the user is already a member
-        if GroupMembership.objects.filter(user=user, group=group).exists():
+        if get_group_role(request, group.id) is not None:
             return Response({"detail": "You are already a member of this group."}, status=400)
         
         # Check if the group has reached max members
@@ -140,6 +181,7 @@ class GroupViewSet(viewsets.ModelViewSet):
         
         # Add user as a member
         GroupMembership.objects.create(user=user, group=group, role='member')
+        member_joined(group, user.id)
         
         return Response({
             "detail": "You have successfully joined the group.",
@@ -149,9 +191,14 @@ class GroupViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['get'], permission_classes=[permissions.IsAuthenticated, IsGroupMember])
     def members(self, request, pk=None):
         group = self.get_object()
-        memberships = GroupMembership.objects.filter(group=group)
+        memberships = GroupMembership.objects.filter(group=group).select_related('user')
         serializer = GroupMembershipSerializer(memberships, many=True)
         return Response(serializer.data)
+    
+    @action(detail=True, methods=['get'], permission_classes=[permissions.IsAuthenticated, IsGroupMember])
+    def leaderboard(self, request, pk=None):
+        group = self.get_object()
+        return leaderboard_response(request, group.id)
 
 class GroupInvitationViewSet(viewsets.ModelViewSet):
     """
@@ -161,39 +208,74 @@ class GroupInvitationViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        return GroupInvitation.objects.filter(invited_by=self.request.user)
+        return (
+            GroupInvitation.objects.filter(invited_by=self.request.user)
+            .select_related('group', 'invited_by')
+            .order_by('-created_at', '-id')
+        )
+    
+    def check_group_member(self, group):
+        if get_group_role(self.request, group.id) is None:
+            raise PermissionDenied("Only group members can send invitations.")
+    
+    def perform_create(self, serializer):
+        self.check_group_member(serializer.validated_data['group'])
+        invitation = serializer.save()
+        queue_invitation_emails([invitation.id])
     
     def create(self, request, *args, **kwargs):
-        serializer = self.get_serializer(data=request.data)
+        # A list of emails invites them all at once
+        if 'emails' in request.data:
+            return self.bulk_invite(request)
+        return super().create(request, *args, **kwargs)
+    
+    def bulk_invite(self, request):
+        serializer = GroupInvitationBulkSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        self.perform_create(serializer)
-        
-        # Send invitation email
-        invitation = serializer.instance
-        group_name = invitation.group.name
-        invite_url = f"{settings.FRONTEND_URL}/groups/join/{invitation.token}"
-        
-        send_mail(
-            subject=f'Invitation to join the "{group_name}" group on LeetCode Tracker',
-            message=f'''
-            Hello,
-            
-            You have been invited by {request.user.username} to join the "{group_name}" group on LeetCode Tracker.
-            
-            To accept this invitation, please click on the following link: {invite_url}
-            
-            If you don't have an account, you'll be able to register.
-            
-            Best regards,
-            LeetCode Tracker Team
-            ''',
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[invitation.email],
-            fail_silently=False,
+        group = serializer.validated_data['group']
+        emails = serializer.validated_data['emails']
+        self.check_group_member(group)
+        
+        # Don't invite anyone twice while an invitation is still open,
+        # whatever the case of the address it went to
+        already_invited = set(
+            GroupInvitation.objects.filter(group=group, accepted=False)
+            .annotate(email_lower=Lower('email'))
+            .filter(email_lower__in=emails)
+            .values_list('email_lower', flat=True)
         )
+        invitations = GroupInvitation.objects.bulk_create([
+            GroupInvitation(group=group, email=email, invited_by=request.user)
+            for email in emails if email not in already_invited
+        ])
+        queue_invitation_emails([invitation.id for invitation in invitations])
         
-        headers = self.get_success_headers(serializer.data)
-        return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
+        return Response({
+            "invitations": GroupInvitationSerializer(invitations, many=True).data,
+            "skipped": sorted(already_invited),
+        }, status=status.HTTP_201_CREATED)
+    
+    @action(detail=True, methods=['post'])
+    def resend(self, request, pk=None):
+        invitation = self.get_object()
+        if invitation.accepted:
+            return Response({"detail": "This invitation has already been accepted."}, status=400)
+        
+        # Claim the send, so an invitation already queued isn't queued twice.
+        # One pending for longer than a send and its retries take was lost.
+        now = timezone.now()
+        stale = now - timedelta(seconds=settings.INVITATION_EMAIL_STALE_AFTER)
+        claimed = GroupInvitation.objects.filter(
+            ~Q(delivery_status='pending') | Q(queued_at__isnull=True) | Q(queued_at__lt=stale),
+            id=invitation.id,
+        ).update(delivery_status='pending', queued_at=now)
+        if not claimed:
+            return Response({"detail": "This invitation is still being sent."}, status=400)
+        
+        invitation.delivery_status = 'pending'
+        invitation.queued_at = now
+        queue_invitation_emails([invitation.id])
+        return Response(self.get_serializer(invitation).data)
     
     @action(detail=False, methods=['post'], permission_classes=[permissions.AllowAny])
     def accept(self, request):
@@ -229,7 +311,7 @@ class GroupInvitationViewSet(viewsets.ModelViewSet):
             }, status=400)
         
         # Check if the user is already a member
-        if GroupMembership.objects.filter(user=user, group=invitation.group).exists():
+        if get_group_role(request, invitation.group_id) is not None:
             return Response({
                 "detail": "You are already a member of this group.",
                 "group": GroupSerializer(invitation.group).data
@@ -241,6 +323,7 @@ class GroupInvitationViewSet(viewsets.ModelViewSet):
             group=invitation.group, 
             role='member'
         )
+        member_joined(invitation.group, user.id)
         
         return Response({
             "detail": "You have successfully joined the group.",
@@ -255,9 +338,16 @@ class GroupChallengeViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated, IsGroupMember]
     
     def get_queryset(self):
-        user = self.request.user
         # Get all challenges for groups the user is a member of
-        return GroupChallenge.objects.filter(group__members=user)
+        challenges = (
+            GroupChallenge.objects.filter(group_id__in=list(get_group_roles(self.request)))
+            .select_related('created_by')
+            .order_by('-start_date', '-id')
+        )
+        # Only the serialized actions list problem ids
+        if self.action in ('list', 'retrieve'):
+            challenges = challenges.prefetch_related('problems')
+        return challenges
     
     def get_permissions(self):
         """
@@ -267,16 +357,55 @@ class GroupChallengeViewSet(viewsets.ModelViewSet):
             self.permission_classes = [permissions.IsAuthenticated, IsGroupAdmin]
         return super().get_permissions()
     
+    def check_group_admin(self, serializer):
+        # Object permissions don't cover the group a challenge is created in or moved to
+        group = serializer.validated_data.get('group')
+        if group is not None and get_group_role(self.request, group.id) != 'admin':
+            raise PermissionDenied("Only group admins can manage challenges.")
+    
+    def perform_create(self, serializer):
+        self.check_group_admin(serializer)
+        challenge = serializer.save()
+        rebuild_board(challenge.group_id, challenge)
+    
+    def perform_update(self, serializer):
+        self.check_group_admin(serializer)
+        challenge = serializer.save()
+        rebuild_board(challenge.group_id, challenge)
+        invalidate_challenge_progress([challenge.id])
+    
+    def perform_destroy(self, instance):
+        drop_board(instance.group_id, instance.id)
+        invalidate_challenge_progress([instance.id])
+        instance.delete()
+    
     @action(detail=True, methods=['get'], permission_classes=[permissions.IsAuthenticated, IsGroupMember])
     def participants(self, request, pk=None):
         challenge = self.get_object()
-        # Get all users who have attempted any of the challenge problems
-        participants = User.objects.filter(
-            submissions__problem__in=challenge.problems.all(),
-            submissions__submission_time__gte=challenge.start_date,
-            submissions__submission_time__lte=challenge.end_date,
-            groups=challenge.group
-        ).distinct()
+        # Get all members who have attempted any of the challenge problems
+        attempted = Submission.objects.filter(
+            problem__in=challenge.problems.values('id'),
+            submission_time__gte=challenge.start_date,
+            submission_time__lte=challenge.end_date,
+        )
+        participants = get_user_model().objects.filter(
+            id__in=attempted.values('user_id'),
+            groupmembership__group=challenge.group_id
+        )
         
         serializer = UserSerializer(participants, many=True)
         return Response(serializer.data)
+    
+    @action(detail=True, methods=['get'], permission_classes=[permissions.IsAuthenticated, IsGroupMember])
+    def leaderboard(self, request, pk=None):
+        challenge = self.get_object()
+        return leaderboard_response(request, challenge.group_id, challenge.id)
+    
+    @action(detail=True, methods=['get'], permission_classes=[permissions.IsAuthenticated, IsGroupAdmin])
+    def progress(self, request, pk=None):
+        """
+        Members x problems matrix of status, attempts and first accepted time
+        within the challenge window, as parallel lists
+        """
+        challenge = self.get_object()
+        return Response(get_challenge_progress(challenge))
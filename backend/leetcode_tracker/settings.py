@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 import os
 from datetime import timedelta
 from pathlib import Path
+from celery.schedules import crontab
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -112,6 +113,31 @@ DATABASES = {
 }
 
 
+# Cache
+# Uses Redis when CACHE_URL is set (e.g. redis://localhost:6379/1), otherwise local memory
+
+CACHE_URL = os.getenv('CACHE_URL', '')
+if CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Derived data (the random problem index, tag facets, activity summaries,
+# challenge progress) is rebuilt or dropped from the cache when it changes,
+# but with local memory that only reaches the process that made the change. Without a
+# shared cache, other processes keep it for at most this long instead.
+DERIVED_CACHE_TIMEOUT = int(os.getenv('DERIVED_CACHE_TIMEOUT', 6 * 60 * 60 if CACHE_URL else 60))  # seconds
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -228,6 +254,21 @@ EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER', '')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', '')
 DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', EMAIL_HOST_USER)
 
+# Base URL of the frontend, for links in emails
+FRONTEND_URL = os.getenv('FRONTEND_URL', 'http://localhost:3000')
+
+# Invitation emails are sent by Celery in batches, one SMTP connection per batch
+INVITATION_EMAIL_BATCH_SIZE = int(os.getenv('INVITATION_EMAIL_BATCH_SIZE', '50'))
+INVITATION_EMAIL_MAX_RETRIES = int(os.getenv('INVITATION_EMAIL_MAX_RETRIES', '5'))
+INVITATION_EMAIL_BACKOFF_BASE = int(os.getenv('INVITATION_EMAIL_BACKOFF_BASE', '60'))  # seconds
+INVITATION_EMAIL_BACKOFF_MAX = int(os.getenv('INVITATION_EMAIL_BACKOFF_MAX', '3600'))  # seconds
+# An invitation pending for this long since it was last queued is taken as
+# lost, and can be resent
+INVITATION_EMAIL_STALE_AFTER = int(
+    os.getenv('INVITATION_EMAIL_STALE_AFTER', str(2 * INVITATION_EMAIL_BACKOFF_MAX))
+)  # seconds
+MAX_BULK_INVITATIONS = int(os.getenv('MAX_BULK_INVITATIONS', '100'))
+
 # Authentication Settings
 ACCOUNT_EMAIL_REQUIRED = True
 ACCOUNT_UNIQUE_EMAIL = True
@@ -286,8 +327,63 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
+CELERY_BEAT_SCHEDULER = 'django_celery_beat.schedulers:DatabaseScheduler'
+CELERY_BEAT_SCHEDULE = {
+    # LeetCode rolls the daily challenge over at midnight UTC
+    'sync-daily-challenge': {
+        'task': 'problems.tasks.sync_daily_challenge',
+        'schedule': crontab(hour=0, minute=5),
+    },
+    'sync-all-problems': {
+        'task': 'problems.tasks.sync_all_problems',
+        'schedule': crontab(hour=3, minute=0),
+        'kwargs': {'refresh_changed': True},
+    },
+    'reset-lapsed-streaks': {
+        'task': 'analytics.tasks.reset_streaks',
+        'schedule': crontab(hour=0, minute=10),
+    },
+    'recompute-user-stats': {
+        'task': 'analytics.tasks.recompute_user_stats',
+        'schedule': crontab(hour=1, minute=0),
+    },
+}
 
 # Django Allauth Settings
 SITE_ID = 1  # Required for django.contrib.sites
 
 AUTH_USER_MODEL = 'users.User'
+
+# LeetCode Sync Settings
+LEETCODE_GRAPHQL_ENDPOINT = os.getenv('LEETCODE_GRAPHQL_ENDPOINT', 'https://leetcode.com/graphql')
+LEETCODE_SYNC_WORKERS = int(os.getenv('LEETCODE_SYNC_WORKERS', '8'))
+LEETCODE_SYNC_RATE_LIMIT = float(os.getenv('LEETCODE_SYNC_RATE_LIMIT', '5'))  # requests per second
+LEETCODE_SYNC_BATCH_SIZE = int(os.getenv('LEETCODE_SYNC_BATCH_SIZE', '500'))
+LEETCODE_SYNC_PAGE_SIZE = int(os.getenv('LEETCODE_SYNC_PAGE_SIZE', '100'))
+LEETCODE_SYNC_SHARD_SIZE = int(os.getenv('LEETCODE_SYNC_SHARD_SIZE', '250'))
+LEETCODE_SYNC_SHARD_WORKERS = int(os.getenv('LEETCODE_SYNC_SHARD_WORKERS', '4'))
+LEETCODE_SYNC_SHARD_RATE_LIMIT = float(os.getenv('LEETCODE_SYNC_SHARD_RATE_LIMIT', '2'))  # requests per second per shard
+
+# LeetCode HTTP Transport Settings
+LEETCODE_HTTP_CONNECT_TIMEOUT = float(os.getenv('LEETCODE_HTTP_CONNECT_TIMEOUT', '5'))  # seconds
+LEETCODE_HTTP_READ_TIMEOUT = float(os.getenv('LEETCODE_HTTP_READ_TIMEOUT', '30'))  # seconds
+LEETCODE_HTTP_MAX_RETRIES = int(os.getenv('LEETCODE_HTTP_MAX_RETRIES', '4'))
+LEETCODE_HTTP_BACKOFF_BASE = float(os.getenv('LEETCODE_HTTP_BACKOFF_BASE', '0.5'))  # seconds
+LEETCODE_HTTP_BACKOFF_MAX = float(os.getenv('LEETCODE_HTTP_BACKOFF_MAX', '60'))  # seconds
+LEETCODE_CIRCUIT_BREAKER_THRESHOLD = int(os.getenv('LEETCODE_CIRCUIT_BREAKER_THRESHOLD', '5'))
+LEETCODE_CIRCUIT_BREAKER_COOLDOWN = float(os.getenv('LEETCODE_CIRCUIT_BREAKER_COOLDOWN', '60'))  # seconds
+
+# LeetCode Response Cache Settings
+LEETCODE_CACHE_ENABLED = os.getenv('LEETCODE_CACHE_ENABLED', 'False') == 'True'
+LEETCODE_CACHE_PATH = os.getenv('LEETCODE_CACHE_PATH', os.path.join(BASE_DIR, 'leetcode_cache.sqlite3'))
+LEETCODE_CACHE_TTLS = {  # seconds
+    'problemsetQuestionList': 6 * 60 * 60,
+    'questionData': 30 * 24 * 60 * 60,
+    'questionOfToday': 10 * 60,
+}
+# How long a cache read or write waits on another process's lock before giving up
+LEETCODE_CACHE_BUSY_TIMEOUT = float(os.getenv('LEETCODE_CACHE_BUSY_TIMEOUT', '5'))  # seconds
+
+# Group Leaderboard Settings
+# Mirrors leaderboards into Redis sorted sets when set, otherwise ranks are read from the database
+LEADERBOARD_REDIS_URL = os.getenv('LEADERBOARD_REDIS_URL', CACHE_URL)
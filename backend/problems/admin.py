@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Problem, DailyChallenge, ProblemExample
+from .models import Problem, DailyChallenge, ProblemExample, SyncCheckpoint, SyncRun, Tag
 
 class ProblemExampleInline(admin.TabularInline):
     model = ProblemExample
@@ -10,10 +10,25 @@ class ProblemAdmin(admin.ModelAdmin):
     list_display = ('leetcode_id', 'title', 'difficulty', 'category', 'success_rate')
     list_filter = ('difficulty', 'category', 'is_premium')
     search_fields = ('title', 'description', 'category', 'tags')
+    filter_horizontal = ('topic_tags',)
     inlines = [ProblemExampleInline]
 
+@admin.register(Tag)
+class TagAdmin(admin.ModelAdmin):
+    list_display = ('name', 'slug')
+    search_fields = ('name',)
+
 @admin.register(DailyChallenge)
 class DailyChallengeAdmin(admin.ModelAdmin):
     list_display = ('date', 'problem')
     date_hierarchy = 'date'
 
+@admin.register(SyncCheckpoint)
+class SyncCheckpointAdmin(admin.ModelAdmin):
+    list_display = ('name', 'skip_offset', 'last_question_id', 'started_at', 'completed_at', 'updated_at')
+
+@admin.register(SyncRun)
+class SyncRunAdmin(admin.ModelAdmin):
+    list_display = ('started_at', 'mode', 'status', 'shards', 'processed', 'created', 'updated', 'failed', 'duration')
+    list_filter = ('mode', 'status')
+    date_hierarchy = 'started_at'
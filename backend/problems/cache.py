@@ -0,0 +1,131 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+class ResponseCache:
+    """
+    Content-addressed cache of LeetCode GraphQL responses stored as
+    compressed JSON in a local SQLite file.
+    
+    Entries are keyed by the operation name and a hash of its variables and
+    expire after a per-operation TTL. In offline mode expiry is ignored and
+    the cache is the only source of responses.
+    
+    The file is opened in WAL mode so concurrent syncs can share it. A read
+    or write that fails (the file is locked past the busy timeout, or
+    corrupt) counts as a miss or a skipped store rather than failing the
+    sync. Close the cache when done, or use it as a context manager.
+    """
+    
+    def __init__(self, path=None, ttls=None, offline=False):
+        self.path = str(path or settings.LEETCODE_CACHE_PATH)
+        self.ttls = ttls if ttls is not None else settings.LEETCODE_CACHE_TTLS
+        self.offline = offline
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self._lock = threading.Lock()
+        timeout = settings.LEETCODE_CACHE_BUSY_TIMEOUT
+        self._connection = sqlite3.connect(self.path, timeout=timeout, check_same_thread=False)
+        self._connection.execute(f"PRAGMA busy_timeout = {int(timeout * 1000)}")
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, operation TEXT NOT NULL, stored_at REAL NOT NULL, body BLOB NOT NULL)"
+        )
+        self._connection.commit()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def close(self):
+        """
+        Close the SQLite connection
+        """
+        with self._lock:
+            self._connection.close()
+    
+    def key(self, operation, variables):
+        """
+        Build the cache key for an operation and its variables
+        """
+        encoded = json.dumps(variables or {}, sort_keys=True, separators=(',', ':'))
+        return f"{operation}:{hashlib.sha256(encoded.encode()).hexdigest()}"
+    
+    def get(self, operation, variables):
+        """
+        Return the cached response data, or None on a miss or expired entry
+        """
+        with self._lock:
+            try:
+                row = self._connection.execute(
+                    "SELECT stored_at, body FROM responses WHERE key = ?",
+                    (self.key(operation, variables),)
+                ).fetchone()
+            except sqlite3.Error as e:
+                logger.warning("Response cache read failed: %s", e)
+                row = None
+            
+            ttl = self.ttls.get(operation)
+            if row is None or (not self.offline and ttl is not None and time.time() - row[0] > ttl):
+                self.misses += 1
+                return None
+            
+            self.hits += 1
+        return json.loads(zlib.decompress(row[1]))
+    
+    def set(self, operation, variables, data):
+        """
+        Store response data for an operation and its variables; a failed
+        write is logged and skipped
+        """
+        body = zlib.compress(json.dumps(data, separators=(',', ':')).encode())
+        with self._lock:
+            try:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO responses (key, operation, stored_at, body) VALUES (?, ?, ?, ?)",
+                    (self.key(operation, variables), operation, time.time(), body)
+                )
+                self._connection.commit()
+            except sqlite3.Error as e:
+                logger.warning("Response cache write failed: %s", e)
+                self._connection.rollback()
+                return
+            self.stores += 1
+    
+    def purge_expired(self):
+        """
+        Delete entries older than their operation's TTL, returning the count
+        """
+        now = time.time()
+        deleted = 0
+        with self._lock:
+            for operation, ttl in self.ttls.items():
+                cursor = self._connection.execute(
+                    "DELETE FROM responses WHERE operation = ? AND stored_at < ?",
+                    (operation, now - ttl)
+                )
+                deleted += cursor.rowcount
+            self._connection.commit()
+        return deleted
+    
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "stores": self.stores,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,57 @@
+import hashlib
+import json
+from datetime import datetime, time, timedelta
+from django.core.cache import cache
+from django.utils import timezone
+from .models import DailyChallenge
+from .serializers import DailyChallengeSerializer
+
+TODAY_CACHE_KEY = 'problems:daily-challenge:{date}'
+
+def seconds_until_rollover(now=None):
+    """
+    Seconds left until the daily challenge rolls over at local midnight
+    """
+    now = timezone.localtime(now)
+    midnight = timezone.make_aware(
+        datetime.combine(now.date() + timedelta(days=1), time.min), now.tzinfo
+    )
+    return max(1, int((midnight - now).total_seconds()))
+
+def render_today_payload(challenge):
+    """
+    Serialize a daily challenge together with its validators and cache it
+    until the next rollover.
+    
+    Last-Modified is the render time rather than the problem's updated_at,
+    which can be older than the challenge it replaces.
+    """
+    data = DailyChallengeSerializer(challenge).data
+    body = json.dumps(data, sort_keys=True, default=str)
+    entry = {
+        "data": data,
+        "etag": f'"{hashlib.sha1(body.encode()).hexdigest()}"',
+        "last_modified": timezone.now().timestamp(),
+    }
+    cache.set(TODAY_CACHE_KEY.format(date=challenge.date), entry, seconds_until_rollover())
+    return entry
+
+def get_today_payload():
+    """
+    Return today's cached challenge payload, building it from the database
+    on a cache miss. Returns None if there is no challenge for today.
+    """
+    today = timezone.localdate()
+    entry = cache.get(TODAY_CACHE_KEY.format(date=today))
+    if entry is not None:
+        return entry
+    
+    challenge = (
+        DailyChallenge.objects.select_related('problem')
+        .prefetch_related('problem__examples')
+        .filter(date=today)
+        .first()
+    )
+    if challenge is None:
+        return None
+    return render_today_payload(challenge)
@@ -0,0 +1,43 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from .models import Problem
+
+TAG_FACETS_CACHE_KEY = 'problems:tag-facets'
+DIFFICULTIES = ('easy', 'medium', 'hard')
+
+def build_tag_facets():
+    """
+    Count problems per difficulty and per tag and difficulty, and cache the
+    result. Called after every sync; rebuilt on demand once expired.
+    """
+    difficulty_counts = dict(
+        Problem.objects.values_list('difficulty').annotate(count=Count('id')).order_by()
+    )
+    
+    tags = {}
+    for name, slug, difficulty, count in (
+        Problem.topic_tags.through.objects
+        .values_list('tag__name', 'tag__slug', 'problem__difficulty')
+        .annotate(count=Count('id'))
+        .order_by()
+    ):
+        facet = tags.setdefault(slug, {
+            "slug": slug, "name": name, "count": 0, **{level: 0 for level in DIFFICULTIES}
+        })
+        facet[difficulty] = count
+        facet["count"] += count
+    
+    facets = {
+        "count": sum(difficulty_counts.values()),
+        "difficulty": {level: difficulty_counts.get(level, 0) for level in DIFFICULTIES},
+        "tags": sorted(tags.values(), key=lambda facet: (-facet["count"], facet["name"])),
+    }
+    cache.set(TAG_FACETS_CACHE_KEY, facets, settings.DERIVED_CACHE_TIMEOUT)
+    return facets
+
+def get_tag_facets():
+    facets = cache.get(TAG_FACETS_CACHE_KEY)
+    if facets is None:
+        facets = build_tag_facets()
+    return facets
@@ -0,0 +1,13 @@
+from rest_framework import filters
+
+class StableOrderingFilter(filters.OrderingFilter):
+    """
+    OrderingFilter that breaks ties on id, so an ordering on a non-unique
+    column gives the same order on every page
+    """
+    
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if ordering and not any(field.lstrip('-') in ('id', 'pk') for field in ordering):
+            ordering = [*ordering, 'id']
+        return ordering
@@ -0,0 +1,85 @@
+import json
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from problems.services import LeetCodeAPIService
+from problems.standin import StandInServer, SyntheticCatalog
+
+class Command(BaseCommand):
+    help = 'Benchmark problem sync throughput against a local LeetCode stand-in'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, default=3000, help='Number of synthetic problems')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--fixture', help='Benchmark against a recorded JSON fixture')
+        parser.add_argument('--latency', type=float, default=0.05, help='Mean response latency in seconds')
+        parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with HTTP 500')
+        parser.add_argument('--throttle-rate', type=float, default=0.0, help='Fraction of requests answered with HTTP 429')
+        parser.add_argument('--workers', type=int, help='Concurrent detail fetches')
+        parser.add_argument('--rate', type=float, default=0, help='Maximum requests per second (0 for unlimited)')
+        parser.add_argument('--page-size', type=int)
+        parser.add_argument('--incremental', action='store_true', help='Benchmark the incremental sync')
+        parser.add_argument('--runs', type=int, default=1, help='Number of back-to-back runs')
+        parser.add_argument('--output', help='Append one JSON line of results per run to this file')
+        parser.add_argument('--keep', action='store_true', help='Keep synced rows instead of rolling them back')
+
+    def handle(self, *args, **options):
+        if options['fixture']:
+            catalog = SyntheticCatalog.from_fixture(options['fixture'])
+        else:
+            catalog = SyntheticCatalog(size=options['size'], seed=options['seed'])
+        
+        server = StandInServer(
+            catalog,
+            latency=options['latency'],
+            error_rate=options['error_rate'],
+            throttle_rate=options['throttle_rate'],
+            seed=options['seed'],
+        )
+        
+        with server:
+            for run in range(1, options['runs'] + 1):
+                # Each run starts from the same database state
+                with transaction.atomic():
+                    service = LeetCodeAPIService(
+                        max_workers=options['workers'],
+                        rate_limit=options['rate'],
+                        page_size=options['page_size'],
+                        use_cache=False,
+                        endpoint=server.url,
+                    )
+                    requests_before = server.stats()['requests']
+                    # Rolled back rows must not leak into the problem caches
+                    with service:
+                        if options['incremental']:
+                            stats = service.sync_problems_incremental(refresh_caches=options['keep'])
+                        else:
+                            stats = service.sync_problems(refresh_caches=options['keep'])
+                    if not options['keep']:
+                        transaction.set_rollback(True)
+                
+                result = {
+                    "run": run,
+                    "timestamp": timezone.now().isoformat(),
+                    "mode": "incremental" if options['incremental'] else "full",
+                    "size": len(catalog.questions),
+                    "workers": service.max_workers,
+                    "latency": options['latency'],
+                    "error_rate": options['error_rate'],
+                    "throttle_rate": options['throttle_rate'],
+                    "requests": server.stats()['requests'] - requests_before,
+                    "processed": stats['processed'],
+                    "created": stats['created'],
+                    "failed": stats['failed'],
+                    "elapsed": round(stats['elapsed'], 3),
+                    "rate": round(stats['rate'], 2),
+                }
+                self.stdout.write(self.style.SUCCESS(
+                    f"Run {run}: {result['processed']} problems in {result['elapsed']:.2f}s "
+                    f"({result['rate']:.1f} problems/sec), {result['requests']} requests, "
+                    f"{result['failed']} failed"
+                ))
+                
+                if options['output']:
+                    with open(options['output'], 'a') as f:
+                        f.write(json.dumps(result) + "\n")
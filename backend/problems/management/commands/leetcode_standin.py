@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand
+from problems.standin import StandInServer, SyntheticCatalog
+
+class Command(BaseCommand):
+    help = 'Run a local stand-in for the LeetCode GraphQL API'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--size', type=int, default=3000, help='Number of synthetic problems')
+        parser.add_argument('--seed', type=int, default=0, help='Seed for the synthetic catalog and fault injection')
+        parser.add_argument('--fixture', help='Serve a recorded JSON fixture instead of a synthetic catalog')
+        parser.add_argument('--record', help='Write the catalog to a JSON fixture and exit')
+        parser.add_argument('--latency', type=float, default=0.0, help='Mean response latency in seconds')
+        parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with HTTP 500')
+        parser.add_argument('--throttle-rate', type=float, default=0.0, help='Fraction of requests answered with HTTP 429')
+        parser.add_argument('--retry-after', type=int, default=1, help='Retry-After seconds sent with 429s')
+
+    def handle(self, *args, **options):
+        if options['fixture']:
+            catalog = SyntheticCatalog.from_fixture(options['fixture'])
+        else:
+            catalog = SyntheticCatalog(size=options['size'], seed=options['seed'])
+        
+        if options['record']:
+            catalog.dump(options['record'])
+            self.stdout.write(self.style.SUCCESS(
+                f"Recorded {len(catalog.questions)} problems to {options['record']}"
+            ))
+            return
+        
+        server = StandInServer(
+            catalog,
+            host=options['host'],
+            port=options['port'],
+            latency=options['latency'],
+            error_rate=options['error_rate'],
+            throttle_rate=options['throttle_rate'],
+            retry_after=options['retry_after'],
+            seed=options['seed'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Serving {len(catalog.questions)} problems at {server.url}\n"
+            f"Point the sync at it with LEETCODE_GRAPHQL_ENDPOINT={server.url}"
+        ))
+        try:
+            server.httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.httpd.server_close()
@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from problems.search import update_search_index
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index for every problem'
+
+    def handle(self, *args, **options):
+        count = update_search_index(rebuild=True)
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} problems"))
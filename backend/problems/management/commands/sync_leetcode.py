@@ -1,4 +1,4 @@
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from problems.services import LeetCodeAPIService
 
 class Command(BaseCommand):
@@ -15,10 +15,57 @@ class Command(BaseCommand):
             action='store_true',
             help='Sync only the daily challenge',
         )
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='Page through the problem list from the last checkpoint, fetching details only for new or changed problems',
+        )
+        parser.add_argument(
+            '--page-size',
+            type=int,
+            help='Problems requested per problem list page (defaults to LEETCODE_SYNC_PAGE_SIZE)',
+        )
+        parser.add_argument(
+            '--background',
+            action='store_true',
+            help='Queue the sync as Celery tasks instead of running it here',
+        )
+        parser.add_argument(
+            '--cache',
+            action='store_true',
+            help='Read and write LeetCode responses through the local response cache',
+        )
+        parser.add_argument(
+            '--offline',
+            action='store_true',
+            help='Serve every LeetCode request from the response cache without network access',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            help='Number of concurrent detail fetches (defaults to LEETCODE_SYNC_WORKERS)',
+        )
+        parser.add_argument(
+            '--rate',
+            type=float,
+            help='Maximum requests per second (defaults to LEETCODE_SYNC_RATE_LIMIT)',
+        )
 
     def handle(self, *args, **options):
-        service = LeetCodeAPIService()
+        if options['background']:
+            self._queue(options)
+            return
         
+        with LeetCodeAPIService(
+            max_workers=options['workers'],
+            rate_limit=options['rate'],
+            page_size=options['page_size'],
+            use_cache=options['cache'] or None,
+            offline=options['offline'],
+        ) as service:
+            self._sync(service, options)
+    
+    def _sync(self, service, options):
         if options['daily']:
             self.stdout.write("Syncing today's daily challenge...")
             daily = service.sync_daily_challenge()
@@ -29,12 +76,54 @@ class Command(BaseCommand):
             else:
                 self.stdout.write(self.style.ERROR("Failed to sync daily challenge"))
         
+        elif options['incremental']:
+            self.stdout.write("Incrementally syncing problems from LeetCode...")
+            stats = service.sync_problems_incremental()
+            style = self.style.SUCCESS if stats['completed'] else self.style.WARNING
+            self.stdout.write(style(
+                f"{'Completed' if stats['completed'] else 'Interrupted'} incremental sync "
+                f"(resumed at offset {stats['resumed_from']}): {stats['created']} new, "
+                f"{stats['refreshed']} refreshed, {stats['updated']} updated, "
+                f"{stats['failed']} failed in {stats['elapsed']:.1f}s"
+            ))
+            self._write_summary(stats)
+        
         elif options['all']:
             self.stdout.write("Syncing all problems from LeetCode...")
-            count = service.sync_problems()
-            self.stdout.write(self.style.SUCCESS(
-                f"Successfully synced {count} new problems"
+            stats = service.sync_problems()
+            style = self.style.SUCCESS if stats['completed'] else self.style.WARNING
+            self.stdout.write(style(
+                f"{'Successfully synced' if stats['completed'] else 'Partially synced'} "
+                f"{stats['created']} new problems, "
+                f"updated {stats['updated']}, {stats['failed']} failed "
+                f"in {stats['elapsed']:.1f}s ({stats['rate']:.1f} problems/sec)"
             ))
+            self._write_summary(stats)
         
         else:
-            self.stdout.write("Please specify --all or --daily")
\ No newline at end of file
+            self.stdout.write("Please specify --all, --incremental or --daily")
+    
+    def _queue(self, options):
+        from problems import tasks
+        
+        if options['daily']:
+            result = tasks.sync_daily_challenge.delay()
+        elif options['all'] or options['incremental']:
+            result = tasks.sync_all_problems.delay(refresh_changed=options['incremental'])
+        else:
+            self.stdout.write("Please specify --all, --incremental or --daily")
+            return
+        self.stdout.write(self.style.SUCCESS(f"Queued sync task {result.id}"))
+    
+    def _write_summary(self, stats):
+        for error, count in stats['errors'].most_common():
+            self.stdout.write(self.style.WARNING(f"  {count} failed with {error}"))
+        if 'cache' in stats:
+            cache = stats['cache']
+            self.stdout.write(
+                f"  Response cache: {cache['hits']} hits, {cache['misses']} misses "
+                f"({cache['hit_rate']:.0%} hit rate)"
+            )
+        # A truncated problem list is a failed sync, whatever got written
+        if not stats['completed']:
+            raise CommandError(f"Sync stopped early: {stats['list_error']}")
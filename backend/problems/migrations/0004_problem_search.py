@@ -0,0 +1,94 @@
+import html
+import re
+
+import django.contrib.postgres.search
+from django.db import migrations, models
+from django.utils.html import strip_tags
+
+# Frozen copies of problems.search as of this migration, so later changes
+# to that module don't rewrite history
+
+WHITESPACE_RE = re.compile(r'\s+')
+
+POSTGRES_SEARCH_VECTOR_SQL = (
+    "UPDATE problems_problem SET search_vector = "
+    "setweight(to_tsvector('english'::regconfig, COALESCE(title, '')), 'A') || "
+    "setweight(to_tsvector('english'::regconfig, COALESCE(category, '') || ' ' || COALESCE(tags::text, '')), 'B') || "
+    "setweight(to_tsvector('english'::regconfig, COALESCE(search_document, '')), 'C')"
+)
+
+SQLITE_SEARCH_SQL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS problems_problem_fts USING fts5("
+    "title, category, tags, search_document, "
+    "content='problems_problem', content_rowid='id', tokenize='porter unicode61')",
+    "CREATE TRIGGER IF NOT EXISTS problems_problem_fts_insert AFTER INSERT ON problems_problem BEGIN "
+    "INSERT INTO problems_problem_fts(rowid, title, category, tags, search_document) "
+    "VALUES (new.id, new.title, new.category, new.tags, new.search_document); END",
+    "CREATE TRIGGER IF NOT EXISTS problems_problem_fts_delete AFTER DELETE ON problems_problem BEGIN "
+    "INSERT INTO problems_problem_fts(problems_problem_fts, rowid, title, category, tags, search_document) "
+    "VALUES ('delete', old.id, old.title, old.category, old.tags, old.search_document); END",
+    "CREATE TRIGGER IF NOT EXISTS problems_problem_fts_update AFTER UPDATE ON problems_problem BEGIN "
+    "INSERT INTO problems_problem_fts(problems_problem_fts, rowid, title, category, tags, search_document) "
+    "VALUES ('delete', old.id, old.title, old.category, old.tags, old.search_document); "
+    "INSERT INTO problems_problem_fts(rowid, title, category, tags, search_document) "
+    "VALUES (new.id, new.title, new.category, new.tags, new.search_document); END",
+    "INSERT INTO problems_problem_fts(problems_problem_fts) VALUES ('rebuild')",
+]
+
+
+def html_to_text(value):
+    return WHITESPACE_RE.sub(' ', html.unescape(strip_tags(value or ''))).strip()
+
+
+def strip_descriptions(apps, schema_editor):
+    Problem = apps.get_model('problems', 'Problem')
+    problems = list(Problem.objects.only('id', 'description'))
+    for problem in problems:
+        problem.search_document = html_to_text(problem.description)
+    Problem.objects.bulk_update(problems, ['search_document'], batch_size=500)
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(POSTGRES_SEARCH_VECTOR_SQL)
+        schema_editor.execute(
+            "CREATE INDEX problems_problem_search_vector_gin "
+            "ON problems_problem USING gin (search_vector)"
+        )
+    elif vendor == 'sqlite':
+        for statement in SQLITE_SEARCH_SQL:
+            schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS problems_problem_search_vector_gin")
+    elif vendor == 'sqlite':
+        for suffix in ('insert', 'delete', 'update'):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS problems_problem_fts_{suffix}")
+        schema_editor.execute("DROP TABLE IF EXISTS problems_problem_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0003_sync_run'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='problem',
+            name='search_document',
+            field=models.TextField(blank=True, default='', editable=False),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='problem',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(strip_descriptions, migrations.RunPython.noop),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.1.6 on 2026-10-18 01:30
+
+from django.db import migrations, models
+from django.utils.text import slugify
+
+
+def normalize_tags(apps, schema_editor):
+    Problem = apps.get_model('problems', 'Problem')
+    Tag = apps.get_model('problems', 'Tag')
+    ProblemTag = Problem.topic_tags.through
+    
+    # Sync used to store tags as a comma-joined string rather than a list
+    problems = list(Problem.objects.only('id', 'tags'))
+    for problem in problems:
+        if isinstance(problem.tags, str):
+            problem.tags = [tag.strip() for tag in problem.tags.split(',') if tag.strip()]
+    Problem.objects.bulk_update(problems, ['tags'], batch_size=500)
+    
+    names = {name for problem in problems for name in problem.tags}
+    Tag.objects.bulk_create(
+        [Tag(name=name, slug=slugify(name)) for name in names], ignore_conflicts=True
+    )
+    tag_ids = dict(Tag.objects.values_list('slug', 'id'))
+    ProblemTag.objects.bulk_create(
+        [ProblemTag(problem_id=problem.id, tag_id=tag_ids[slug])
+         for problem in problems for slug in {slugify(name) for name in problem.tags}],
+        batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0004_problem_search'),
+    ]
+    
+    operations = [
+        migrations.CreateModel(
+            name='Tag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('slug', models.SlugField(max_length=100, unique=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='problem',
+            name='topic_tags',
+            field=models.ManyToManyField(blank=True, related_name='problems', to='problems.tag'),
+        ),
+        migrations.RunPython(normalize_tags, migrations.RunPython.noop),
+    ]
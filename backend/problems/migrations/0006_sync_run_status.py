@@ -0,0 +1,25 @@
+# Generated by Django 5.1.6 on 2026-10-18 02:12
+
+from django.db import migrations, models
+
+
+def mark_finished_completed(apps, schema_editor):
+    # Runs recorded before this only got a finish time once reconciled
+    SyncRun = apps.get_model('problems', 'SyncRun')
+    SyncRun.objects.filter(finished_at__isnull=False).update(status='completed')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0005_tags'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='syncrun',
+            name='status',
+            field=models.CharField(choices=[('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='running', max_length=20),
+        ),
+        migrations.RunPython(mark_finished_completed, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+from django.db import migrations
+
+# Sets search_vector on every insert and update, whichever path writes the
+# row, with the same weights as problems.search.SEARCH_VECTOR
+CREATE_TRIGGER_SQL = [
+    "CREATE OR REPLACE FUNCTION problems_problem_search_vector_update() RETURNS trigger AS $$ "
+    "BEGIN "
+    "NEW.search_vector := "
+    "setweight(to_tsvector('english'::regconfig, COALESCE(NEW.title, '')), 'A') || "
+    "setweight(to_tsvector('english'::regconfig, COALESCE(NEW.category, '') || ' ' || COALESCE(NEW.tags::text, '')), 'B') || "
+    "setweight(to_tsvector('english'::regconfig, COALESCE(NEW.search_document, '')), 'C'); "
+    "RETURN NEW; "
+    "END $$ LANGUAGE plpgsql",
+    "CREATE TRIGGER problems_problem_search_vector BEFORE INSERT OR UPDATE OF title, category, tags, search_document "
+    "ON problems_problem FOR EACH ROW EXECUTE FUNCTION problems_problem_search_vector_update()",
+    # Rows the sync job hadn't indexed yet
+    "UPDATE problems_problem SET title = title WHERE search_vector IS NULL",
+]
+
+DROP_TRIGGER_SQL = [
+    "DROP TRIGGER IF EXISTS problems_problem_search_vector ON problems_problem",
+    "DROP FUNCTION IF EXISTS problems_problem_search_vector_update()",
+]
+
+
+def create_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for statement in CREATE_TRIGGER_SQL:
+            schema_editor.execute(statement)
+
+
+def drop_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for statement in DROP_TRIGGER_SQL:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0006_sync_run_status'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigger, drop_trigger),
+    ]
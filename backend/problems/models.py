@@ -1,4 +1,16 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.utils import timezone
+
+class Tag(models.Model):
+    """
+    Model for storing LeetCode topic tags
+    """
+    name = models.CharField(max_length=100, unique=True)
+    slug = models.SlugField(max_length=100, unique=True)
+    
+    def __str__(self):
+        return self.name
 
 class Problem(models.Model):
     """
@@ -13,15 +25,29 @@ class Problem(models.Model):
         choices=[('easy', 'Easy'), ('medium', 'Medium'), ('hard', 'Hard')]
     )
     category = models.CharField(max_length=100)
-    tags = models.JSONField(default=list)  # Store tags as a JSON array
+    tags = models.JSONField(default=list)  # Store tag names as a JSON array for display
+    topic_tags = models.ManyToManyField(Tag, related_name='problems', blank=True)  # Used for filtering
     success_rate = models.FloatField(default=0)
     is_premium = models.BooleanField(default=False)
+    content_hash = models.CharField(max_length=64, blank=True)  # Hash of the list payload details were fetched for
+    search_document = models.TextField(blank=True, editable=False)  # Plain text of the description for indexing
+    search_vector = SearchVectorField(null=True, editable=False)  # Postgres only; GIN indexed in migration 0004
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.title} - {self.difficulty}"
 
+    def save(self, *args, **kwargs):
+        # Admin and API edits keep the indexed text in step; the sync's bulk
+        # writes set it themselves
+        from .search import html_to_text
+        self.search_document = html_to_text(self.description)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'description' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'search_document'}
+        super().save(*args, **kwargs)
+
 class DailyChallenge(models.Model):
     """
     Model for storing daily challenge problems
@@ -43,3 +69,47 @@ class ProblemExample(models.Model):
     
     def __str__(self):
         return f"Example for {self.problem.title}"
+
+
+class SyncCheckpoint(models.Model):
+    """
+    Model for storing progress of incremental LeetCode syncs
+    """
+    name = models.CharField(max_length=50, unique=True)
+    skip_offset = models.IntegerField(default=0)
+    last_question_id = models.IntegerField(null=True, blank=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.name} checkpoint at {self.skip_offset}"
+
+class SyncRun(models.Model):
+    """
+    Model for storing the outcome of background problem syncs
+    """
+    MODE_CHOICES = (
+        ('full', 'Full'),
+        ('incremental', 'Incremental'),
+    )
+    STATUS_CHOICES = (
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    )
+    mode = models.CharField(max_length=20, choices=MODE_CHOICES, default='full')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='running')
+    started_at = models.DateTimeField(default=timezone.now)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    duration = models.FloatField(null=True, blank=True)  # in seconds
+    shards = models.IntegerField(default=0)
+    processed = models.IntegerField(default=0)
+    created = models.IntegerField(default=0)
+    updated = models.IntegerField(default=0)
+    refreshed = models.IntegerField(default=0)
+    failed = models.IntegerField(default=0)
+    errors = models.JSONField(default=dict)  # failure counts by error kind
+    
+    def __str__(self):
+        return f"{self.mode} sync started {self.started_at:%Y-%m-%d %H:%M}"
@@ -0,0 +1,40 @@
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from .filters import StableOrderingFilter
+
+class ProblemCursorPagination(CursorPagination):
+    """
+    Cursor pagination over problems in LeetCode order
+    """
+    ordering = 'leetcode_id'
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+class ProblemPagePagination(PageNumberPagination):
+    """
+    Page-number pagination over problems, for the orderings a cursor can't
+    seek on
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+def requested_ordering(view):
+    """
+    The ?ordering= of a list request, with its id tiebreaker, or None
+    """
+    # The view's ordering_fields are explicit, so no queryset is needed
+    return StableOrderingFilter().get_ordering(view.request, None, view)
+
+def select_paginator(view, cursor_class, page_class):
+    """
+    A cursor paginator when the list is in the cursor's own order, and a
+    page-number one for any other ?ordering=.
+    
+    DRF cursors only seek on the first ordering column, so on a column
+    with many ties they fall back to offsets within the tie.
+    """
+    ordering = requested_ordering(view)
+    cursor = cursor_class()
+    default = cursor.ordering if isinstance(cursor.ordering, str) else cursor.ordering[0]
+    if ordering and ordering[0].lstrip('-') != default.lstrip('-'):
+        return page_class()
+    return cursor
@@ -0,0 +1,126 @@
+import random
+import uuid
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.text import slugify
+from .models import Problem
+
+PROBLEM_INDEX_CACHE_KEY = 'problems:random-index'
+PROBLEM_INDEX_VERSION_CACHE_KEY = 'problems:random-index:version'
+RECENT_PICKS_CACHE_KEY = 'problems:random-recent:{user_id}'
+RECENT_PICKS_TIMEOUT = 7 * 24 * 60 * 60
+MAX_RECENT_PICKS = 100
+
+# Random draws tried before falling back to filtering the candidate list
+MAX_REJECTIONS = 16
+
+# This process's copy of the index, with id sets for membership tests
+_local_index = None
+
+def build_problem_index():
+    """
+    Build the id arrays random picks are drawn from and cache them.
+    Called after every sync; rebuilt on demand once expired.
+    """
+    index = {
+        "version": uuid.uuid4().hex,
+        "difficulty": {"all": [], "easy": [], "medium": [], "hard": []},
+        "tags": {},
+        "premium": [],
+    }
+    for problem_id, difficulty, is_premium in Problem.objects.values_list(
+        'id', 'difficulty', 'is_premium'
+    ).order_by('id'):
+        index["difficulty"]["all"].append(problem_id)
+        index["difficulty"].setdefault(difficulty, []).append(problem_id)
+        if is_premium:
+            index["premium"].append(problem_id)
+    for problem_id, slug in Problem.topic_tags.through.objects.values_list(
+        'problem_id', 'tag__slug'
+    ).order_by('problem_id'):
+        index["tags"].setdefault(slug, []).append(problem_id)
+    
+    cache.set_many({
+        PROBLEM_INDEX_CACHE_KEY: index,
+        PROBLEM_INDEX_VERSION_CACHE_KEY: index["version"],
+    }, settings.DERIVED_CACHE_TIMEOUT)
+    return _load_index(index)
+
+def _load_index(index):
+    global _local_index
+    index = {
+        **index,
+        "difficulty_sets": {difficulty: set(ids) for difficulty, ids in index["difficulty"].items()},
+        "tag_sets": {slug: set(ids) for slug, ids in index["tags"].items()},
+        "premium_set": set(index["premium"]),
+    }
+    _local_index = index
+    return index
+
+def get_problem_index():
+    """
+    Return the index, reusing this process's copy while its version is
+    current so the id sets aren't rebuilt on every pick
+    """
+    version = cache.get(PROBLEM_INDEX_VERSION_CACHE_KEY)
+    if version is not None and _local_index is not None and _local_index["version"] == version:
+        return _local_index
+    
+    index = cache.get(PROBLEM_INDEX_CACHE_KEY) if version is not None else None
+    if index is None or index["version"] != version:
+        return build_problem_index()
+    return _load_index(index)
+
+def pick_random_problem_id(difficulty=None, tags=None, premium=None, exclude=()):
+    """
+    Pick a random problem id without touching the problems table.
+    
+    The candidate list is the smallest of the difficulty and tag arrays
+    matching the filters. Draws that fail the remaining filters are
+    rejected and redrawn; only if that keeps failing is the candidate list
+    filtered in full. Returns None if no problem matches.
+    """
+    index = get_problem_index()
+    
+    difficulty = difficulty or "all"
+    lists = [(index["difficulty"].get(difficulty, []), index["difficulty_sets"].get(difficulty, set()))]
+    for tag in tags or []:
+        slug = slugify(tag)
+        lists.append((index["tags"].get(slug, []), index["tag_sets"].get(slug, set())))
+    lists.sort(key=lambda entry: len(entry[0]))
+    candidates = lists[0][0]
+    if not candidates:
+        return None
+    
+    required = [ids for _, ids in lists[1:]]
+    premium_ids = index["premium_set"] if premium is not None else None
+    exclude = set(exclude)
+    
+    def matches(problem_id):
+        if problem_id in exclude:
+            return False
+        if premium_ids is not None and (problem_id in premium_ids) != premium:
+            return False
+        return all(problem_id in ids for ids in required)
+    
+    for _ in range(MAX_REJECTIONS):
+        problem_id = random.choice(candidates)
+        if matches(problem_id):
+            return problem_id
+    
+    remaining = [problem_id for problem_id in candidates if matches(problem_id)]
+    return random.choice(remaining) if remaining else None
+
+def get_recent_picks(user, count=MAX_RECENT_PICKS):
+    """
+    Return the user's last `count` random picks, most recent first
+    """
+    if count <= 0:
+        return []
+    return cache.get(RECENT_PICKS_CACHE_KEY.format(user_id=user.id), [])[:count]
+
+def remember_pick(user, problem_id):
+    recent = [problem_id] + [pick for pick in get_recent_picks(user) if pick != problem_id]
+    cache.set(
+        RECENT_PICKS_CACHE_KEY.format(user_id=user.id), recent[:MAX_RECENT_PICKS], RECENT_PICKS_TIMEOUT
+    )
@@ -0,0 +1,125 @@
+import html
+import re
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import Case, F, FloatField, Value, When
+from django.utils.html import strip_tags
+from .models import Problem
+
+SEARCH_CONFIG = 'english'
+FTS_TABLE = 'problems_problem_fts'
+MAX_SEARCH_RESULTS = 500
+MAX_SEARCH_TERMS = 8
+
+TOKEN_RE = re.compile(r'\w+')
+WHITESPACE_RE = re.compile(r'\s+')
+
+# Title matches rank above category and tag matches, which rank above the description
+SEARCH_VECTOR = (
+    SearchVector('title', weight='A', config=SEARCH_CONFIG)
+    + SearchVector('category', 'tags', weight='B', config=SEARCH_CONFIG)
+    + SearchVector('search_document', weight='C', config=SEARCH_CONFIG)
+)
+
+# SQLite FTS5 table over the problems table, kept current by triggers
+SQLITE_SEARCH_SQL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "title, category, tags, search_document, "
+    "content='problems_problem', content_rowid='id', tokenize='porter unicode61')",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert AFTER INSERT ON problems_problem BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, title, category, tags, search_document) "
+    "VALUES (new.id, new.title, new.category, new.tags, new.search_document); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete AFTER DELETE ON problems_problem BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, category, tags, search_document) "
+    "VALUES ('delete', old.id, old.title, old.category, old.tags, old.search_document); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update AFTER UPDATE ON problems_problem BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, category, tags, search_document) "
+    "VALUES ('delete', old.id, old.title, old.category, old.tags, old.search_document); "
+    f"INSERT INTO {FTS_TABLE}(rowid, title, category, tags, search_document) "
+    "VALUES (new.id, new.title, new.category, new.tags, new.search_document); END",
+]
+
+def html_to_text(value):
+    """
+    Strip the tags and entities from problem HTML, leaving the plain text
+    that gets indexed
+    """
+    return WHITESPACE_RE.sub(' ', html.unescape(strip_tags(value or ''))).strip()
+
+def search_terms(query):
+    return TOKEN_RE.findall((query or '').lower())[:MAX_SEARCH_TERMS]
+
+def install_sqlite_search_index(cursor):
+    """
+    Create the FTS5 table and its triggers, then index every problem.
+    
+    SQLite drops the triggers whenever a migration rebuilds the problems
+    table, so this is also run by the rebuild_search_index command.
+    """
+    for statement in SQLITE_SEARCH_SQL:
+        cursor.execute(statement)
+    cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+def update_search_index(rebuild=False):
+    """
+    Compute search vectors for problems that have none yet, or for every
+    problem if rebuild is set. Returns the number of problems indexed.
+    
+    Both backends keep the index current with triggers: on Postgres one
+    that sets search_vector on every write (migration 0007), on SQLite
+    the ones maintaining the FTS5 table. So outside a rebuild this only
+    covers rows written before the Postgres trigger existed.
+    """
+    if connection.vendor == 'postgresql':
+        problems = Problem.objects.all()
+        if not rebuild:
+            problems = problems.filter(search_vector__isnull=True)
+        return problems.update(search_vector=SEARCH_VECTOR)
+    
+    if connection.vendor == 'sqlite' and rebuild:
+        with connection.cursor() as cursor:
+            install_sqlite_search_index(cursor)
+        return Problem.objects.count()
+    return 0
+
+def search_problem_ids(query, limit=MAX_SEARCH_RESULTS):
+    """
+    Return the ids of problems matching a search query, best match first.
+    
+    Every term is matched as a prefix, so partially typed words match.
+    An exact title match ranks first, then titles starting with the query,
+    then the rest in relevance order.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return []
+    title_prefix = ' '.join(terms)
+    
+    if connection.vendor == 'postgresql':
+        search_query = SearchQuery(
+            ' & '.join(f'{term}:*' for term in terms), search_type='raw', config=SEARCH_CONFIG
+        )
+        return list(
+            Problem.objects.filter(search_vector=search_query)
+            .annotate(
+                title_match=Case(
+                    When(title__iexact=title_prefix, then=Value(2.0)),
+                    When(title__istartswith=title_prefix, then=Value(1.0)),
+                    default=Value(0.0),
+                    output_field=FloatField()
+                ),
+                rank=SearchRank(F('search_vector'), search_query),
+            )
+            .order_by('-title_match', '-rank', 'leetcode_id')
+            .values_list('id', flat=True)[:limit]
+        )
+    
+    match = ' '.join(f'"{term}"*' for term in terms)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s "
+            f"ORDER BY lower(title) = %s DESC, lower(title) LIKE %s DESC, "
+            f"bm25({FTS_TABLE}, 10.0, 4.0, 4.0, 1.0), rowid LIMIT %s",
+            [match, title_prefix, f'{title_prefix}%', limit]
+        )
+        return [row[0] for row in cursor.fetchall()]
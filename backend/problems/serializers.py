@@ -1,12 +1,32 @@
 from rest_framework import serializers
 from .models import Problem, DailyChallenge, ProblemExample
 
+def requested_fields(request):
+    """
+    Parse the ?fields= sparse fieldset parameter into a set of field names,
+    or None if it wasn't given
+    """
+    if request is None or not request.query_params.get('fields'):
+        return None
+    return {name.strip() for name in request.query_params['fields'].split(',') if name.strip()}
+
+class SparseFieldsetMixin:
+    """
+    Limits the serialized fields to those requested with ?fields=
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields = requested_fields(self.context.get('request'))
+        if fields:
+            for name in set(self.fields) - fields:
+                self.fields.pop(name)
+
 class ProblemExampleSerializer(serializers.ModelSerializer):
     class Meta:
         model = ProblemExample
         fields = ('id', 'input', 'output', 'explanation')
 
-class ProblemSerializer(serializers.ModelSerializer):
+class ProblemSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     examples = ProblemExampleSerializer(many=True, read_only=True)
     
     class Meta:
@@ -15,6 +35,24 @@ class ProblemSerializer(serializers.ModelSerializer):
                   'difficulty', 'category', 'tags', 'success_rate', 
                   'is_premium', 'examples')
 
+class ProblemListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """
+    Compact problem representation for list pages, without the
+    description and examples
+    """
+    class Meta:
+        model = Problem
+        fields = ('id', 'leetcode_id', 'title', 'slug', 'difficulty', 
+                  'category', 'tags', 'success_rate', 'is_premium')
+
+class ProblemSummarySerializer(serializers.ModelSerializer):
+    """
+    Minimal problem representation for embedding in other resources
+    """
+    class Meta:
+        model = Problem
+        fields = ('id', 'leetcode_id', 'title', 'slug', 'difficulty')
+
 class DailyChallengeSerializer(serializers.ModelSerializer):
     problem = ProblemSerializer(read_only=True)
     
@@ -1,27 +1,141 @@
-import requests
+import hashlib
 import json
+import logging
 import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from django.conf import settings
+from django.db import IntegrityError, transaction
 from django.utils.text import slugify
-from .models import Problem, ProblemExample, DailyChallenge
+from .cache import ResponseCache
+from .daily import render_today_payload
+from .facets import build_tag_facets
+from .picker import build_problem_index
+from .search import html_to_text, update_search_index
+from .models import Problem, ProblemExample, DailyChallenge, SyncCheckpoint, Tag
+from .transport import LeetCodeTransport
 from django.utils import timezone
 
+logger = logging.getLogger(__name__)
+
+class ProblemListError(Exception):
+    """
+    Raised when a page of the problem list can't be fetched, carrying the
+    GraphQLResult of the failed request
+    """
+    
+    def __init__(self, result, skip):
+        super().__init__(f"problem list page at offset {skip} failed: {result.error}: {result.message}")
+        self.result = result
+        self.skip = skip
+
 class LeetCodeAPIService:
     """
     Service class to interact with LeetCode API
     """
     
-    GRAPHQL_ENDPOINT = "https://leetcode.com/graphql"
+    # Problem fields refreshed from the problem list on every sync
+    LIST_FIELDS = ('title', 'difficulty', 'success_rate', 'is_premium')
+    # Problem fields that come from the problem details
+    DETAIL_FIELDS = ('description', 'search_document', 'category', 'tags', 'content_hash')
+    
+    CHECKPOINT_NAME = 'problemset'
+    
+    def __init__(self, max_workers=None, rate_limit=None, batch_size=None, page_size=None,
+                 use_cache=None, offline=False, endpoint=None):
+        self.max_workers = max_workers or settings.LEETCODE_SYNC_WORKERS
+        self.batch_size = batch_size or settings.LEETCODE_SYNC_BATCH_SIZE
+        self.page_size = page_size or settings.LEETCODE_SYNC_PAGE_SIZE
+        
+        # Offline runs can only be answered from the response cache
+        if use_cache is None:
+            use_cache = settings.LEETCODE_CACHE_ENABLED
+        self.cache = ResponseCache(offline=offline) if use_cache or offline else None
+        
+        # One connection per detail worker plus one for the page prefetcher
+        self.transport = LeetCodeTransport(
+            endpoint or settings.LEETCODE_GRAPHQL_ENDPOINT,
+            pool_size=self.max_workers + 1,
+            rate_limit=rate_limit,
+            headers={
+                "Content-Type": "application/json",
+                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+            },
+            cache=self.cache
+        )
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
     
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            "Content-Type": "application/json",
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        })
+    def close(self):
+        """
+        Release the HTTP connection pool and the response cache
+        """
+        self.transport.session.close()
+        if self.cache is not None:
+            self.cache.close()
     
     def get_problem_list(self):
         """
-        Get a list of all problems from LeetCode
+        Get a list of all problems from LeetCode. Raises ProblemListError if
+        any page can't be fetched.
+        """
+        return list(self.iter_problem_list())
+    
+    def iter_problem_list(self, skip=0, page_size=None):
+        """
+        Yield problems from LeetCode one at a time, fetching them page by page
+        """
+        for _, _, questions in self.iter_problem_pages(skip=skip, page_size=page_size):
+            yield from questions
+    
+    def iter_problem_pages(self, skip=0, page_size=None):
+        """
+        Yield (skip, total, questions) for each page of the problem list.
+        
+        The next page is requested in the background while the caller works
+        on the current one. Iteration stops at the end of the list; a page
+        request that fails raises ProblemListError.
+        """
+        page_size = page_size or self.page_size
+        
+        with ThreadPoolExecutor(max_workers=1) as prefetcher:
+            future = prefetcher.submit(self.fetch_problem_page, skip, page_size)
+            while future is not None:
+                result = future.result()
+                if result.ok and not result.data.get("problemsetQuestionList"):
+                    result.error, result.message = result.INVALID_RESPONSE, "no problem list in response"
+                if not result.ok:
+                    raise ProblemListError(result, skip)
+                
+                total = result.data["problemsetQuestionList"]["total"]
+                questions = result.data["problemsetQuestionList"]["questions"]
+                next_skip = skip + len(questions)
+                future = None
+                if questions and next_skip < total:
+                    future = prefetcher.submit(self.fetch_problem_page, next_skip, page_size)
+                
+                yield skip, total, questions
+                skip = next_skip
+    
+    def get_problem_page(self, skip=0, limit=100):
+        """
+        Get one page of the problem list from LeetCode.
+        Returns a (total, questions) tuple, or None if the request failed.
+        """
+        result = self.fetch_problem_page(skip, limit)
+        if not result.ok or not result.data.get("problemsetQuestionList"):
+            return None
+        
+        problem_list = result.data["problemsetQuestionList"]
+        return problem_list["total"], problem_list["questions"]
+    
+    def fetch_problem_page(self, skip=0, limit=100):
+        """
+        Request one page of the problem list, returning the GraphQLResult
         """
         query = """
         query problemsetQuestionList($categorySlug: String, $limit: Int, $skip: Int, $filters: QuestionListFilterInput) {
@@ -49,21 +163,27 @@ class LeetCodeAPIService:
         
         variables = {
             "categorySlug": "",
-            "limit": 5000,  # Fetch a large number to get all problems
-            "skip": 0,
+            "limit": limit,
+            "skip": skip,
             "filters": {}
         }
         
-        data = self._send_graphql_request(query, variables)
-        if not data or "problemsetQuestionList" not in data:
-            return []
-        
-        return data["problemsetQuestionList"]["questions"]
+        return self.transport.execute("problemsetQuestionList", query, variables)
     
     def get_problem_details(self, title_slug):
         """
         Get detailed information about a specific problem
         """
+        result = self.fetch_problem_details(title_slug)
+        if not result.ok:
+            return None
+        
+        return result.data.get("question")
+    
+    def fetch_problem_details(self, title_slug):
+        """
+        Request the details of a specific problem, returning the GraphQLResult
+        """
         query = """
         query questionData($titleSlug: String!) {
             question(titleSlug: $titleSlug) {
@@ -100,11 +220,7 @@ class LeetCodeAPIService:
             "titleSlug": title_slug
         }
         
-        data = self._send_graphql_request(query, variables)
-        if not data or "question" not in data:
-            return None
-        
-        return data["question"]
+        return self.transport.execute("questionData", query, variables)
     
     def get_daily_challenge(self):
         """
@@ -127,94 +243,373 @@ class LeetCodeAPIService:
         }
         """
         
-        data = self._send_graphql_request(query, {})
-        if not data or "activeDailyCodingChallengeQuestion" not in data:
+        result = self.transport.execute("questionOfToday", query, {})
+        if not result.ok:
             return None
         
-        return data["activeDailyCodingChallengeQuestion"]
+        return result.data.get("activeDailyCodingChallengeQuestion")
+    
+    def sync_problems(self, refresh_caches=True):
+        """
+        Sync problems from LeetCode to our database.
+        
+        Existing rows are loaded once and diffed in memory, so only problems
+        whose list fields changed are written. Details for new problems are
+        fetched concurrently by a bounded worker pool behind the shared rate
+        limiter, and the resulting rows are inserted in batches. Returns a
+        dict of counts and throughput for the run; if a problem list page
+        fails, "completed" is False and "list_error" says why.
+        
+        Pass refresh_caches=False when the sync will be rolled back, so the
+        shared problem caches don't pick up rows that never get committed.
+        """
+        started = time.monotonic()
+        stats = self._new_stats()
+        stats["completed"] = False
+        existing = self._load_existing()
+        
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                for _, _, questions in self.iter_problem_pages():
+                    self._sync_questions(questions, existing, stats, executor)
+            stats["completed"] = True
+        except ProblemListError as e:
+            self._record_list_error(stats, e)
+        
+        if refresh_caches:
+            self.refresh_problem_caches()
+        return self._finish_stats(stats, started)
+    
+    def sync_problems_incremental(self, refresh_caches=True):
+        """
+        Sync problems page by page, resuming from the stored checkpoint.
+        
+        Details are only fetched for problems that are new or whose list
+        payload hash changed since they were last fetched. The checkpoint is
+        advanced after every page, so an interrupted run picks up where it
+        stopped, and reset once the whole problem list has been walked.
+        """
+        started = time.monotonic()
+        stats = self._new_stats()
+        
+        checkpoint, _ = SyncCheckpoint.objects.get_or_create(name=self.CHECKPOINT_NAME)
+        if checkpoint.skip_offset == 0:
+            checkpoint.started_at = timezone.now()
+            checkpoint.save(update_fields=['started_at', 'updated_at'])
+        stats["resumed_from"] = checkpoint.skip_offset
+        stats["completed"] = False
+        existing = self._load_existing()
+        
+        # A failed page ends the run and leaves the checkpoint on it
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                for skip, total, questions in self.iter_problem_pages(skip=checkpoint.skip_offset):
+                    self._sync_questions(questions, existing, stats, executor, refresh_changed=True)
+                    next_skip = skip + len(questions)
+                    
+                    if questions:
+                        checkpoint.last_question_id = int(questions[-1]["questionId"])
+                    if not questions or next_skip >= total:
+                        checkpoint.skip_offset = 0
+                        checkpoint.completed_at = timezone.now()
+                        stats["completed"] = True
+                    else:
+                        checkpoint.skip_offset = next_skip
+                    checkpoint.save()
+        except ProblemListError as e:
+            self._record_list_error(stats, e)
+        
+        if refresh_caches:
+            self.refresh_problem_caches()
+        return self._finish_stats(stats, started)
+    
+    def sync_questions(self, questions, refresh_changed=False):
+        """
+        Sync an explicit list of problem list entries, such as one shard of
+        a distributed sync. Returns the same stats dict as sync_problems.
+        """
+        started = time.monotonic()
+        stats = self._new_stats()
+        existing = self._load_existing([int(question["questionId"]) for question in questions])
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            self._sync_questions(questions, existing, stats, executor, refresh_changed=refresh_changed)
+        
+        return self._finish_stats(stats, started)
+    
+    def refresh_problem_caches(self):
+        """
+        Rebuild data derived from the problems table after a sync. The
+        search index follows writes by itself; this only fills in vectors
+        still missing.
+        """
+        build_problem_index()
+        build_tag_facets()
+        update_search_index()
+    
+    def _new_stats(self):
+        return {"processed": 0, "created": 0, "updated": 0, "refreshed": 0, "failed": 0, "errors": Counter()}
+    
+    def _record_list_error(self, stats, error):
+        stats["errors"][error.result.error] += 1
+        stats["list_error"] = str(error)
+        logger.error("Stopped syncing problems: %s", error)
+    
+    def _load_existing(self, leetcode_ids=None):
+        """
+        Load the fields sync compares against into a leetcode_id -> problem map
+        """
+        problems = Problem.objects.only('id', 'leetcode_id', 'content_hash', *self.LIST_FIELDS)
+        if leetcode_ids is not None:
+            problems = problems.filter(leetcode_id__in=leetcode_ids)
+        return problems.in_bulk(field_name='leetcode_id')
+    
+    def _finish_stats(self, stats, started):
+        stats["elapsed"] = time.monotonic() - started
+        stats["rate"] = stats["processed"] / stats["elapsed"] if stats["elapsed"] else 0.0
+        if self.cache is not None:
+            stats["cache"] = self.cache.stats()
+        logger.info("Synced %d new problems (%.1f problems/sec)", stats["created"], stats["rate"])
+        return stats
     
-    def _send_graphql_request(self, query, variables):
+    def _content_hash(self, problem_data):
         """
-        Helper method to send GraphQL requests to LeetCode API
+        Hash the parts of a list entry that imply the problem details changed.
+        The acceptance rate moves constantly and is left out.
         """
         payload = {
-            "query": query,
-            "variables": variables
+            "title": problem_data["title"],
+            "titleSlug": problem_data["titleSlug"],
+            "difficulty": problem_data["difficulty"],
+            "isPaidOnly": problem_data["isPaidOnly"],
+            "topicTags": sorted(tag["name"] for tag in problem_data.get("topicTags") or []),
         }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+    
+    def _sync_questions(self, questions, existing, stats, executor, refresh_changed=False):
+        """
+        Sync a page of problem list entries against the existing problem map.
         
-        try:
-            response = self.session.post(self.GRAPHQL_ENDPOINT, json=payload)
-            response.raise_for_status()
-            result = response.json()
+        List fields of known problems are diffed and bulk-updated. Details are
+        fetched concurrently on the executor for new problems, and for known
+        problems whose content hash changed when refresh_changed is set.
+        """
+        stats["processed"] += len(questions)
+        
+        to_fetch = []
+        changed = []
+        for problem_data in questions:
+            problem = existing.get(int(problem_data["questionId"]))
+            if problem is None:
+                to_fetch.append((problem_data, None))
+            elif refresh_changed and problem.content_hash != self._content_hash(problem_data):
+                to_fetch.append((problem_data, problem))
+            elif self._apply_list_fields(problem, problem_data):
+                changed.append(problem)
+        
+        stats["updated"] += self._bulk_update_problems(changed, self.LIST_FIELDS)
+        
+        pending = []
+        refreshed = []
+        futures = {
+            executor.submit(self.fetch_problem_details, problem_data["titleSlug"]): (problem_data, current)
+            for problem_data, current in to_fetch
+        }
+        # Database writes stay on this thread while workers keep fetching
+        for future in as_completed(futures):
+            problem_data, current = futures[future]
+            try:
+                result = future.result()
+                if result.ok and not result.data.get("question"):
+                    result.error, result.message = result.INVALID_RESPONSE, "no question in response"
+                if not result.ok:
+                    stats["failed"] += 1
+                    stats["errors"][result.error] += 1
+                    logger.warning("Failed to sync problem %s: %r", problem_data["titleSlug"], result)
+                    continue
+                problem, examples = self._build_problem(problem_data, result.data["question"])
+            except Exception:
+                stats["failed"] += 1
+                stats["errors"]["exception"] += 1
+                logger.exception("Failed to sync problem %s", problem_data["titleSlug"])
+                continue
             
-            if "errors" in result:
-                print(f"GraphQL Error: {result['errors']}")
-                return None
+            if current is None:
+                pending.append((problem, examples))
+            else:
+                problem.pk = current.pk
+                refreshed.append((problem, examples))
             
-            return result["data"]
-        except Exception as e:
-            print(f"Error calling LeetCode API: {str(e)}")
-            return None
+            if len(pending) >= self.batch_size:
+                self._flush_created(pending, existing, stats)
+                pending = []
+            if len(refreshed) >= self.batch_size:
+                self._flush_refreshed(refreshed, existing, stats)
+                refreshed = []
+        
+        if pending:
+            self._flush_created(pending, existing, stats)
+        if refreshed:
+            self._flush_refreshed(refreshed, existing, stats)
+    
+    def _flush_created(self, pending, existing, stats):
+        created, errors = self._bulk_create_problems(pending)
+        self._set_problem_tags(created)
+        stats["created"] += len(created)
+        stats["failed"] += errors
+        if errors:
+            stats["errors"]["integrity"] += errors
+        for problem in created:
+            existing[problem.leetcode_id] = problem
+    
+    def _flush_refreshed(self, refreshed, existing, stats):
+        problems = [problem for problem, _ in refreshed]
+        with transaction.atomic():
+            self._bulk_update_problems(problems, self.LIST_FIELDS + self.DETAIL_FIELDS)
+            ProblemExample.objects.filter(problem__in=problems).delete()
+            ProblemExample.objects.bulk_create(
+                [example for _, examples in refreshed for example in examples]
+            )
+            self._set_problem_tags(problems)
+        stats["refreshed"] += len(problems)
+        for problem in problems:
+            existing[problem.leetcode_id] = problem
     
-    def sync_problems(self):
+    def _set_problem_tags(self, problems):
         """
-        Sync problems from LeetCode to our database
+        Point the tag relations of saved problems at the names in their
+        tags field, creating tags that haven't been seen before
         """
-        problems = self.get_problem_list()
-        count = 0
+        if not problems:
+            return
+        slugs = {slugify(name): name for problem in problems for name in problem.tags}
+        Tag.objects.bulk_create(
+            [Tag(name=name, slug=slug) for slug, name in slugs.items()], ignore_conflicts=True
+        )
+        tag_ids = dict(Tag.objects.filter(slug__in=slugs).values_list('slug', 'id'))
         
-        for problem_data in problems:
-            # Sleep briefly to avoid overwhelming the API
-            time.sleep(0.5)
-            
-            # Check if problem already exists
-            leetcode_id = problem_data["questionId"]
-            try:
-                problem = Problem.objects.get(leetcode_id=leetcode_id)
-                # Update existing problem
-                problem.title = problem_data["title"]
-                problem.difficulty = problem_data["difficulty"].lower()
-                problem.success_rate = float(problem_data["acRate"])
-                problem.is_premium = problem_data["isPaidOnly"]
-                problem.save()
-            except Problem.DoesNotExist:
-                # Get detailed problem information
-                details = self.get_problem_details(problem_data["titleSlug"])
-                if not details:
-                    continue
-                
-                # Extract tags
-                tags = [tag["name"] for tag in problem_data["topicTags"]]
-                
-                # Create new problem
-                problem = Problem.objects.create(
-                    leetcode_id=leetcode_id,
-                    title=problem_data["title"],
-                    slug=problem_data["titleSlug"],
-                    difficulty=problem_data["difficulty"].lower(),
-                    description=details["content"],
-                    category=details.get("categoryTitle", ""),
-                    tags=",".join(tags),
-                    success_rate=float(problem_data["acRate"]),
-                    is_premium=problem_data["isPaidOnly"]
+        ProblemTag = Problem.topic_tags.through
+        with transaction.atomic():
+            ProblemTag.objects.filter(problem__in=problems).delete()
+            ProblemTag.objects.bulk_create([
+                ProblemTag(problem_id=problem.pk, tag_id=tag_ids[slug])
+                for problem in problems
+                for slug in {slugify(name) for name in problem.tags}
+            ], batch_size=self.batch_size)
+    
+    def _apply_list_fields(self, problem, problem_data):
+        """
+        Copy list fields onto an existing problem, returning True if any changed
+        """
+        values = {
+            "title": problem_data["title"],
+            "difficulty": problem_data["difficulty"].lower(),
+            "success_rate": float(problem_data["acRate"]),
+            "is_premium": problem_data["isPaidOnly"],
+        }
+        
+        changed = False
+        for field, value in values.items():
+            if getattr(problem, field) != value:
+                setattr(problem, field, value)
+                changed = True
+        return changed
+    
+    def _chunks(self, items):
+        for i in range(0, len(items), self.batch_size):
+            yield items[i:i + self.batch_size]
+    
+    def _bulk_update_problems(self, problems, fields):
+        """
+        Write changed fields back in chunked transactions
+        """
+        # bulk_update() bypasses auto_now, so stamp the rows we actually touch
+        now = timezone.now()
+        for problem in problems:
+            problem.updated_at = now
+        
+        for chunk in self._chunks(problems):
+            with transaction.atomic():
+                Problem.objects.bulk_update(chunk, fields + ('updated_at',))
+        return len(problems)
+    
+    def _bulk_create_problems(self, pending):
+        """
+        Insert a batch of (problem, examples) pairs in one transaction.
+        
+        If the batch hits a constraint violation, fall back to inserting the
+        rows one at a time so a single bad problem doesn't drop the batch.
+        Returns a (created problems, failed count) tuple.
+        """
+        try:
+            with transaction.atomic():
+                Problem.objects.bulk_create([problem for problem, _ in pending])
+                ProblemExample.objects.bulk_create(
+                    [example for _, examples in pending for example in examples]
                 )
-                
-                # Create example testcases
-                if details.get("exampleTestcases"):
-                    examples = details["exampleTestcases"].split("\n")
-                    for i, example in enumerate(examples):
-                        if example.strip():
-                            ProblemExample.objects.create(
-                                problem=problem,
-                                input_data=example.strip(),
-                                order=i+1
-                            )
-                
-                count += 1
-                print(f"Added problem: {problem.title}")
+            for problem, _ in pending:
+                logger.info("Added problem: %s", problem.title)
+            return [problem for problem, _ in pending], 0
+        except IntegrityError:
+            pass
         
-        print(f"Synced {count} new problems")
-        return count
+        created = []
+        failed = 0
+        for problem, examples in pending:
+            problem.pk = None
+            try:
+                with transaction.atomic():
+                    problem.save()
+                    for example in examples:
+                        example.problem = problem
+                    ProblemExample.objects.bulk_create(examples)
+            except IntegrityError as e:
+                failed += 1
+                logger.warning("Failed to sync problem %s: %s", problem.slug, e)
+                continue
+            created.append(problem)
+            logger.info("Added problem: %s", problem.title)
+        return created, failed
+    
+    def _build_problem(self, problem_data, details):
+        """
+        Build an unsaved problem and its examples from list and detail payloads
+        """
+        tags = [tag["name"] for tag in problem_data.get("topicTags") or details.get("topicTags") or []]
+        
+        problem = Problem(
+            leetcode_id=problem_data["questionId"],
+            title=problem_data["title"],
+            slug=problem_data["titleSlug"],
+            difficulty=problem_data["difficulty"].lower(),
+            description=details.get("content") or "",
+            search_document=html_to_text(details.get("content")),
+            category=details.get("categoryTitle", ""),
+            tags=tags,
+            success_rate=float(problem_data.get("acRate") or 0.0),
+            is_premium=problem_data["isPaidOnly"],
+            content_hash=self._content_hash({**problem_data, "topicTags": [{"name": tag} for tag in tags]})
+        )
+        
+        # Example testcases
+        examples = []
+        if details.get("exampleTestcases"):
+            for example in details["exampleTestcases"].split("\n"):
+                if example.strip():
+                    examples.append(ProblemExample(problem=problem, input=example.strip(), output=""))
+        
+        return problem, examples
+    
+    def _create_problem(self, problem_data, details):
+        """
+        Create a single problem and its examples
+        """
+        problem, examples = self._build_problem(problem_data, details)
+        with transaction.atomic():
+            problem.save()
+            ProblemExample.objects.bulk_create(examples)
+            self._set_problem_tags([problem])
+        return problem
     
     def sync_daily_challenge(self):
         """
@@ -243,33 +638,9 @@ class LeetCodeAPIService:
             if not details:
                 return None
             
-            # Extract tags if available
-            tags = []
-            if "topicTags" in details:
-                tags = [tag["name"] for tag in details["topicTags"]]
-            
-            problem = Problem.objects.create(
-                leetcode_id=leetcode_id,
-                title=daily["question"]["title"],
-                slug=title_slug,
-                difficulty=daily["question"]["difficulty"].lower(),
-                description=details.get("content", ""),
-                category=details.get("categoryTitle", ""),
-                tags=",".join(tags),
-                success_rate=0.0,  # We don't have this information from the daily challenge API
-                is_premium=daily["question"]["isPaidOnly"]
-            )
-            
-            # Create example testcases
-            if details.get("exampleTestcases"):
-                examples = details["exampleTestcases"].split("\n")
-                for i, example in enumerate(examples):
-                    if example.strip():
-                        ProblemExample.objects.create(
-                            problem=problem,
-                            input_data=example.strip(),
-                            order=i+1
-                        )
+            # We don't have the acceptance rate from the daily challenge API
+            problem = self._create_problem(daily["question"], details)
+            self.refresh_problem_caches()
         
         # Create or update the daily challenge
         daily_challenge, created = DailyChallenge.objects.update_or_create(
@@ -277,4 +648,8 @@ class LeetCodeAPIService:
             defaults={"problem": problem}
         )
         
+        # Render the today payload once here instead of on every request
+        if challenge_date == timezone.localdate():
+            render_today_payload(daily_challenge)
+        
         return daily_challenge
\ No newline at end of file
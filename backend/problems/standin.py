@@ -0,0 +1,219 @@
+import json
+import random
+import threading
+import time
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+TOPICS = [
+    'Array', 'String', 'Hash Table', 'Dynamic Programming', 'Math', 'Sorting',
+    'Greedy', 'Depth-First Search', 'Binary Search', 'Tree', 'Graph', 'Two Pointers',
+    'Stack', 'Heap (Priority Queue)', 'Linked List', 'Sliding Window', 'Backtracking',
+]
+
+class SyntheticCatalog:
+    """
+    Deterministic catalog of fake LeetCode problems served by the stand-in
+    server. Ids start at id_offset so synthetic problems never collide with
+    real ones in a development database.
+    """
+    
+    def __init__(self, size=3000, seed=0, id_offset=1000000, questions=None, details=None):
+        if questions is None:
+            rng = random.Random(seed)
+            questions = [
+                {
+                    "questionId": str(id_offset + i),
+                    "title": f"Stand-in Problem {i}",
+                    "titleSlug": f"standin-problem-{i}",
+                    "difficulty": rng.choice(["Easy", "Medium", "Hard"]),
+                    "topicTags": [{"name": name} for name in rng.sample(TOPICS, rng.randint(1, 4))],
+                    "acRate": round(rng.uniform(15, 85), 4),
+                    "isPaidOnly": rng.random() < 0.15,
+                }
+                for i in range(1, size + 1)
+            ]
+        self.questions = questions
+        self.details = details or {}
+        self._by_slug = {question["titleSlug"]: question for question in questions}
+    
+    @classmethod
+    def from_fixture(cls, path):
+        """
+        Load a catalog recorded with dump()
+        """
+        with open(path) as f:
+            fixture = json.load(f)
+        return cls(questions=fixture["questions"], details=fixture.get("details"))
+    
+    def dump(self, path):
+        """
+        Record the catalog, including every problem's details, as a JSON fixture
+        """
+        with open(path, 'w') as f:
+            json.dump({
+                "questions": self.questions,
+                "details": {q["titleSlug"]: self.question_data(q["titleSlug"]) for q in self.questions},
+            }, f)
+    
+    def page(self, skip, limit):
+        return {
+            "total": len(self.questions),
+            "questions": self.questions[skip:skip + limit],
+        }
+    
+    def question_data(self, slug):
+        if slug in self.details:
+            return self.details[slug]
+        
+        question = self._by_slug.get(slug)
+        if question is None:
+            return None
+        
+        number = question["questionId"]
+        return {
+            "questionId": number,
+            "title": question["title"],
+            "titleSlug": slug,
+            "content": f"<p>Synthetic description for problem {number}.</p>" * 20,
+            "difficulty": question["difficulty"],
+            "topicTags": question["topicTags"],
+            "exampleTestcases": f"[{number}, 2, 3]\n{number}\n[]",
+            "categoryTitle": "Algorithms",
+            "codeSnippets": [],
+            "stats": "{}",
+            "hints": [],
+            "solution": None,
+            "isPaidOnly": question["isPaidOnly"],
+            "similarQuestions": "[]",
+            "metaData": "{}",
+        }
+    
+    def daily(self):
+        today = date.today()
+        question = self.questions[today.toordinal() % len(self.questions)]
+        return {
+            "date": today.isoformat(),
+            "userStatus": "NotStart",
+            "link": f"/problems/{question['titleSlug']}/",
+            "question": {key: question[key] for key in ("questionId", "title", "titleSlug", "difficulty", "isPaidOnly")},
+        }
+
+class StandInServer:
+    """
+    Local HTTP server answering the GraphQL operations LeetCodeAPIService
+    uses, with injectable latency, error rate and 429 throttling.
+    """
+    
+    def __init__(self, catalog, host='127.0.0.1', port=0, latency=0.0, error_rate=0.0,
+                 throttle_rate=0.0, retry_after=1, seed=None):
+        self.catalog = catalog
+        self.latency = latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.requests = 0
+        self.errors = 0
+        self.throttled = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._thread = None
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+    
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/graphql"
+    
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, *exc_info):
+        self.stop()
+    
+    def stats(self):
+        with self._lock:
+            return {"requests": self.requests, "errors": self.errors, "throttled": self.throttled}
+    
+    def _roll(self):
+        """
+        Decide the fate of a request: None, 'error' or 'throttle'
+        """
+        with self._lock:
+            self.requests += 1
+            roll = self._rng.random()
+            if roll < self.throttle_rate:
+                self.throttled += 1
+                return 'throttle'
+            if roll < self.throttle_rate + self.error_rate:
+                self.errors += 1
+                return 'error'
+        return None
+    
+    def respond(self, payload):
+        """
+        Build the (status, body) answer for a GraphQL payload
+        """
+        operation = payload.get("operationName") or ""
+        query = payload.get("query") or ""
+        variables = payload.get("variables") or {}
+        
+        if operation == "problemsetQuestionList" or "problemsetQuestionList" in query:
+            page = self.catalog.page(int(variables.get("skip") or 0), int(variables.get("limit") or 50))
+            return 200, {"data": {"problemsetQuestionList": page}}
+        if operation == "questionData" or "questionData" in query:
+            return 200, {"data": {"question": self.catalog.question_data(variables.get("titleSlug"))}}
+        if operation == "questionOfToday" or "questionOfToday" in query:
+            return 200, {"data": {"activeDailyCodingChallengeQuestion": self.catalog.daily()}}
+        return 400, {"errors": [{"message": f"Unknown operation {operation!r}"}]}
+    
+    def _handler_class(self):
+        server = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            # Keep connections alive so the client's pool is exercised
+            protocol_version = "HTTP/1.1"
+            
+            def log_message(self, format, *args):
+                pass
+            
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    payload = json.loads(self.rfile.read(length) or b"{}")
+                except ValueError:
+                    payload = {}
+                
+                if server.latency:
+                    time.sleep(server.latency * random.uniform(0.5, 1.5))
+                
+                fate = server._roll()
+                headers = {}
+                if fate == 'throttle':
+                    status, body = 429, {"errors": [{"message": "Too many requests"}]}
+                    headers["Retry-After"] = str(server.retry_after)
+                elif fate == 'error':
+                    status, body = 500, {"errors": [{"message": "Injected failure"}]}
+                else:
+                    status, body = server.respond(payload)
+                
+                encoded = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(encoded)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(encoded)
+        
+        return Handler
@@ -0,0 +1,113 @@
+import logging
+from celery import chord, shared_task
+from django.conf import settings
+from django.utils import timezone
+from .models import SyncRun
+from .services import LeetCodeAPIService, ProblemListError
+
+logger = logging.getLogger(__name__)
+
+@shared_task(bind=True, max_retries=6, default_retry_delay=10 * 60)
+def sync_daily_challenge(self):
+    """
+    Sync today's daily challenge, retrying until LeetCode publishes it
+    """
+    with LeetCodeAPIService() as service:
+        daily = service.sync_daily_challenge()
+    if daily is None:
+        raise self.retry()
+    return daily.id
+
+@shared_task
+def sync_all_problems(shard_size=None, refresh_changed=False):
+    """
+    Fan a full problem sync out across workers.
+    
+    The problem list is fetched once and split into shards that are synced
+    by parallel sync_problem_shard tasks; reconcile_problem_sync runs once
+    they have all finished. Returns the id of the SyncRun recording it.
+    
+    If the problem list can't be fetched in full, the run is marked failed
+    and nothing is synced. If a shard raises, fail_problem_sync marks the
+    run failed in place of the reconcile.
+    """
+    shard_size = shard_size or settings.LEETCODE_SYNC_SHARD_SIZE
+    run = SyncRun.objects.create(mode='incremental' if refresh_changed else 'full')
+    try:
+        with LeetCodeAPIService() as service:
+            questions = service.get_problem_list()
+    except ProblemListError as e:
+        _finish_failed(run, {e.result.error: 1})
+        raise
+    
+    shards = [questions[i:i + shard_size] for i in range(0, len(questions), shard_size)]
+    run.shards = len(shards)
+    run.save(update_fields=['shards'])
+    if not shards:
+        reconcile_problem_sync([], run.id)
+        return run.id
+    
+    chord(
+        sync_problem_shard.s(shard, refresh_changed) for shard in shards
+    )(reconcile_problem_sync.s(run.id).on_error(fail_problem_sync.s(run.id)))
+    return run.id
+
+def _finish_failed(run, errors):
+    run.status = 'failed'
+    run.errors = errors
+    run.finished_at = timezone.now()
+    run.duration = (run.finished_at - run.started_at).total_seconds()
+    run.save()
+
+@shared_task
+def sync_problem_shard(questions, refresh_changed=False):
+    """
+    Sync one shard of problem list entries and return its stats.
+    
+    Every shard has its own rate limiter, so the request rate against
+    LeetCode is roughly LEETCODE_SYNC_SHARD_RATE_LIMIT times the number of
+    shards running at once.
+    """
+    with LeetCodeAPIService(
+        max_workers=settings.LEETCODE_SYNC_SHARD_WORKERS,
+        rate_limit=settings.LEETCODE_SYNC_SHARD_RATE_LIMIT,
+    ) as service:
+        stats = service.sync_questions(questions, refresh_changed=refresh_changed)
+    stats["errors"] = dict(stats["errors"])
+    stats.pop("cache", None)
+    return stats
+
+@shared_task
+def reconcile_problem_sync(shard_stats, run_id):
+    """
+    Record the combined counts and wall-clock duration of a sharded sync
+    """
+    run = SyncRun.objects.get(id=run_id)
+    errors = {}
+    for stats in shard_stats:
+        for field in ('processed', 'created', 'updated', 'refreshed', 'failed'):
+            setattr(run, field, getattr(run, field) + stats[field])
+        for error, count in stats["errors"].items():
+            errors[error] = errors.get(error, 0) + count
+    
+    run.errors = errors
+    run.status = 'completed'
+    run.finished_at = timezone.now()
+    run.duration = (run.finished_at - run.started_at).total_seconds()
+    run.save()
+    
+    with LeetCodeAPIService() as service:
+        service.refresh_problem_caches()
+    return run.id
+
+@shared_task
+def fail_problem_sync(request, exc, traceback, run_id):
+    """
+    Error callback of a sharded sync: a shard or the reconcile raised, so
+    mark the run failed rather than leave it running
+    """
+    logger.error("Sharded problem sync %s failed: %s", run_id, exc)
+    run = SyncRun.objects.get(id=run_id)
+    if run.status == 'running':
+        _finish_failed(run, {**run.errors, type(exc).__name__: 1})
+    return run.id
@@ -1,3 +1,563 @@
-from django.test import TestCase
+import os
+import sqlite3
+import tempfile
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+from celery.exceptions import ChordError
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from users.models import User
+from .models import DailyChallenge, Problem, ProblemExample, SyncCheckpoint, SyncRun, Tag
+from .cache import ResponseCache
+from .facets import build_tag_facets, get_tag_facets
+from .picker import PROBLEM_INDEX_CACHE_KEY, build_problem_index, get_problem_index, pick_random_problem_id
+from .services import LeetCodeAPIService, ProblemListError
+from .standin import StandInServer, SyntheticCatalog
+from .tasks import sync_all_problems
+from .transport import TokenBucket
 
-# Create your tests here.
+class StandInTestCase(TestCase):
+    """
+    Runs a LeetCode stand-in server for the duration of the test class
+    """
+    
+    catalog_size = 30
+    
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = StandInServer(SyntheticCatalog(size=0)).start()
+        cls.addClassCleanup(cls.server.stop)
+    
+    def setUp(self):
+        # Tests may edit the catalog, so each one gets a fresh copy
+        self.catalog = self.server.catalog = SyntheticCatalog(size=self.catalog_size)
+    
+    def service(self, **kwargs):
+        options = {"max_workers": 4, "rate_limit": 0, "page_size": 10, "use_cache": False}
+        options.update(kwargs)
+        return LeetCodeAPIService(endpoint=self.server.url, **options)
+    
+    def fail_pages_from(self, skip):
+        """
+        Answer problem list pages from `skip` on with a GraphQL error
+        """
+        respond = self.server.respond
+        
+        def failing(payload):
+            if payload.get("operationName") == "problemsetQuestionList" and payload["variables"]["skip"] >= skip:
+                return 200, {"errors": [{"message": "Injected failure"}]}
+            return respond(payload)
+        self.server.respond = failing
+        self.addCleanup(self.restore_pages)
+    
+    def restore_pages(self):
+        vars(self.server).pop('respond', None)
+
+class TokenBucketTests(TestCase):
+    """
+    The rate limiter shared by sync workers
+    """
+    
+    def test_acquire_waits_for_tokens(self):
+        bucket = TokenBucket(rate=50, capacity=1)
+        started = time.monotonic()
+        for _ in range(6):
+            bucket.acquire()
+        # The first token is free, the next five arrive 20ms apart
+        self.assertGreaterEqual(time.monotonic() - started, 0.09)
+    
+    def test_zero_rate_disables_limiting(self):
+        bucket = TokenBucket(rate=0)
+        started = time.monotonic()
+        for _ in range(1000):
+            bucket.acquire()
+        self.assertLess(time.monotonic() - started, 0.1)
+
+class ResponseCacheTests(TestCase):
+    """
+    The SQLite response cache degrades to misses instead of failing a sync
+    """
+    
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'responses.sqlite3')
+    
+    def test_round_trip_in_wal_mode(self):
+        with ResponseCache(path=self.path, ttls={}) as response_cache:
+            response_cache.set('questionData', {'titleSlug': 'two-sum'}, {'question': {'title': 'Two Sum'}})
+            self.assertEqual(
+                response_cache.get('questionData', {'titleSlug': 'two-sum'}),
+                {'question': {'title': 'Two Sum'}}
+            )
+            journal_mode = response_cache._connection.execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(journal_mode, 'wal')
+        # Leaving the block closes the connection
+        with self.assertRaises(sqlite3.ProgrammingError):
+            response_cache._connection.execute("SELECT 1")
+    
+    def test_database_errors_are_misses(self):
+        with ResponseCache(path=self.path, ttls={}) as response_cache:
+            response_cache._connection.execute("DROP TABLE responses")
+            with self.assertLogs('problems.cache', 'WARNING'):
+                response_cache.set('questionData', {'titleSlug': 'two-sum'}, {'question': {}})
+                self.assertIsNone(response_cache.get('questionData', {'titleSlug': 'two-sum'}))
+            self.assertEqual(response_cache.stats()['stores'], 0)
+            self.assertEqual(response_cache.stats()['misses'], 1)
+
+class ConcurrentSyncTests(StandInTestCase):
+    """
+    Problem details are fetched by a worker pool and failures only drop
+    the problem they belong to
+    """
+    
+    def test_sync_creates_every_problem_with_details(self):
+        stats = self.service().sync_problems()
+        
+        self.assertEqual((stats["processed"], stats["created"], stats["failed"]), (30, 30, 0))
+        self.assertEqual(Problem.objects.count(), 30)
+        problem = Problem.objects.get(slug='standin-problem-7')
+        self.assertIn('Synthetic description', problem.description)
+        self.assertEqual(problem.examples.count(), 3)
+    
+    def test_failed_details_are_counted_and_skipped(self):
+        self.catalog.details['standin-problem-3'] = None
+        stats = self.service().sync_problems()
+        
+        self.assertEqual((stats["created"], stats["failed"]), (29, 1))
+        self.assertEqual(stats["errors"]["invalid_response"], 1)
+        self.assertFalse(Problem.objects.filter(slug='standin-problem-3').exists())
+    
+    def test_rate_limit_spaces_requests(self):
+        self.catalog = self.server.catalog = SyntheticCatalog(size=10)
+        started = time.monotonic()
+        self.service(rate_limit=5).sync_problems()
+        # One list page and ten details: a burst of five, then 200ms apart
+        self.assertGreaterEqual(time.monotonic() - started, 1.1)
+        self.assertEqual(ProblemExample.objects.count(), 30)
+
+class DiffSyncTests(StandInTestCase):
+    """
+    Re-syncing writes only the problems whose list fields changed
+    """
+    
+    def test_unchanged_problems_are_not_written(self):
+        self.service().sync_problems()
+        stamps = dict(Problem.objects.values_list('slug', 'updated_at'))
+        
+        self.catalog.questions[4]["acRate"] = 99.5
+        self.catalog.questions[9]["title"] = "Renamed Problem"
+        stats = self.service().sync_problems()
+        
+        self.assertEqual((stats["created"], stats["updated"], stats["failed"]), (0, 2, 0))
+        changed = {
+            slug for slug, updated_at in Problem.objects.values_list('slug', 'updated_at')
+            if updated_at != stamps[slug]
+        }
+        self.assertEqual(changed, {'standin-problem-5', 'standin-problem-10'})
+        self.assertEqual(Problem.objects.get(slug='standin-problem-5').success_rate, 99.5)
+        self.assertEqual(Problem.objects.get(slug='standin-problem-10').title, "Renamed Problem")
+    
+    def test_new_problems_are_inserted_in_batches(self):
+        self.service().sync_problems()
+        # The same seed yields the same first 30 problems
+        self.server.catalog = SyntheticCatalog(size=35)
+        
+        stats = self.service(batch_size=2).sync_problems()
+        
+        self.assertEqual((stats["processed"], stats["created"], stats["updated"]), (35, 5, 0))
+        self.assertEqual(Problem.objects.count(), 35)
+        self.assertEqual(ProblemExample.objects.count(), 35 * 3)
+
+class IncrementalSyncTests(StandInTestCase):
+    """
+    Incremental syncs checkpoint every page, resume after an interruption
+    and only refetch details whose list payload changed
+    """
+    
+    def test_interrupted_sync_resumes_from_checkpoint(self):
+        self.fail_pages_from(20)
+        stats = self.service().sync_problems_incremental()
+        
+        self.assertFalse(stats["completed"])
+        self.assertEqual(stats["created"], 20)
+        checkpoint = SyncCheckpoint.objects.get(name='problemset')
+        self.assertEqual(checkpoint.skip_offset, 20)
+        self.assertEqual(checkpoint.last_question_id, int(self.catalog.questions[19]["questionId"]))
+        
+        self.restore_pages()
+        stats = self.service().sync_problems_incremental()
+        
+        self.assertTrue(stats["completed"])
+        self.assertEqual((stats["resumed_from"], stats["processed"], stats["created"]), (20, 10, 10))
+        self.assertEqual(Problem.objects.count(), 30)
+        checkpoint.refresh_from_db()
+        self.assertEqual(checkpoint.skip_offset, 0)
+        self.assertIsNotNone(checkpoint.completed_at)
+    
+    def test_details_are_refetched_only_when_the_hash_changes(self):
+        self.service().sync_problems_incremental()
+        
+        self.catalog.questions[0]["acRate"] = 12.5
+        self.catalog.questions[1]["topicTags"] = [{"name": "Graph"}]
+        requests_before = self.server.stats()["requests"]
+        stats = self.service().sync_problems_incremental()
+        
+        self.assertEqual((stats["created"], stats["refreshed"], stats["updated"]), (0, 1, 1))
+        # Three list pages and the details of the retagged problem
+        self.assertEqual(self.server.stats()["requests"] - requests_before, 4)
+        self.assertEqual(Problem.objects.get(slug='standin-problem-2').tags, ["Graph"])
+
+class ProblemListFailureTests(StandInTestCase):
+    """
+    A problem list page that can't be fetched fails the sync instead of
+    passing off a truncated catalog as complete
+    """
+    
+    def test_failed_page_fails_the_full_sync(self):
+        self.fail_pages_from(10)
+        stats = self.service().sync_problems()
+        
+        self.assertFalse(stats["completed"])
+        self.assertEqual(stats["errors"]["graphql"], 1)
+        self.assertIn("offset 10", stats["list_error"])
+        self.assertEqual(Problem.objects.count(), 10)
+    
+    def test_failed_page_fails_the_sharded_sync(self):
+        self.fail_pages_from(0)
+        with override_settings(LEETCODE_GRAPHQL_ENDPOINT=self.server.url, LEETCODE_SYNC_RATE_LIMIT=0):
+            with self.assertRaises(ProblemListError):
+                sync_all_problems()
+        
+        run = SyncRun.objects.get()
+        self.assertEqual((run.status, run.shards, run.errors), ('failed', 0, {"graphql": 1}))
+        self.assertFalse(Problem.objects.exists())
+    
+    def test_failed_page_fails_the_command(self):
+        self.fail_pages_from(0)
+        with override_settings(LEETCODE_GRAPHQL_ENDPOINT=self.server.url, LEETCODE_SYNC_RATE_LIMIT=0):
+            with self.assertRaisesMessage(CommandError, "offset 0"):
+                call_command('sync_leetcode', '--all', stdout=StringIO())
+
+class ShardedSyncFailureTests(StandInTestCase):
+    """
+    A shard that raises fails the sharded sync's run instead of leaving it
+    running
+    """
+    
+    def run_chord(self, header):
+        """
+        Stand in for celery.chord: apply the shards, then either the body
+        or, like the result backend does when a shard raises, the body's
+        error callbacks
+        """
+        def apply(body):
+            results = [shard.apply() for shard in header]
+            failed = [result for result in results if result.failed()]
+            if not failed:
+                return body.apply(([result.result for result in results],))
+            error = ChordError(f"Dependency {failed[0].id} raised {failed[0].result!r}")
+            for errback in body.options['link_error']:
+                errback({"id": body.id}, error, None)
+        return apply
+    
+    def test_failed_shard_fails_the_run(self):
+        sync_questions = LeetCodeAPIService.sync_questions
+        
+        def fail_second_shard(service, questions, *args, **kwargs):
+            if questions[0]["titleSlug"] == self.catalog.questions[10]["titleSlug"]:
+                raise RuntimeError("Worker lost")
+            return sync_questions(service, questions, *args, **kwargs)
+        
+        with override_settings(
+            LEETCODE_GRAPHQL_ENDPOINT=self.server.url, LEETCODE_SYNC_RATE_LIMIT=0, LEETCODE_SYNC_SHARD_RATE_LIMIT=0
+        ), mock.patch('problems.tasks.chord', self.run_chord), mock.patch.object(
+            LeetCodeAPIService, 'sync_questions', autospec=True, side_effect=fail_second_shard
+        ), self.assertLogs('problems.tasks', 'ERROR'):
+            sync_all_problems(shard_size=10)
+        
+        run = SyncRun.objects.get()
+        self.assertEqual((run.status, run.shards, run.errors), ('failed', 3, {"ChordError": 1}))
+        self.assertIsNotNone(run.finished_at)
+        self.assertEqual(Problem.objects.count(), 20)
+    
+    def test_shards_that_succeed_complete_the_run(self):
+        with override_settings(
+            LEETCODE_GRAPHQL_ENDPOINT=self.server.url, LEETCODE_SYNC_RATE_LIMIT=0, LEETCODE_SYNC_SHARD_RATE_LIMIT=0
+        ), mock.patch('problems.tasks.chord', self.run_chord):
+            sync_all_problems(shard_size=10)
+        
+        run = SyncRun.objects.get()
+        self.assertEqual((run.status, run.processed, run.created), ('completed', 30, 30))
+
+class DailyChallengeTodayTests(TestCase):
+    """
+    The today payload revalidates with 304s until the challenge rolls over
+    """
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='student', email='student@example.com', password='x')
+        cls.problems = [
+            Problem.objects.create(
+                leetcode_id=number, title=f'Problem {number}', slug=f'problem-{number}',
+                description='<p>Description</p>', difficulty='easy', category='Algorithms'
+            )
+            for number in (1, 2)
+        ]
+    
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+    
+    def test_unchanged_challenge_is_not_modified(self):
+        DailyChallenge.objects.create(date=timezone.localdate(), problem=self.problems[0])
+        response = self.client.get('/api/daily-challenges/today/')
+        
+        revalidated = self.client.get(
+            '/api/daily-challenges/today/', HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        self.assertEqual(revalidated.status_code, 304)
+    
+    def test_rollover_to_an_older_problem_is_modified(self):
+        now = timezone.now()
+        Problem.objects.filter(id=self.problems[1].id).update(updated_at=now - timedelta(days=30))
+        DailyChallenge.objects.create(date=timezone.localdate(now), problem=self.problems[0])
+        response = self.client.get('/api/daily-challenges/today/')
+        
+        tomorrow = now + timedelta(days=1)
+        DailyChallenge.objects.create(date=timezone.localdate(tomorrow), problem=self.problems[1])
+        with mock.patch('django.utils.timezone.now', return_value=tomorrow):
+            revalidated = self.client.get(
+                '/api/daily-challenges/today/', HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+            )
+        self.assertEqual(revalidated.status_code, 200)
+        self.assertEqual(revalidated.data['problem']['slug'], 'problem-2')
+
+class SparseFieldsetTests(TestCase):
+    """
+    ?fields= narrows the columns loaded for problem lists
+    """
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='student', email='student@example.com', password='x')
+        for number in range(1, 31):
+            Problem.objects.create(
+                leetcode_id=number, title=f'Problem {number}', slug=f'problem-{number}',
+                description='<p>Description</p>', difficulty='easy', category='Algorithms'
+            )
+    
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+    
+    def test_sparse_page_is_one_query(self):
+        # The cursor's ordering column must not be deferred and reloaded per row
+        for url in ('/api/problems/?fields=id,title', '/api/problems/?fields=id,title&ordering=-leetcode_id'):
+            with self.assertNumQueries(1):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(set(response.data['results'][0]), {'id', 'title'})
+            self.assertIsNotNone(response.data['next'])
+
+class ProblemCursorTests(TestCase):
+    """
+    Problem lists page by cursor on leetcode_id, and by page number in
+    any other order
+    """
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='student', email='student@example.com', password='x')
+        for number in range(1, 31):
+            Problem.objects.create(
+                leetcode_id=number, title=f'Problem {number}', slug=f'problem-{number}',
+                description='<p>Description</p>', difficulty=('easy', 'medium', 'hard')[number % 3],
+                category='Algorithms'
+            )
+    
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+    
+    def walk(self, url):
+        numbers = []
+        while url:
+            response = self.client.get(url)
+            numbers.extend(problem['leetcode_id'] for problem in response.data['results'])
+            url = response.data['next']
+        return numbers
+    
+    def test_walk_pages_with_page_size(self):
+        response = self.client.get('/api/problems/?page_size=7')
+        self.assertEqual(len(response.data['results']), 7)
+        self.assertNotIn('count', response.data)
+        self.assertEqual(self.walk('/api/problems/?page_size=7'), list(range(1, 31)))
+    
+    def test_other_orderings_are_paged_by_number(self):
+        response = self.client.get('/api/problems/?ordering=difficulty&page_size=7')
+        self.assertEqual(response.data['count'], 30)
+        # Ties on difficulty are broken by id, so pages never overlap
+        expected = [
+            problem.leetcode_id for problem in Problem.objects.order_by('difficulty', 'id')
+        ]
+        self.assertEqual(self.walk('/api/problems/?ordering=difficulty&page_size=7'), expected)
+        self.assertEqual(self.walk('/api/problems/easy/?ordering=-success_rate'), expected[:10])
+        
+        # Reversed LeetCode order is still a cursor
+        response = self.client.get('/api/problems/?ordering=-leetcode_id&page_size=7')
+        self.assertNotIn('count', response.data)
+        self.assertEqual(self.walk('/api/problems/?ordering=-leetcode_id&page_size=7'), list(range(30, 0, -1)))
+
+class RandomPickerTests(TestCase):
+    """
+    Random picks come from a versioned id index that expires and is
+    rebuilt on demand
+    """
+    
+    @classmethod
+    def setUpTestData(cls):
+        tags = {slug: Tag.objects.create(name=slug.title(), slug=slug) for slug in ('array', 'graph')}
+        for number in range(1, 21):
+            problem = Problem.objects.create(
+                leetcode_id=number, title=f'Problem {number}', slug=f'problem-{number}',
+                description='<p>Description</p>', difficulty='hard' if number % 2 else 'easy',
+                category='Algorithms', is_premium=number > 15
+            )
+            problem.topic_tags.add(tags['array'] if number <= 10 else tags['graph'])
+    
+    def setUp(self):
+        cache.clear()
+    
+    def test_picks_honour_every_filter(self):
+        for _ in range(20):
+            problem = Problem.objects.get(id=pick_random_problem_id(difficulty='hard', tags=['Graph'], premium=False))
+            self.assertEqual(problem.difficulty, 'hard')
+            self.assertFalse(problem.is_premium)
+            self.assertTrue(11 <= problem.leetcode_id <= 15)
+        self.assertIsNone(pick_random_problem_id(tags=['Array'], premium=True))
+    
+    def test_index_is_reused_until_its_version_changes(self):
+        build_problem_index()
+        with self.assertNumQueries(0):
+            first = get_problem_index()
+            self.assertIs(get_problem_index(), first)
+        
+        build_problem_index()
+        self.assertIsNot(get_problem_index(), first)
+    
+    @override_settings(DERIVED_CACHE_TIMEOUT=1)
+    def test_index_expires_and_is_rebuilt(self):
+        build_problem_index()
+        Problem.objects.filter(leetcode_id__gt=1).delete()
+        time.sleep(1.1)
+        self.assertEqual(get_problem_index()["difficulty"]["all"], [Problem.objects.get().id])
+    
+    def test_rolled_back_benchmark_leaves_the_index_alone(self):
+        call_command('benchmark_sync', '--size', '5', '--latency', '0', stdout=StringIO())
+        self.assertIsNone(cache.get(PROBLEM_INDEX_CACHE_KEY))
+        self.assertEqual(len(get_problem_index()["difficulty"]["all"]), 20)
+
+class ProblemSearchTests(TestCase):
+    """
+    The search index built by the migrations follows problem writes
+    """
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='student', email='student@example.com', password='x')
+        for number, title in enumerate(('Two Sum', 'Add Two Numbers', 'Median of Two Sorted Arrays'), start=1):
+            Problem.objects.create(
+                leetcode_id=number, title=title, slug=f'problem-{number}', description='<p>Description</p>',
+                search_document='Description', difficulty='easy', category='Algorithms'
+            )
+    
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+    
+    def search(self, query):
+        response = self.client.get('/api/problems/search/', {'q': query})
+        return [problem['title'] for problem in response.data['results']]
+    
+    def test_title_prefix_ranks_first(self):
+        self.assertEqual(self.search('two')[0], 'Two Sum')
+        self.assertEqual(self.search('sort'), ['Median of Two Sorted Arrays'])
+    
+    def test_updates_are_indexed(self):
+        Problem.objects.filter(leetcode_id=1).update(title='Three Sum')
+        self.assertEqual(self.search('three'), ['Three Sum'])
+        self.assertNotIn('Three Sum', self.search('two'))
+    
+    def test_saved_descriptions_are_indexed(self):
+        # As the admin saves a problem, without the sync's plain text
+        problem = Problem.objects.get(leetcode_id=2)
+        problem.description = '<p>Use a <code>linked&nbsp;list</code></p>'
+        problem.save(update_fields=['description'])
+        problem.refresh_from_db()
+        self.assertEqual(problem.search_document, 'Use a linked list')
+        self.assertEqual(self.search('linked'), ['Add Two Numbers'])
+    
+    def test_list_search_covers_descriptions_and_tags(self):
+        Problem.objects.filter(leetcode_id=3).update(description='<p>Binary search</p>', tags=['Divide and Conquer'])
+        response = self.client.get('/api/problems/', {'search': 'binary'})
+        self.assertEqual([problem['title'] for problem in response.data['results']], ['Median of Two Sorted Arrays'])
+        response = self.client.get('/api/problems/', {'search': 'conquer'})
+        self.assertEqual([problem['title'] for problem in response.data['results']], ['Median of Two Sorted Arrays'])
+
+class TagFacetTests(TestCase):
+    """
+    Facet counts are cached for a bounded time and rebuilt on demand
+    """
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='student', email='student@example.com', password='x')
+        cls.tag = Tag.objects.create(name='Array', slug='array')
+        for number in range(1, 4):
+            problem = Problem.objects.create(
+                leetcode_id=number, title=f'Problem {number}', slug=f'problem-{number}',
+                description='<p>Description</p>', difficulty='easy' if number < 3 else 'hard',
+                category='Algorithms'
+            )
+            problem.topic_tags.add(cls.tag)
+    
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+    
+    def test_facet_counts(self):
+        with self.assertNumQueries(2):
+            facets = self.client.get('/api/problems/facets/').data
+        self.assertEqual(facets['difficulty'], {'easy': 2, 'medium': 0, 'hard': 1})
+        self.assertEqual(facets['tags'], [
+            {'slug': 'array', 'name': 'Array', 'count': 3, 'easy': 2, 'medium': 0, 'hard': 1}
+        ])
+        with self.assertNumQueries(0):
+            self.client.get('/api/problems/facets/')
+    
+    def test_list_filters_by_tag(self):
+        Problem.objects.create(
+            leetcode_id=4, title='Problem 4', slug='problem-4', description='<p>Untagged</p>',
+            difficulty='easy', category='Algorithms'
+        )
+        # The problem list page sends ?tags=; older clients send ?tag=
+        for param in ('tags', 'tag'):
+            response = self.client.get('/api/problems/', {param: 'Array'})
+            self.assertEqual(sorted(problem['leetcode_id'] for problem in response.data['results']), [1, 2, 3])
+    
+    @override_settings(DERIVED_CACHE_TIMEOUT=1)
+    def test_facets_expire(self):
+        build_tag_facets()
+        Problem.objects.filter(leetcode_id=3).delete()
+        time.sleep(1.1)
+        self.assertEqual(get_tag_facets()['count'], 2)
@@ -0,0 +1,286 @@
+import email.utils
+import logging
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+class TokenBucket:
+    """
+    Thread-safe token bucket used to cap the request rate against LeetCode.
+    A rate of zero or less disables limiting.
+    """
+    
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate or 0)
+        self.capacity = float(capacity or max(1.0, self.rate))
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """
+        Block until a token is available and consume it
+        """
+        if self.rate <= 0:
+            return
+        
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+class CircuitBreaker:
+    """
+    Thread-safe circuit breaker that stops calling LeetCode after repeated
+    failures and lets a single trial request through once the cooldown ends.
+    """
+    
+    def __init__(self, threshold, cooldown):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+    
+    @property
+    def is_open(self):
+        with self._lock:
+            return self._opened_at is not None
+    
+    def allow(self):
+        """
+        Return True if a request may be sent now
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._trial_in_flight or time.monotonic() - self._opened_at < self.cooldown:
+                return False
+            # Half-open: let one request through to probe the upstream
+            self._trial_in_flight = True
+            return True
+    
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+    
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.threshold:
+                if self._opened_at is None:
+                    logger.warning("Opening LeetCode circuit breaker after %d failures", self._failures)
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+class GraphQLResult:
+    """
+    Outcome of a GraphQL request: either the response data or a structured
+    error describing why there is none
+    """
+    
+    # Error kinds
+    TIMEOUT = 'timeout'
+    CONNECTION = 'connection'
+    RATE_LIMITED = 'rate_limited'
+    HTTP = 'http'
+    GRAPHQL = 'graphql'
+    INVALID_RESPONSE = 'invalid_response'
+    CIRCUIT_OPEN = 'circuit_open'
+    CACHE_MISS = 'cache_miss'
+    
+    def __init__(self, operation, data=None, error=None, message='', status_code=None, attempts=0, cached=False):
+        self.operation = operation
+        self.data = data
+        self.error = error
+        self.message = message
+        self.status_code = status_code
+        self.attempts = attempts
+        self.cached = cached
+    
+    @property
+    def ok(self):
+        return self.error is None
+    
+    def __repr__(self):
+        if self.ok:
+            return f"<GraphQLResult {self.operation} ok>"
+        return f"<GraphQLResult {self.operation} {self.error}: {self.message}>"
+
+class LeetCodeTransport:
+    """
+    HTTP transport for the LeetCode GraphQL endpoint.
+    
+    Every attempt goes through the shared rate limiter and uses explicit
+    connect/read timeouts. Timeouts, connection errors, 429s and 5xx
+    responses are retried with exponential backoff and full jitter, honoring
+    Retry-After. Requests that still fail count towards a circuit breaker.
+    Successful responses are read from and written to an optional
+    ResponseCache.
+    """
+    
+    RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+    
+    def __init__(self, endpoint, pool_size, rate_limit=None, headers=None, cache=None):
+        self.endpoint = endpoint
+        self.cache = cache
+        self.timeout = (settings.LEETCODE_HTTP_CONNECT_TIMEOUT, settings.LEETCODE_HTTP_READ_TIMEOUT)
+        self.max_retries = settings.LEETCODE_HTTP_MAX_RETRIES
+        self.backoff_base = settings.LEETCODE_HTTP_BACKOFF_BASE
+        self.backoff_max = settings.LEETCODE_HTTP_BACKOFF_MAX
+        self.rate_limiter = TokenBucket(
+            settings.LEETCODE_SYNC_RATE_LIMIT if rate_limit is None else rate_limit
+        )
+        self.circuit_breaker = CircuitBreaker(
+            settings.LEETCODE_CIRCUIT_BREAKER_THRESHOLD,
+            settings.LEETCODE_CIRCUIT_BREAKER_COOLDOWN,
+        )
+        
+        # Size the pool so concurrent workers never queue for a connection;
+        # retries are handled here rather than by urllib3
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(headers or {})
+    
+    def execute(self, operation, query, variables):
+        """
+        Send a GraphQL request and return a GraphQLResult
+        """
+        if self.cache is not None:
+            data = self.cache.get(operation, variables)
+            if data is not None:
+                return GraphQLResult(operation, data=data, cached=True)
+            if self.cache.offline:
+                return GraphQLResult(
+                    operation, error=GraphQLResult.CACHE_MISS,
+                    message="response not cached and running offline"
+                )
+        
+        result = self._execute(operation, query, variables)
+        if result.ok and self.cache is not None:
+            self.cache.set(operation, variables, result.data)
+        return result
+    
+    def _execute(self, operation, query, variables):
+        payload = {
+            "operationName": operation,
+            "query": query,
+            "variables": variables
+        }
+        
+        attempt = 0
+        while True:
+            if not self.circuit_breaker.allow():
+                return GraphQLResult(
+                    operation, error=GraphQLResult.CIRCUIT_OPEN,
+                    message="circuit breaker is open", attempts=attempt
+                )
+            
+            attempt += 1
+            result, retry_after = self._attempt(operation, payload, attempt)
+            retryable = result.error in (
+                GraphQLResult.TIMEOUT, GraphQLResult.CONNECTION,
+                GraphQLResult.RATE_LIMITED, GraphQLResult.HTTP,
+            ) and (result.status_code is None or result.status_code in self.RETRY_STATUS_CODES)
+            
+            if result.ok or not retryable:
+                # Any answer, even an error, shows the upstream is reachable
+                self.circuit_breaker.record_success()
+                if not result.ok:
+                    logger.warning("LeetCode %s failed: %s", operation, result.message)
+                return result
+            
+            if attempt > self.max_retries:
+                self.circuit_breaker.record_failure()
+                logger.warning(
+                    "LeetCode %s failed after %d attempts: %s", operation, attempt, result.message
+                )
+                return result
+            
+            delay = self._backoff(attempt, retry_after)
+            logger.info(
+                "LeetCode %s attempt %d failed (%s), retrying in %.1fs",
+                operation, attempt, result.message, delay
+            )
+            time.sleep(delay)
+    
+    def _attempt(self, operation, payload, attempt):
+        """
+        Make a single request. Returns a (GraphQLResult, retry_after) tuple.
+        """
+        self.rate_limiter.acquire()
+        
+        try:
+            response = self.session.post(self.endpoint, json=payload, timeout=self.timeout)
+        except requests.Timeout as e:
+            return GraphQLResult(operation, error=GraphQLResult.TIMEOUT, message=str(e), attempts=attempt), None
+        except requests.RequestException as e:
+            return GraphQLResult(operation, error=GraphQLResult.CONNECTION, message=str(e), attempts=attempt), None
+        
+        if response.status_code >= 400:
+            error = GraphQLResult.RATE_LIMITED if response.status_code == 429 else GraphQLResult.HTTP
+            result = GraphQLResult(
+                operation, error=error, message=f"HTTP {response.status_code}",
+                status_code=response.status_code, attempts=attempt
+            )
+            return result, self._parse_retry_after(response.headers.get("Retry-After"))
+        
+        try:
+            body = response.json()
+        except ValueError as e:
+            return GraphQLResult(
+                operation, error=GraphQLResult.INVALID_RESPONSE, message=str(e),
+                status_code=response.status_code, attempts=attempt
+            ), None
+        
+        if body.get("errors"):
+            return GraphQLResult(
+                operation, error=GraphQLResult.GRAPHQL, message=str(body["errors"]),
+                status_code=response.status_code, attempts=attempt
+            ), None
+        
+        return GraphQLResult(
+            operation, data=body.get("data") or {}, status_code=response.status_code, attempts=attempt
+        ), None
+    
+    def _backoff(self, attempt, retry_after=None):
+        """
+        Exponential backoff with full jitter, never shorter than Retry-After
+        """
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.backoff_max))
+        return delay
+    
+    def _parse_retry_after(self, value):
+        """
+        Parse a Retry-After header given either in seconds or as an HTTP date
+        """
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            retry_at = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        return max(0.0, retry_at.timestamp() - time.time())
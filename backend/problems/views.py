@@ -1,9 +1,24 @@
 from rest_framework import viewsets, permissions, filters
 from rest_framework.decorators import action
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
-from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from django.db.models import Count
+from django.utils.text import slugify
+from .daily import get_today_payload
+from .facets import get_tag_facets
+from submissions.models import Submission
 from .models import Problem, DailyChallenge
-from .serializers import ProblemSerializer, DailyChallengeSerializer
+from .filters import StableOrderingFilter
+from .pagination import ProblemCursorPagination, ProblemPagePagination, requested_ordering, select_paginator
+from .picker import (
+    MAX_RECENT_PICKS, build_problem_index, get_recent_picks, pick_random_problem_id, remember_pick
+)
+from .search import search_problem_ids
+from .serializers import (
+    ProblemSerializer, ProblemListSerializer, DailyChallengeSerializer, requested_fields
+)
 
 class ProblemViewSet(viewsets.ReadOnlyModelViewSet):
     """
@@ -12,52 +27,155 @@ class ProblemViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Problem.objects.all()
     serializer_class = ProblemSerializer
     permission_classes = [permissions.IsAuthenticated]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    pagination_class = ProblemCursorPagination
+    filter_backends = [filters.SearchFilter, StableOrderingFilter]
     search_fields = ['title', 'description', 'category', 'tags']
+    # Orderings other than leetcode_id are paged by number, see select_paginator
     ordering_fields = ['leetcode_id', 'difficulty', 'success_rate', 'created_at']
     
-    @action(detail=False)
-    def easy(self, request):
-        easy_problems = Problem.objects.filter(difficulty='easy')
-        page = self.paginate_queryset(easy_problems)
+    LIST_ACTIONS = ('list', 'easy', 'medium', 'hard', 'search')
+    
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            self._paginator = select_paginator(self, ProblemCursorPagination, ProblemPagePagination)
+        return self._paginator
+    
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action not in self.LIST_ACTIONS:
+            return queryset.defer('search_document', 'search_vector').prefetch_related('examples')
+        
+        if self.action != 'search':
+            queryset = self._filter_by_tags(queryset)
+        fields = requested_fields(self.request)
+        if fields is None:
+            return queryset.defer('description', 'search_document', 'search_vector', 'content_hash')
+        
+        # Only load the columns the sparse fieldset asks for, plus the ones
+        # the list is ordered by
+        columns = {field.name for field in Problem._meta.concrete_fields} & fields
+        ordering = requested_ordering(self) or [ProblemCursorPagination.ordering]
+        queryset = queryset.only('id', *columns, *(field.lstrip('-') for field in ordering))
+        if 'examples' in fields:
+            queryset = queryset.prefetch_related('examples')
+        return queryset
+    
+    def _filter_by_tags(self, queryset):
+        """
+        Filter by ?tags= (comma separated names or slugs; ?tag= is accepted
+        too). Problems must have all of the tags, or any of them with
+        ?tag_match=any.
+        """
+        params = self.request.query_params
+        tags = ','.join(params.getlist('tags') + params.getlist('tag'))
+        slugs = {slugify(tag) for tag in tags.split(',') if tag.strip()}
+        if not slugs:
+            return queryset
+        
+        problem_tags = Problem.topic_tags.through.objects.filter(tag__slug__in=slugs)
+        if self.request.query_params.get('tag_match') != 'any':
+            problem_tags = (
+                problem_tags.values('problem_id')
+                .annotate(matched=Count('tag_id'))
+                .filter(matched=len(slugs))
+            )
+        return queryset.filter(id__in=problem_tags.values('problem_id'))
+    
+    def get_serializer_class(self):
+        if self.action in self.LIST_ACTIONS:
+            fields = requested_fields(self.request)
+            if not fields or not fields & {'description', 'examples'}:
+                return ProblemListSerializer
+        return ProblemSerializer
+    
+    def _list_by_difficulty(self, difficulty):
+        problems = self.filter_queryset(self.get_queryset()).filter(difficulty=difficulty)
+        page = self.paginate_queryset(problems)
         if page is not None:
             serializer = self.get_serializer(page, many=True)
             return self.get_paginated_response(serializer.data)
-        serializer = self.get_serializer(easy_problems, many=True)
+        serializer = self.get_serializer(problems, many=True)
         return Response(serializer.data)
     
+    @action(detail=False)
+    def easy(self, request):
+        return self._list_by_difficulty('easy')
+    
     @action(detail=False)
     def medium(self, request):
-        medium_problems = Problem.objects.filter(difficulty='medium')
-        page = self.paginate_queryset(medium_problems)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-        serializer = self.get_serializer(medium_problems, many=True)
-        return Response(serializer.data)
+        return self._list_by_difficulty('medium')
     
     @action(detail=False)
     def hard(self, request):
-        hard_problems = Problem.objects.filter(difficulty='hard')
-        page = self.paginate_queryset(hard_problems)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-        serializer = self.get_serializer(hard_problems, many=True)
-        return Response(serializer.data)
+        return self._list_by_difficulty('hard')
+    
+    @action(detail=False)
+    def facets(self, request):
+        """
+        Problem counts per difficulty and per tag and difficulty, for the
+        filter sidebar. Precomputed after every sync.
+        """
+        return Response(get_tag_facets())
+    
+    @action(detail=False)
+    def search(self, request):
+        """
+        Full-text search over titles, categories, tags and descriptions,
+        best match first. Every word of ?q= is matched as a prefix.
+        """
+        problem_ids = search_problem_ids(request.query_params.get('q', ''))
+        
+        # Results are ranked ids rather than a queryset, so they are paged by number
+        paginator = PageNumberPagination()
+        page = paginator.paginate_queryset(problem_ids, request, view=self)
+        
+        # Fetch just this page's rows and put them back in rank order
+        problems = self.get_queryset().in_bulk(page)
+        serializer = self.get_serializer([problems[i] for i in page if i in problems], many=True)
+        return paginator.get_paginated_response(serializer.data)
     
     @action(detail=False)
     def random(self, request):
-        # Get optional difficulty parameter
-        difficulty = request.query_params.get('difficulty', None)
+        """
+        Pick a random problem from the cached id index.
+        
+        Optional filters: difficulty, tags (comma separated, all required),
+        premium (true/false), unsolved (true to skip problems the user has
+        solved) and avoid_recent (don't repeat the user's last N picks).
+        """
+        params = request.query_params
+        tags = [tag.strip() for tag in params.get('tags', '').split(',') if tag.strip()]
+        premium = None
+        if params.get('premium') in ('true', 'false'):
+            premium = params['premium'] == 'true'
+        try:
+            avoid_recent = min(int(params.get('avoid_recent', 0)), MAX_RECENT_PICKS)
+        except ValueError:
+            return Response({"detail": "avoid_recent must be an integer."}, status=400)
         
-        # Filter by difficulty if provided
-        if difficulty:
-            random_problem = Problem.objects.filter(difficulty=difficulty).order_by('?').first()
-        else:
-            random_problem = Problem.objects.order_by('?').first()
+        exclude = set(get_recent_picks(request.user, avoid_recent))
+        if params.get('unsolved') == 'true':
+            exclude.update(
+                Submission.objects.filter(user=request.user, status='accepted')
+                .values_list('problem_id', flat=True)
+            )
+        
+        random_problem = None
+        for _ in range(2):
+            problem_id = pick_random_problem_id(
+                difficulty=params.get('difficulty'), tags=tags, premium=premium, exclude=exclude
+            )
+            if problem_id is None:
+                break
+            random_problem = Problem.objects.prefetch_related('examples').filter(id=problem_id).first()
+            if random_problem:
+                break
+            # The index is stale (the problem was deleted); rebuild it once
+            build_problem_index()
         
         if random_problem:
+            remember_pick(request.user, random_problem.id)
             serializer = self.get_serializer(random_problem)
             return Response(serializer.data)
         return Response({"detail": "No problems found."}, status=404)
@@ -72,12 +190,19 @@ class DailyChallengeViewSet(viewsets.ReadOnlyModelViewSet):
     
     @action(detail=False)
     def today(self, request):
-        today = timezone.localdate()
-        try:
-            challenge = DailyChallenge.objects.get(date=today)
-            serializer = self.get_serializer(challenge)
-            return Response(serializer.data)
-        except DailyChallenge.DoesNotExist:
+        # Served from a payload rendered once per day; clients revalidate with 304s
+        entry = get_today_payload()
+        if entry is None:
             return Response({"detail": "Today's challenge not found."}, status=404)
+        
+        response = get_conditional_response(
+            request, etag=entry["etag"], last_modified=int(entry["last_modified"])
+        )
+        if response is None:
+            response = Response(entry["data"])
+        response['ETag'] = entry["etag"]
+        response['Last-Modified'] = http_date(entry["last_modified"])
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
 
 # Create your views here.
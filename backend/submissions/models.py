@@ -28,6 +28,12 @@ class Submission(models.Model):
     runtime = models.FloatField(null=True, blank=True)  # in milliseconds
     memory_usage = models.FloatField(null=True, blank=True)  # in MB
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['submission_time', 'id']),
+            models.Index(fields=['user', 'submission_time']),
+        ]
+    
     def __str__(self):
         return f"{self.user.username} - {self.problem.title} - {self.status}"
 
@@ -0,0 +1,13 @@
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+class SubmissionCursorPagination(CursorPagination):
+    """
+    Cursor pagination over submissions, newest first
+    """
+    ordering = ('-submission_time', '-id')
+
+class SubmissionPagePagination(PageNumberPagination):
+    """
+    Page-number pagination over submissions, for the orderings a cursor
+    can't seek on
+    """
@@ -1,7 +1,7 @@
 from rest_framework import serializers
 from .models import Submission, Feedback
-from users.serializers import UserSerializer
-from problems.serializers import ProblemSerializer
+from users.serializers import UserSerializer, UserSummarySerializer
+from problems.serializers import ProblemSerializer, ProblemSummarySerializer
 
 class SubmissionSerializer(serializers.ModelSerializer):
     problem_details = ProblemSerializer(source='problem', read_only=True)
@@ -19,6 +19,21 @@ class SubmissionSerializer(serializers.ModelSerializer):
         validated_data['user'] = self.context['request'].user
         return super().create(validated_data)
 
+class SubmissionListSerializer(serializers.ModelSerializer):
+    """
+    Compact submission representation for list pages, without the code
+    and with summaries of the problem and user
+    """
+    problem_details = ProblemSummarySerializer(source='problem', read_only=True)
+    user_details = UserSummarySerializer(source='user', read_only=True)
+    
+    class Meta:
+        model = Submission
+        fields = ('id', 'user', 'user_details', 'problem', 'problem_details', 
+                  'language', 'submission_time', 'status', 
+                  'runtime', 'memory_usage')
+        read_only_fields = fields
+
 class FeedbackSerializer(serializers.ModelSerializer):
     mentor_details = UserSerializer(source='mentor', read_only=True)
     
@@ -1,3 +1,96 @@
 from django.test import TestCase
+from rest_framework.test import APIClient
+from problems.models import Problem, ProblemExample
+from users.models import User
+from .models import Submission
 
-# Create your tests here.
+class SubmissionListQueryTests(TestCase):
+    """
+    Submission list pages should cost a fixed number of queries however
+    many rows they hold, and should not ship solution code
+    """
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = User.objects.create_user(username='student', email='student@example.com', password='x')
+        cls.mentor = User.objects.create_user(
+            username='mentor', email='mentor@example.com', password='x', role='mentor'
+        )
+        cls.problems = []
+        for number in range(1, 6):
+            problem = Problem.objects.create(
+                leetcode_id=number, title=f'Problem {number}', slug=f'problem-{number}',
+                description='<p>Description</p>', difficulty='easy', category='Algorithms'
+            )
+            ProblemExample.objects.create(problem=problem, input='[1, 2]', output='3')
+            cls.problems.append(problem)
+    
+    def setUp(self):
+        self.client = APIClient()
+    
+    def create_submissions(self, count, user=None):
+        Submission.objects.bulk_create([
+            Submission(
+                user=user or self.student, problem=self.problems[i % len(self.problems)],
+                code='print("solution")', language='python3', status='accepted'
+            )
+            for i in range(count)
+        ])
+    
+    def assert_page_queries(self, user, url, rows):
+        self.client.force_authenticate(user)
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), rows)
+        return response
+    
+    def test_list_query_budget(self):
+        self.create_submissions(3)
+        self.assert_page_queries(self.student, '/api/submissions/', 3)
+        self.create_submissions(30)
+        self.assert_page_queries(self.student, '/api/submissions/', 20)
+    
+    def test_mentor_list_query_budget(self):
+        self.create_submissions(15)
+        self.create_submissions(15, user=self.mentor)
+        self.assert_page_queries(self.mentor, '/api/submissions/', 20)
+    
+    def test_my_submissions_query_budget(self):
+        self.create_submissions(25)
+        self.assert_page_queries(self.student, '/api/submissions/my_submissions/', 20)
+    
+    def test_by_problem_query_budget(self):
+        self.create_submissions(50)
+        self.assert_page_queries(
+            self.student, f'/api/submissions/by_problem/?problem_id={self.problems[0].id}', 10
+        )
+    
+    def test_other_orderings_are_paged_by_number(self):
+        self.create_submissions(25)
+        Submission.objects.update(runtime=10)
+        self.client.force_authenticate(self.student)
+        ids = []
+        url = '/api/submissions/my_submissions/?ordering=-runtime'
+        while url:
+            response = self.client.get(url)
+            ids.extend(submission['id'] for submission in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(response.data['count'], 25)
+        self.assertEqual(ids, sorted(Submission.objects.values_list('id', flat=True)))
+    
+    def test_list_omits_code(self):
+        self.create_submissions(1)
+        response = self.assert_page_queries(self.student, '/api/submissions/', 1)
+        submission = response.data['results'][0]
+        self.assertNotIn('code', submission)
+        self.assertEqual(submission['problem_details']['title'], 'Problem 1')
+        self.assertEqual(submission['user_details']['username'], 'student')
+    
+    def test_detail_includes_code(self):
+        self.create_submissions(1)
+        submission = Submission.objects.get()
+        self.client.force_authenticate(self.student)
+        response = self.client.get(f'/api/submissions/{submission.id}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['code'], 'print("solution")')
@@ -1,10 +1,18 @@
+import copy
 from django.shortcuts import render
-from rest_framework import viewsets, permissions, filters
+from rest_framework import viewsets, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from django.db import transaction
 from django.db.models import Q
+from analytics.rollup import record_submission, retract_submission
+from groups.leaderboard import rebuild_user_leaderboards, record_leaderboard_solve
+from groups.progress import invalidate_submission_progress
+from problems.filters import StableOrderingFilter
+from problems.pagination import select_paginator
 from .models import Submission, Feedback
-from .serializers import SubmissionSerializer, FeedbackSerializer
+from .pagination import SubmissionCursorPagination, SubmissionPagePagination
+from .serializers import SubmissionSerializer, SubmissionListSerializer, FeedbackSerializer
 
 class IsOwnerOrMentor(permissions.BasePermission):
     """
@@ -27,22 +35,83 @@ class SubmissionViewSet(viewsets.ModelViewSet):
     """
     serializer_class = SubmissionSerializer
     permission_classes = [permissions.IsAuthenticated, IsOwnerOrMentor]
-    filter_backends = [filters.OrderingFilter]
+    pagination_class = SubmissionCursorPagination
+    filter_backends = [StableOrderingFilter]
+    # Orderings other than submission_time are paged by number, see select_paginator
     ordering_fields = ['submission_time', 'status', 'runtime', 'memory_usage']
     
+    LIST_ACTIONS = ('list', 'my_submissions', 'by_problem')
+    
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            self._paginator = select_paginator(self, SubmissionCursorPagination, SubmissionPagePagination)
+        return self._paginator
+    
     def get_queryset(self):
         user = self.request.user
+        queryset = Submission.objects.select_related('problem', 'user')
+        
+        # Lists only need summaries, so leave the code and problem text behind
+        if self.action in self.LIST_ACTIONS:
+            queryset = queryset.defer(
+                'code', 'problem__description', 'problem__search_document',
+                'problem__search_vector', 'problem__content_hash'
+            )
+        else:
+            queryset = queryset.prefetch_related('problem__examples')
         
         # Mentors and admins can see all submissions
         if user.role in ['mentor', 'admin']:
-            return Submission.objects.all()
+            return queryset
         
         # Regular users can only see their own submissions
-        return Submission.objects.filter(user=user)
+        return queryset.filter(user=user)
     
-    @action(detail=False)
-    def my_submissions(self, request):
-        submissions = Submission.objects.filter(user=request.user)
+    def get_serializer_class(self):
+        if self.action in self.LIST_ACTIONS:
+            return SubmissionListSerializer
+        return SubmissionSerializer
+    
+    def perform_create(self, serializer):
+        submission = serializer.save()
+        record_submission(submission)
+        record_leaderboard_solve(submission)
+        invalidate_submission_progress(submission)
+    
+    def perform_update(self, serializer):
+        # Moving an accepted submission to another problem takes its solve
+        # back from the old problem, which this copy still points at
+        previous = copy.copy(serializer.instance)
+        was_accepted = previous.status == 'accepted'
+        with transaction.atomic():
+            submission = serializer.save()
+            moved = submission.problem_id != previous.problem_id
+            retracted = was_accepted and (moved or submission.status != 'accepted')
+            solved = submission.status == 'accepted' and (moved or not was_accepted)
+            if retracted:
+                retract_submission(previous, was_accepted=True)
+            if solved:
+                record_submission(submission, new=False)
+            if retracted:
+                rebuild_user_leaderboards(submission.user_id)
+            elif solved:
+                record_leaderboard_solve(submission)
+        if moved:
+            invalidate_submission_progress(previous)
+        invalidate_submission_progress(submission)
+    
+    def perform_destroy(self, instance):
+        was_accepted = instance.status == 'accepted'
+        with transaction.atomic():
+            retract_submission(instance, was_accepted, deleted=True)
+            instance.delete()
+            if was_accepted:
+                rebuild_user_leaderboards(instance.user_id)
+        invalidate_submission_progress(instance)
+    
+    def _paginated_list(self, submissions):
+        submissions = self.filter_queryset(submissions)
         page = self.paginate_queryset(submissions)
         if page is not None:
             serializer = self.get_serializer(page, many=True)
@@ -50,24 +119,17 @@ class SubmissionViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(submissions, many=True)
         return Response(serializer.data)
     
+    @action(detail=False)
+    def my_submissions(self, request):
+        return self._paginated_list(self.get_queryset().filter(user=request.user))
+    
     @action(detail=False)
     def by_problem(self, request):
         problem_id = request.query_params.get('problem_id', None)
         if problem_id is None:
             return Response({"detail": "Problem ID is required."}, status=400)
         
-        user = request.user
-        if user.role in ['mentor', 'admin']:
-            submissions = Submission.objects.filter(problem_id=problem_id)
-        else:
-            submissions = Submission.objects.filter(problem_id=problem_id, user=user)
-        
-        page = self.paginate_queryset(submissions)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-        serializer = self.get_serializer(submissions, many=True)
-        return Response(serializer.data)
+        return self._paginated_list(self.get_queryset().filter(problem_id=problem_id))
 
 class FeedbackViewSet(viewsets.ModelViewSet):
     """
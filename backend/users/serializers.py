@@ -33,6 +33,14 @@ class UserSerializer(serializers.ModelSerializer):
                             'medium_problems_solved', 'hard_problems_solved', 
                             'is_premium')
 
+class UserSummarySerializer(serializers.ModelSerializer):
+    """
+    Minimal user representation for embedding in other resources
+    """
+    class Meta:
+        model = User
+        fields = ('id', 'username', 'first_name', 'last_name', 'profile_picture')
+
 class RegisterSerializer(serializers.ModelSerializer):
     """
     Serializer for registering a new user
@@ -90,35 +98,7 @@ class UserProfileSerializer(serializers.ModelSerializer):
         return DailyActivity.objects.filter(user=obj, problems_solved__gt=0).count()
     
     def get_current_streak(self, obj):
-        from analytics.models import DailyActivity
-        from django.utils import timezone
-        from datetime import timedelta
-        
-        today = timezone.localdate()
-        yesterday = today - timedelta(days=1)
-        
-        # Check if user has activity for today
-        today_activity = DailyActivity.objects.filter(
-            user=obj, 
-            date=today,
-            problems_solved__gt=0
-        ).exists()
-        
-        # Get the latest streak of consecutive days
-        streak = 0
-        check_date = yesterday
-        
-        # Count backwards from yesterday until we find a day with no activity
-        while DailyActivity.objects.filter(
-            user=obj, 
-            date=check_date,
-            problems_solved__gt=0
-        ).exists():
-            streak += 1
-            check_date = check_date - timedelta(days=1)
-        
-        # If user has activity today, add today to the streak
-        if today_activity:
-            streak += 1
+        from analytics.streaks import current_streak
         
-        return streak
+        # Maintained on the user as activity is recorded
+        return current_streak(obj)
@@ -31,6 +31,7 @@ const ProblemList = () => {
   const { problems, loading, pagination } = useSelector((state) => state.problems);
   
   const [page, setPage] = useState(0);
+  const [cursor, setCursor] = useState(null);
   const [rowsPerPage, setRowsPerPage] = useState(10);
   const [search, setSearch] = useState('');
   const [difficulty, setDifficulty] = useState('');
@@ -45,23 +46,34 @@ const ProblemList = () => {
 
   useEffect(() => {
     const params = {
-      page: page + 1,
       page_size: rowsPerPage,
+      ...(cursor && { cursor }),
       ...(search && { search }),
       ...(difficulty && { difficulty }),
-      ...(tag && { tag }),
+      ...(tag && { tags: tag }),
     };
     
     dispatch(fetchProblems(params));
-  }, [dispatch, page, rowsPerPage, search, difficulty, tag]);
+  }, [dispatch, cursor, rowsPerPage, search, difficulty, tag]);
 
+  // Pages are fetched by following the next/previous cursors
   const handleChangePage = (event, newPage) => {
+    const link = newPage > page ? pagination.next : pagination.previous;
+    if (!link) {
+      return;
+    }
+    setCursor(new URL(link).searchParams.get('cursor'));
     setPage(newPage);
   };
 
+  const resetPage = () => {
+    setCursor(null);
+    setPage(0);
+  };
+
   const handleChangeRowsPerPage = (event) => {
     setRowsPerPage(parseInt(event.target.value, 10));
-    setPage(0);
+    resetPage();
   };
 
   const handleProblemClick = (id) => {
@@ -83,17 +95,17 @@ const ProblemList = () => {
 
   const handleSearchChange = (event) => {
     setSearch(event.target.value);
-    setPage(0);
+    resetPage();
   };
 
   const handleDifficultyChange = (event) => {
     setDifficulty(event.target.value);
-    setPage(0);
+    resetPage();
   };
 
   const handleTagChange = (event) => {
     setTag(event.target.value);
-    setPage(0);
+    resetPage();
   };
 
   return (
@@ -216,9 +228,11 @@ const ProblemList = () => {
           <TablePagination
             rowsPerPageOptions={[10, 25, 50]}
             component="div"
-            count={pagination.count}
+            count={pagination.next ? -1 : page * rowsPerPage + problems.length}
             rowsPerPage={rowsPerPage}
             page={page}
+            backIconButtonProps={{ disabled: !pagination.previous }}
+            nextIconButtonProps={{ disabled: !pagination.next }}
             onPageChange={handleChangePage}
             onRowsPerPageChange={handleChangeRowsPerPage}
           />
@@ -31,7 +31,7 @@ export const getProblemsByDifficulty = async (difficulty) => {
 // Get problems by tag
 export const getProblemsByTag = async (tag) => {
   const response = await api.get(PROBLEMS_URL, { 
-    params: { tag } 
+    params: { tags: tag } 
   });
   return response;
 };
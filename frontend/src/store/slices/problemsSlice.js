@@ -43,8 +43,9 @@ const initialState = {
   todayChallenge: null,
   loading: false,
   error: null,
+  // Lists are cursor paginated: there is no total, only links to the
+  // neighbouring pages
   pagination: {
-    count: 0,
     next: null,
     previous: null,
   },
@@ -71,7 +72,6 @@ const problemsSlice = createSlice({
         state.loading = false;
         state.problems = action.payload.results;
         state.pagination = {
-          count: action.payload.count,
           next: action.payload.next,
           previous: action.payload.previous,
         };
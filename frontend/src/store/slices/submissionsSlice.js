@@ -8,7 +8,6 @@ const initialState = {
   success: false,
   error: null,
   pagination: {
-    count: 0,
     next: null,
     previous: null,
   },
@@ -91,7 +90,6 @@ const submissionsSlice = createSlice({
         state.loading = false;
         state.submissions = action.payload.results;
         state.pagination = {
-          count: action.payload.count,
           next: action.payload.next,
           previous: action.payload.previous,
         };
@@ -141,7 +139,6 @@ const submissionsSlice = createSlice({
         state.loading = false;
         state.submissions = action.payload.results;
         state.pagination = {
-          count: action.payload.count,
           next: action.payload.next,
           previous: action.payload.previous,
         };